@@ -0,0 +1,103 @@
+"""
+Проверка и замер времени импорта file2text.
+
+Каждый импорт выполняется в отдельном процессе. Скрипт завершается с ошибкой,
+если легкие модули (утилиты, CLI, сам пакет) не импортируются или тянут за
+собой torch, whisper, pyannote.audio, transformers, sentence_transformers,
+faiss или sklearn. Попытка импорта тяжелого модуля считается утечкой, даже
+если он не установлен. Тот же контроль выполняет tests/test_imports.py.
+
+Запуск:
+    python benchmarks/bench_import.py
+"""
+
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = [
+    "torch", "whisper", "pyannote.audio", "transformers", "sentence_transformers", "faiss", "sklearn",
+]
+
+# Импорты, которые не должны загружать тяжелые зависимости
+LIGHT_IMPORTS = [
+    "import file2text",
+    "import file2text.utils",
+    "from file2text.utils import clean_text",
+    "from file2text import File2Text",
+    "import file2text.cli.main",
+]
+
+# Необязательные зависимости импортов: без них импорт пропускается
+OPTIONAL_DEPENDENCIES = {
+    "import file2text.cli.main": "typer",
+}
+
+_PROBE = """
+import json, sys, time
+
+heavy = {heavy!r}
+attempted = set()
+
+class HeavyImportFinder:
+    # Запоминает попытки импорта тяжелых модулей, в том числе не установленных
+    def find_spec(self, name, path=None, target=None):
+        for module in heavy:
+            if module == name or module.startswith(name + "."):
+                attempted.add(module)
+        return None
+
+sys.meta_path.insert(0, HeavyImportFinder())
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "heavy": [name for name in heavy if name in sys.modules or name in attempted],
+}}))
+"""
+
+
+def probe(statement: str) -> dict:
+    """Выполняет импорт в чистом интерпретаторе и возвращает время и тяжелые модули."""
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    failed = []
+    print(f"{'импорт':<42} {'время, с':>9}  тяжелые модули")
+    for statement in LIGHT_IMPORTS:
+        dependency = OPTIONAL_DEPENDENCIES.get(statement)
+        if dependency and importlib.util.find_spec(dependency) is None:
+            print(f"{statement:<42} {'-':>9}  пропущено: не установлен {dependency}")
+            continue
+        try:
+            result = probe(statement)
+        except subprocess.CalledProcessError as e:
+            lines = e.stderr.strip().splitlines() or ["?"]
+            print(f"{statement:<42} {'-':>9}  ошибка импорта: {lines[-1]}")
+            failed.append(statement)
+            continue
+        heavy = ", ".join(result["heavy"]) or "-"
+        print(f"{statement:<42} {result['seconds']:>9.3f}  {heavy}")
+        if result["heavy"]:
+            failed.append(statement)
+    
+    if failed:
+        print(f"\nОшибка: импорт не удался или загружает тяжелые зависимости: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Бенчмарк int8-квантования моделей на CPU.
+
+Для Whisper, модели суммаризации (rut5) и модели векторизации (MiniLM)
+загружает float32 и int8 версии, замеряет время загрузки и обработки,
+размер весов и отклонение результатов int8 от float32: WER транскрипции,
+ROUGE-L суммаризации и косинусную близость векторов. Если задан эталонный
+текст (--reference), дополнительно выводится WER обеих версий относительно
+него.
+
+Запуск:
+    python benchmarks/bench_quantization.py --audio sample.wav
+    python benchmarks/bench_quantization.py --audio sample.wav --reference sample.txt --whisper-model small
+"""
+
+import argparse
+import io
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from file2text.core.registry import ModelRegistry
+from file2text.core.summarizer import Summarizer
+from file2text.core.transcriber import Transcriber
+from file2text.core.vectorizer import Vectorizer
+from file2text.utils.evaluation import cosine_similarity, rouge_l, word_error_rate
+
+
+def weights_size(model) -> int:
+    """Размер сериализованных весов модели в байтах."""
+    import torch
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def timed(func, repeat: int):
+    """Результат последнего вызова и среднее время вызова."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        value = func()
+    return value, (time.perf_counter() - started) / repeat
+
+
+def load_pair(factory):
+    """Загружает float32 и int8 версии компонента (каждую в своем реестре)."""
+    pair = {}
+    for dtype in ("float32", "int8"):
+        started = time.perf_counter()
+        component = factory(quantize=dtype == "int8", registry=ModelRegistry())
+        pair[dtype] = (component, time.perf_counter() - started)
+    return pair
+
+
+def report(name: str, pair, model_of, run, repeat: int):
+    """Печатает строку таблицы и возвращает результаты обеих версий."""
+    outputs = {}
+    seconds = {}
+    sizes = {}
+    for dtype, (component, _) in pair.items():
+        outputs[dtype], seconds[dtype] = timed(lambda: run(component), repeat)
+        sizes[dtype] = weights_size(model_of(component))
+    
+    speedup = seconds["float32"] / seconds["int8"] if seconds["int8"] else 0.0
+    saved = 1 - sizes["int8"] / sizes["float32"] if sizes["float32"] else 0.0
+    print(
+        f"{name:<14} {pair['float32'][1]:>9.1f} {pair['int8'][1]:>9.1f} "
+        f"{seconds['float32']:>9.2f} {seconds['int8']:>9.2f} {speedup:>8.2f}x "
+        f"{sizes['float32'] / 2**20:>9.0f} {sizes['int8'] / 2**20:>9.0f} {saved:>7.0%}"
+    )
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк int8-квантования")
+    parser.add_argument("--audio", required=True, help="Аудио файл для транскрипции")
+    parser.add_argument("--reference", help="Эталонная расшифровка (текстовый файл)")
+    parser.add_argument("--whisper-model", default="base", help="Модель Whisper")
+    parser.add_argument("--summarizer-model", default="IlyaGusev/rut5_base_sum_gazeta")
+    parser.add_argument("--vectorizer-model",
+                        default="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+    parser.add_argument("--cache-dir", help="Папка кэша квантованных моделей (по умолчанию временная)")
+    parser.add_argument("--repeat", type=int, default=1, help="Повторов замера")
+    args = parser.parse_args()
+    
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="file2text-quantized-")
+    
+    print(
+        f"{'модель':<14} {'загр. fp32':>9} {'загр. int8':>9} {'fp32, с':>9} {'int8, с':>9} "
+        f"{'ускорение':>9} {'fp32, МБ':>9} {'int8, МБ':>9} {'экономия':>7}"
+    )
+    
+    transcribers = load_pair(lambda **kw: Transcriber(
+        model=args.whisper_model, device="cpu", cache_dir=cache_dir, **kw
+    ))
+    transcripts = report(
+        "whisper", transcribers, lambda t: t.model,
+        lambda t: t.transcribe(args.audio)["text"], args.repeat
+    )
+    
+    # Суммаризация и векторы считаются по транскрипту float32, чтобы
+    # отклонение зависело только от квантования соответствующей модели
+    text = transcripts["float32"]
+    sentences = [s for s in re.split(r'(?<=[.!?])\s+', text) if s] or [text]
+    
+    summarizers = load_pair(lambda **kw: Summarizer(
+        model=args.summarizer_model, device="cpu", cache_dir=cache_dir, **kw
+    ))
+    summaries = report(
+        "summarization", summarizers, lambda s: s.summarizer.model,
+        lambda s: s.summarize(text), args.repeat
+    )
+    
+    vectorizers = load_pair(lambda **kw: Vectorizer(
+        model=args.vectorizer_model, device="cpu", cache_dir=cache_dir, **kw
+    ))
+    vectors = report(
+        "vectorization", vectorizers, lambda v: v.model,
+        lambda v: v.vectorize_batch(sentences), args.repeat
+    )
+    
+    print()
+    print("Отклонение int8 от float32:")
+    print(f"  WER транскрипции:       {word_error_rate(transcripts['float32'], transcripts['int8']):.3f}")
+    print(f"  ROUGE-L суммаризации:   {rouge_l(summaries['float32'], summaries['int8']):.3f}")
+    similarity = cosine_similarity(vectors["float32"], vectors["int8"])
+    print(f"  косинус векторов:       среднее {similarity.mean():.4f}, минимум {similarity.min():.4f}")
+    
+    if args.reference:
+        reference = Path(args.reference).read_text(encoding="utf-8")
+        print()
+        print("WER относительно эталона:")
+        for dtype, transcript in transcripts.items():
+            print(f"  {dtype:<8} {word_error_rate(reference, transcript):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Бенчмарк и проверка эквивалентности file2text.utils.text_cleaner.
+
+Сравнивает clean_text и postprocess_summary с прежней реализацией (полный
+прогон всех шаблонов по всему тексту) на регрессионном корпусе и замеряет
+ускорение на длинных транскриптах.
+
+Запуск:
+    python benchmarks/bench_text_cleaner.py
+    python benchmarks/bench_text_cleaner.py --minutes 180 --cases 2000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from file2text.utils.text_cleaner import clean_text, postprocess_summary
+
+
+def legacy_clean_text(text: str) -> str:
+    """clean_text до перехода на предкомпилированные шаблоны."""
+    if not text:
+        return text
+    
+    text = re.sub(r'\s+', ' ', text).strip()
+    text = re.sub(
+        r'\b(Ага|Оке|Окей|Да|Нет|Угу|М-м|Хм)\s*[.!?,]?\s*(\1\s*[.!?,]?\s*){2,}',
+        r'\1. ',
+        text,
+        flags=re.IGNORECASE
+    )
+    text = re.sub(r'\b(\w+)(\s+\1){2,}\b', r'\1 \1', text, flags=re.IGNORECASE)
+    text = re.sub(r'(\b\w+\b)(\s*,\s*\1){2,}', r'\1', text, flags=re.IGNORECASE)
+    
+    sentences = re.split(r'[.!?]\s+', text)
+    seen_sentences = {}
+    cleaned_sentences = []
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) < 5:
+            continue
+        normalized = re.sub(r'[^\w\s]', '', sentence.lower())
+        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        if normalized in seen_sentences:
+            continue
+        seen_sentences[normalized] = True
+        cleaned_sentences.append(sentence)
+    
+    if not cleaned_sentences:
+        return text
+    
+    text = '. '.join(cleaned_sentences)
+    if text and not text.endswith(('.', '!', '?')):
+        text += '.'
+    
+    for length in range(80, 9, -10):
+        pattern = rf'([^.!?]{{{length//2},{length}}})(\s*[,.]\s*\1){{2,}}'
+        text = re.sub(pattern, r'\1', text)
+    
+    for length in range(50, 14, -5):
+        pattern = rf'([^.!?]{{{length//2},{length}}})(\s*,\s*\1)+'
+        text = re.sub(pattern, r'\1', text)
+    
+    text = re.sub(r'\s+', ' ', text).strip()
+    text = re.sub(r'\s*([.!?])\s*\1+', r'\1', text)
+    
+    return text
+
+
+def legacy_postprocess_summary(summary: str) -> str:
+    """postprocess_summary до перехода на предкомпилированные шаблоны."""
+    if not summary:
+        return summary
+    
+    summary = legacy_clean_text(summary)
+    sentences = re.split(r'[.!?]\s+', summary)
+    unique_sentences = []
+    seen = set()
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        normalized = re.sub(r'\s+', ' ', sentence.lower().strip())
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        unique_sentences.append(sentence)
+    
+    result = '. '.join(unique_sentences)
+    if result and not result.endswith(('.', '!', '?')):
+        result += '.'
+    result = re.sub(r'\b(\w+)(\s+\1){2,}\b', r'\1', result, flags=re.IGNORECASE)
+    
+    return result.strip()
+
+
+WORDS = (
+    "да нет ага угу хм окей так вот значит проект бюджет отчет встреча клиент "
+    "сроки задача договор поставка сервер релиз команда неделя понедельник "
+    "мы они я вы это что как когда потому нужно можно сделать обсудить"
+).split()
+
+PHRASES = [
+    "давайте обсудим бюджет",
+    "я не уверен",
+    "это нужно сделать до пятницы",
+    "симплоро",
+    "в общем",
+    "как я уже говорил",
+    "ну вот",
+]
+
+SEPARATORS = [", ", ",", " , ", ". ", ".", "  ,  ", ",\n", "! ", "? ", " "]
+
+
+def make_case(rng: random.Random, size: int) -> str:
+    """Случайный текст с артефактами Whisper: повторы слов, фраз и междометий."""
+    parts = []
+    while sum(len(p) for p in parts) < size:
+        kind = rng.random()
+        if kind < 0.45:
+            parts.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12))))
+        elif kind < 0.75:
+            phrase = rng.choice(PHRASES + WORDS)
+            sep = rng.choice(SEPARATORS)
+            parts.append(sep.join([phrase] * rng.randint(2, 5)))
+        elif kind < 0.85:
+            word = rng.choice(["Ага", "Да", "угу", "Хм", "М-м", "Окей"])
+            parts.append(rng.choice([" ", ". ", ", ", "! "]).join([word] * rng.randint(1, 5)))
+        else:
+            parts.append(" ".join([rng.choice(WORDS)] * rng.randint(2, 5)))
+        parts.append(rng.choice(SEPARATORS))
+    return "".join(parts)
+
+
+def make_transcript(rng: random.Random, minutes: float) -> str:
+    """Транскрипт длительностью около minutes минут (~900 символов в минуту)."""
+    return make_case(rng, int(minutes * 900))
+
+
+def check_equivalence(cases: int, seed: int) -> int:
+    """Сравнивает результаты с прежней реализацией. Возвращает число расхождений."""
+    rng = random.Random(seed)
+    corpus = ["", " ", "Ага. Ага. Ага. Ага.", "раз, раз, раз, раз", "a. b. c"]
+    corpus += [make_case(rng, rng.randint(10, 3000)) for _ in range(cases)]
+    
+    mismatches = 0
+    for text in corpus:
+        for new, old in ((clean_text, legacy_clean_text),
+                         (postprocess_summary, legacy_postprocess_summary)):
+            if new(text) != old(text):
+                mismatches += 1
+                if mismatches <= 3:
+                    print(f"Расхождение в {new.__name__}: {text[:120]!r}")
+    print(f"Регрессионный корпус: {len(corpus)} текстов, расхождений: {mismatches}")
+    return mismatches
+
+
+def measure(func, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк text_cleaner")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60, 180],
+                        help="Длительности синтетических транскриптов, мин")
+    parser.add_argument("--cases", type=int, default=3000, help="Размер регрессионного корпуса")
+    parser.add_argument("--repeat", type=int, default=3, help="Повторов замера")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    if check_equivalence(args.cases, args.seed):
+        sys.exit(1)
+    
+    rng = random.Random(args.seed)
+    print(f"{'минут':>8} {'символов':>10} {'прежняя, с':>12} {'новая, с':>10} {'ускорение':>10}")
+    for minutes in args.minutes:
+        text = make_transcript(rng, minutes)
+        old = measure(legacy_clean_text, text, args.repeat)
+        new = measure(clean_text, text, args.repeat)
+        print(f"{minutes:>8g} {len(text):>10} {old:>12.3f} {new:>10.3f} {old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Набор бенчмарков file2text на заглушках моделей и синтетических данных.
+
+Замеряет чистые Python/numpy участки (очистка текста, разбиение на чанки,
+назначение спикеров, поиск по векторам, VAD, чтение WAV) и накладные
+расходы оркестрации File2Text.process на записях от 1 минуты до 10 часов.
+Модели заменены детерминированными заглушками (см. stubs.py), поэтому набор
+работает офлайн на CPU. Дополнительно проверяется, что легкие импорты не
+тянут тяжелые зависимости (см. bench_import.py).
+
+Результаты сохраняются в JSON и сравниваются с базовым запуском: бенчмарк
+считается регрессией, если он медленнее базового более чем на --tolerance
+(и хотя бы на --min-delta секунд), в этом случае скрипт завершается с кодом 1.
+
+Запуск:
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json -o results.json
+    python benchmarks/run_benchmarks.py --minutes 1 10 --only clean_text assign_speakers
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from file2text.core.diarizer import Diarizer
+from file2text.core.registry import ModelRegistry
+from file2text.core.summarizer import Summarizer, _split_text_into_chunks
+from file2text.core.vector_index import VectorIndex
+from file2text.core.vectorizer import Vectorizer
+from file2text.utils.audio_converter import AudioConverter
+from file2text.utils.text_cleaner import clean_text
+from file2text.utils.vad import detect_speech, split_on_silence
+
+from bench_import import LIGHT_IMPORTS, probe
+from stubs import StubSentenceEncoder, StubTokenizer, install_stubs, make_config
+from synthetic import make_audio, make_segments, make_transcript, make_turns
+
+
+class Context:
+    """Общие для бенчмарков данные: синтетика кэшируется по длительности."""
+    
+    def __init__(self, workdir: str):
+        self.workdir = Path(workdir)
+        self.config = make_config(str(self.workdir / "cache"))
+        self.registry = ModelRegistry()
+        install_stubs(self.registry, self.config)
+        self._data: Dict[Any, Any] = {}
+    
+    def get(self, key, factory: Callable[[], Any]) -> Any:
+        if key not in self._data:
+            self._data[key] = factory()
+        return self._data[key]
+    
+    def transcript(self, minutes: float) -> str:
+        return self.get(("transcript", minutes), lambda: make_transcript(minutes))
+    
+    def segments(self, minutes: float) -> List[Dict[str, Any]]:
+        return self.get(("segments", minutes), lambda: make_segments(minutes))
+    
+    def turns(self, minutes: float):
+        return self.get(("turns", minutes), lambda: make_turns(minutes))
+    
+    def audio(self, minutes: float) -> np.ndarray:
+        return self.get(("audio", minutes), lambda: make_audio(minutes))
+    
+    def wav(self, minutes: float, sample_rate: int = 16000) -> str:
+        def write():
+            audio = self.audio(minutes)
+            if sample_rate != 16000:
+                audio = make_audio(minutes, sample_rate=sample_rate)
+            path = self.workdir / f"synthetic_{minutes:g}min_{sample_rate}.wav"
+            return AudioConverter.write_wav(audio, str(path), sample_rate=sample_rate)
+        return self.get(("wav", minutes, sample_rate), write)
+    
+    def vector_index(self, minutes: float, mode: str) -> VectorIndex:
+        def build():
+            encoder = StubSentenceEncoder(self.config.vector_dimension)
+            texts = [segment['text'] for segment in self.segments(minutes)]
+            index = VectorIndex(encoder.dimension, mode=mode)
+            index.add(encoder.encode(texts), items=texts)
+            if mode == "ivf":
+                index.build_ivf()
+            return index
+        return self.get(("index", minutes, mode), build)
+
+
+# Каждый бенчмарк готовит данные (вне замера) и возвращает замеряемую функцию
+
+def bench_clean_text(ctx: Context, minutes: float):
+    text = ctx.transcript(minutes)
+    return lambda: clean_text(text)
+
+
+def bench_split_chunks(ctx: Context, minutes: float):
+    text = clean_text(ctx.transcript(minutes))
+    return lambda: _split_text_into_chunks(text, max_length=1000, overlap=200)
+
+
+def bench_split_chunks_tokens(ctx: Context, minutes: float):
+    text = clean_text(ctx.transcript(minutes))
+    tokenizer = StubTokenizer()
+    
+    def measure(sentences):
+        return [len(ids) + 1 for ids in tokenizer(sentences, add_special_tokens=False)['input_ids']]
+    
+    return lambda: _split_text_into_chunks(text, max_length=504, overlap=64, measure=measure)
+
+
+def bench_assign_speakers(ctx: Context, minutes: float):
+    segments, turns = ctx.segments(minutes), ctx.turns(minutes)
+    return lambda: Diarizer.assign_speakers(segments, turns)
+
+
+def bench_assign_speakers_words(ctx: Context, minutes: float):
+    segments, turns = ctx.segments(minutes), ctx.turns(minutes)
+    return lambda: Diarizer.assign_speakers(segments, turns, word_level=True)
+
+
+def bench_speakers_text(ctx: Context, minutes: float):
+    speaker_segments = Diarizer.assign_speakers(ctx.segments(minutes), ctx.turns(minutes))
+    return lambda: Diarizer.get_speakers_text(speaker_segments)
+
+
+def _search(ctx: Context, minutes: float, mode: str, queries: int = 100):
+    index = ctx.vector_index(minutes, mode)
+    vectorizer = Vectorizer(model=ctx.config.vectorizer_model, device="cpu", registry=ctx.registry)
+    texts = [segment['text'] for segment in ctx.segments(minutes)[:queries]]
+    return lambda: [vectorizer.search(text, index=index, top_k=5) for text in texts]
+
+
+def bench_search_exact(ctx: Context, minutes: float):
+    return _search(ctx, minutes, "exact")
+
+
+def bench_search_ivf(ctx: Context, minutes: float):
+    return _search(ctx, minutes, "ivf")
+
+
+def bench_summarize(ctx: Context, minutes: float):
+    summarizer = Summarizer(model=ctx.config.summarizer_model, device="cpu", registry=ctx.registry)
+    text = ctx.transcript(minutes)
+    return lambda: summarizer.summarize_full(text)
+
+
+def bench_read_wav_resample(ctx: Context, minutes: float):
+    path = ctx.wav(minutes, sample_rate=22050)
+    return lambda: AudioConverter.read_wav(path)
+
+
+def bench_detect_speech(ctx: Context, minutes: float):
+    audio = ctx.audio(minutes)
+    return lambda: detect_speech(audio)
+
+
+def bench_split_on_silence(ctx: Context, minutes: float):
+    audio = ctx.audio(minutes)
+    return lambda: split_on_silence(audio)
+
+
+def _diarization_available() -> bool:
+    # Diarizer передает сигнал в pyannote как тензор torch
+    try:
+        import torch  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def bench_pipeline(ctx: Context, minutes: float):
+    from file2text.core.file2text import File2Text
+    
+    path = ctx.wav(minutes)
+    processor = File2Text(
+        config=ctx.config, whisper_model=ctx.config.whisper_model, registry=ctx.registry
+    )
+    diarize = _diarization_available()
+    return lambda: processor.process(path, diarize=diarize, summarize=True, vectorize=True)
+
+
+# (имя, функция, нужен ли сигнал)
+BENCHMARKS = [
+    ("clean_text", bench_clean_text, False),
+    ("split_chunks", bench_split_chunks, False),
+    ("split_chunks_tokens", bench_split_chunks_tokens, False),
+    ("assign_speakers", bench_assign_speakers, False),
+    ("assign_speakers_words", bench_assign_speakers_words, False),
+    ("speakers_text", bench_speakers_text, False),
+    ("search_exact", bench_search_exact, False),
+    ("search_ivf", bench_search_ivf, False),
+    ("summarize_orchestration", bench_summarize, False),
+    ("read_wav_resample", bench_read_wav_resample, True),
+    ("detect_speech", bench_detect_speech, True),
+    ("split_on_silence", bench_split_on_silence, True),
+    ("pipeline", bench_pipeline, True),
+]
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """Лучшее время из repeat запусков."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(args) -> Dict[str, Any]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="file2text-bench-") as workdir:
+        ctx = Context(workdir)
+        for name, bench, needs_audio in BENCHMARKS:
+            if args.only and name not in args.only:
+                continue
+            for minutes in args.minutes:
+                if needs_audio and minutes > args.max_audio_minutes:
+                    continue
+                func = bench(ctx, minutes)
+                seconds = measure(func, args.repeat)
+                results.append({
+                    'name': name,
+                    'minutes': minutes,
+                    'seconds': round(seconds, 6),
+                    'seconds_per_audio_hour': round(seconds * 60 / minutes, 6),
+                })
+                print(f"{name:<24} {minutes:>7g} мин {seconds:>10.4f} с")
+    
+    imports = []
+    if not args.skip_imports:
+        for statement in LIGHT_IMPORTS:
+            try:
+                result = probe(statement)
+            except subprocess.CalledProcessError:
+                continue  # например, не установлен typer для CLI
+            imports.append({'statement': statement, **result})
+            print(f"{statement:<42} {result['seconds']:>8.3f} с  {', '.join(result['heavy']) or '-'}")
+    
+    return {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+        'imports': imports,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta: float) -> List[str]:
+    """Печатает сравнение с базовым запуском и возвращает список регрессий."""
+    previous = {(r['name'], r['minutes']): r['seconds'] for r in baseline.get('results', [])}
+    regressions = []
+    print(f"\n{'бенчмарк':<24} {'мин':>7} {'база, с':>10} {'сейчас, с':>10} {'отношение':>9}")
+    for result in report['results']:
+        key = (result['name'], result['minutes'])
+        if key not in previous:
+            continue
+        old, new = previous[key], result['seconds']
+        ratio = new / old if old > 0 else float("inf")
+        mark = ""
+        if ratio > 1 + tolerance and new - old > min_delta:
+            mark = "  регрессия"
+            regressions.append(f"{result['name']} ({result['minutes']:g} мин): {ratio:.2f}x")
+        print(f"{result['name']:<24} {result['minutes']:>7g} {old:>10.4f} {new:>10.4f} {ratio:>8.2f}x{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки file2text на заглушках моделей")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 10, 60, 600],
+                        help="Длительности синтетических записей, мин")
+    parser.add_argument("--max-audio-minutes", type=float, default=60,
+                        help="Максимальная длительность для бенчмарков с сигналом "
+                             "(10 часов сигнала занимают ~2.3 ГБ памяти)")
+    parser.add_argument("--only", nargs="+", help="Запустить только указанные бенчмарки")
+    parser.add_argument("--repeat", type=int, default=3, help="Повторов замера")
+    parser.add_argument("--output", "-o", help="Сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="JSON базового запуска для сравнения")
+    parser.add_argument("--save-baseline", help="Сохранить результаты как базовый запуск")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Допустимое замедление относительно базового запуска (доля)")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="Замедления меньше этого числа секунд не считаются регрессией")
+    parser.add_argument("--skip-imports", action="store_true", help="Не проверять время импорта")
+    args = parser.parse_args()
+    
+    report = run(args)
+    
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+            print(f"Результаты сохранены в: {path}")
+    
+    failed = False
+    heavy = [entry['statement'] for entry in report['imports'] if entry['heavy']]
+    if heavy:
+        print(f"\nОшибка: тяжелые зависимости загружаются при импорте: {', '.join(heavy)}")
+        failed = True
+    
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare(report, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print(f"\nРегрессии относительно {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            failed = True
+    
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Детерминированные заглушки моделей для бенчмарков.
+
+Заглушки повторяют интерфейсы, которые использует file2text (Whisper,
+пайплайн pyannote, пайплайн суммаризации transformers и SentenceTransformer),
+работают за линейное время без сети и весов и регистрируются в ModelRegistry
+под теми же ключами, что и настоящие модели. Поэтому File2Text и компоненты
+не загружают модели, а бенчмарк измеряет только код file2text.
+"""
+
+import zlib
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from file2text.core.registry import ModelKey, ModelRegistry
+from file2text.utils.config import Config
+
+from synthetic import make_segments, make_turns
+
+
+class StubWhisper:
+    """Заглушка whisper.model.Whisper: сегменты по длительности сигнала."""
+    
+    def transcribe(self, audio: np.ndarray, **params) -> Dict[str, Any]:
+        minutes = len(audio) / 16000 / 60
+        segments = make_segments(minutes, seed=len(audio), words=bool(params.get('word_timestamps')))
+        return {
+            'text': "".join(segment['text'] for segment in segments),
+            'segments': segments,
+            'language': params.get('language') or 'ru',
+        }
+
+
+class StubDiarization:
+    """Заглушка пайплайна pyannote: реплики по длительности сигнала."""
+    
+    def __call__(self, audio: Union[str, Dict[str, Any]]) -> List[tuple]:
+        waveform = audio['waveform']
+        minutes = waveform.shape[-1] / audio['sample_rate'] / 60
+        return make_turns(minutes, seed=int(waveform.shape[-1]))
+
+
+class StubTokenizer:
+    """Заглушка токенизатора: около 4 символов на токен."""
+    
+    model_max_length = 512
+    
+    def __call__(self, texts: Union[str, List[str]], add_special_tokens: bool = True, **kwargs):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        input_ids = [list(range(len(text) // 4 + 1)) for text in texts]
+        return {'input_ids': input_ids[0] if single else input_ids}
+
+
+class StubSummarization:
+    """Заглушка пайплайна суммаризации: первые предложения текста."""
+    
+    def __init__(self):
+        self.tokenizer = StubTokenizer()
+    
+    def __call__(self, texts: Union[str, List[str]], max_length: int = 250, **params) -> List[Dict[str, str]]:
+        if isinstance(texts, str):
+            texts = [texts]
+        # Около 4 символов на токен
+        return [{'summary_text': text[:max_length * 4]} for text in texts]
+
+
+class StubSentenceEncoder:
+    """Заглушка SentenceTransformer: нормированный хэш мешка слов."""
+    
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+    
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, convert_to_numpy: bool = True, **kwargs):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode('utf-8')) % self.dimension] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.maximum(norms, 1e-12)
+        return vectors[0] if single else vectors
+
+
+def make_config(cache_dir: str) -> Config:
+    """Конфигурация для офлайн-бенчмарка: CPU, без кэша результатов."""
+    return Config(
+        huggingface_token="offline-benchmark",
+        whisper_model="stub",
+        whisper_device="cpu",
+        cache_dir=cache_dir,
+        cache_enabled=False,
+    )
+
+
+def install_stubs(registry: ModelRegistry, config: Config):
+    """
+    Регистрирует заглушки под ключами моделей, которые запросят компоненты.
+    
+    Args:
+        registry: Реестр моделей, передаваемый в File2Text или компоненты
+        config: Конфигурация (модели и устройство)
+    """
+    registry.register(ModelKey("whisper", config.whisper_model, config.whisper_device), StubWhisper())
+    registry.register(ModelKey("pyannote", config.diarization_model, "cpu"), StubDiarization())
+    registry.register(ModelKey("summarization", config.summarizer_model, "cpu"), StubSummarization())
+    registry.register(
+        ModelKey("sentence-transformers", config.vectorizer_model, config.whisper_device),
+        StubSentenceEncoder(config.vector_dimension)
+    )
@@ -0,0 +1,131 @@
+"""
+Синтетические данные для бенчмарков: аудио, транскрипты, сегменты и реплики.
+
+Все генераторы детерминированы (зависят только от seed и длительности),
+поэтому результаты разных запусков сравнимы.
+"""
+
+import random
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Темп речи: слов в минуту и средняя длина сегмента Whisper, с
+WORDS_PER_MINUTE = 130
+SEGMENT_SECONDS = 5.0
+
+WORDS = (
+    "проект бюджет отчет встреча клиент сроки задача договор поставка сервер "
+    "релиз команда неделя понедельник пятница решение вопрос предложение план "
+    "результат данные система качество процесс время работа компания условия "
+    "мы они я вы это что как когда потому нужно можно сделать обсудить "
+    "проверить согласовать отправить подготовить уточнить начать закончить"
+).split()
+
+FILLERS = ["да", "ага", "угу", "ну", "вот", "так", "в общем", "значит"]
+
+
+def make_sentence(rng: random.Random) -> str:
+    """Предложение из 4-16 слов с редкими артефактами Whisper (повторами)."""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(4, 16))]
+    if rng.random() < 0.15:
+        words.insert(0, rng.choice(FILLERS))
+    if rng.random() < 0.05:
+        i = rng.randrange(len(words))
+        words[i:i + 1] = [words[i]] * rng.randint(3, 5)
+    sentence = " ".join(words)
+    return sentence[0].upper() + sentence[1:] + rng.choice([".", ".", ".", "?", "!"])
+
+
+def make_transcript(minutes: float, seed: int = 0) -> str:
+    """Транскрипт длительностью около minutes минут (~130 слов в минуту)."""
+    rng = random.Random(seed)
+    target = int(minutes * WORDS_PER_MINUTE)
+    sentences = []
+    count = 0
+    while count < target:
+        sentence = make_sentence(rng)
+        sentences.append(sentence)
+        count += sentence.count(" ") + 1
+    return " ".join(sentences)
+
+
+def make_segments(minutes: float, seed: int = 0, words: bool = True) -> List[Dict[str, Any]]:
+    """
+    Сегменты в формате Whisper для записи длительностью minutes минут.
+    
+    Args:
+        minutes: Длительность записи, мин
+        seed: Зерно генератора
+        words: Добавлять ли временные метки слов
+    
+    Returns:
+        List[Dict]: Сегменты (id, start, end, text и words)
+    """
+    rng = random.Random(seed)
+    total = minutes * 60.0
+    segments = []
+    start = 0.0
+    while start < total:
+        duration = min(rng.uniform(2.0, 2 * SEGMENT_SECONDS - 2.0), total - start)
+        text = make_sentence(rng)
+        segment = {'id': len(segments), 'start': start, 'end': start + duration, 'text': " " + text}
+        if words:
+            tokens = text.split()
+            step = duration / len(tokens)
+            segment['words'] = [
+                {'word': " " + token, 'start': start + k * step, 'end': start + (k + 1) * step}
+                for k, token in enumerate(tokens)
+            ]
+        segments.append(segment)
+        start += duration + rng.uniform(0.0, 0.5)
+    return segments
+
+
+def make_turns(minutes: float, seed: int = 0, speakers: int = 3) -> List[Tuple[float, float, str]]:
+    """Реплики диаризации (start, end, speaker) со сменой спикера каждые 2-20 с."""
+    rng = random.Random(seed + 1)
+    total = minutes * 60.0
+    turns = []
+    start = 0.0
+    speaker = 0
+    while start < total:
+        end = min(start + rng.uniform(2.0, 20.0), total)
+        turns.append((start, end, f"SPEAKER_{speaker:02d}"))
+        speaker = (speaker + rng.randint(1, speakers - 1)) % speakers
+        # Небольшие паузы и перекрытия реплик
+        start = end + rng.uniform(-0.5, 1.0)
+    return turns
+
+
+def make_audio(minutes: float, sample_rate: int = 16000, seed: int = 0) -> np.ndarray:
+    """
+    Речеподобный моно сигнал float32: фразы с гармониками основного тона и
+    слоговой амплитудной модуляцией, разделенные паузами с тихим шумом.
+    
+    Args:
+        minutes: Длительность, мин
+        sample_rate: Частота дискретизации
+        seed: Зерно генератора
+    
+    Returns:
+        np.ndarray: Сигнал в диапазоне [-1, 1]
+    """
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * sample_rate)
+    audio = (rng.standard_normal(total) * 0.002).astype(np.float32)
+    
+    position = int(rng.uniform(0.2, 1.0) * sample_rate)
+    while position < total:
+        length = min(int(rng.uniform(1.0, 8.0) * sample_rate), total - position)
+        t = np.arange(length, dtype=np.float32) / sample_rate
+        f0 = rng.uniform(100.0, 220.0)
+        phrase = np.zeros(length, dtype=np.float32)
+        for harmonic in range(1, 16):
+            phrase += np.sin(2 * np.pi * f0 * harmonic * t, dtype=np.float32) / harmonic
+        syllables = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3.0, 6.0) * t, dtype=np.float32)
+        audio[position:position + length] += 0.1 * phrase * syllables
+        position += length + int(rng.uniform(0.3, 2.0) * sample_rate)
+    
+    np.clip(audio, -1.0, 1.0, out=audio)
+    return audio
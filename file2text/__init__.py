@@ -3,22 +3,48 @@ file2text - Универсальная система для конвертац
 суммаризации и векторизации текста.
 """
 
+import importlib
+
 __version__ = "1.0.0"
 
-try:
-    from file2text.core.file2text import File2Text
-    from file2text.core.transcriber import Transcriber
-    from file2text.core.diarizer import Diarizer
-    from file2text.core.summarizer import Summarizer
-    from file2text.core.vectorizer import Vectorizer
-except ImportError:
-    # Для случаев когда зависимости еще не установлены
-    pass
+# Публичные имена загружаются при первом обращении (PEP 562), чтобы
+# "import file2text" и "from file2text.utils import ..." не импортировали
+# torch, whisper и transformers
+_LAZY_ATTRIBUTES = {
+    "File2Text": "file2text.core.file2text",
+    "StreamEvent": "file2text.core.file2text",
+    "AsyncFile2Text": "file2text.core.async_file2text",
+    "Transcriber": "file2text.core.transcriber",
+    "Diarizer": "file2text.core.diarizer",
+    "Summarizer": "file2text.core.summarizer",
+    "Vectorizer": "file2text.core.vectorizer",
+    "VectorIndex": "file2text.core.vector_index",
+    "ModelRegistry": "file2text.core.registry",
+    "get_model_registry": "file2text.core.registry",
+}
 
 __all__ = [
     "File2Text",
+    "StreamEvent",
+    "AsyncFile2Text",
     "Transcriber",
     "Diarizer",
     "Summarizer",
     "Vectorizer",
+    "VectorIndex",
+    "ModelRegistry",
+    "get_model_registry",
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -5,8 +5,7 @@ from pathlib import Path
 from typing import Optional
 import json
 
-from file2text import File2Text
-from file2text.utils.config import load_config
+from file2text.utils.config import enable_offline_mode, load_config
 
 app = typer.Typer(help="file2text - Конвертация аудио в текст, суммаризация и векторизация")
 
@@ -20,10 +19,20 @@ def process(
     vectorize: bool = typer.Option(False, "--vectorize/--no-vectorize", help="Выполнить векторизацию"),
     output: Optional[str] = typer.Option(None, "--output", "-o", help="Путь для сохранения результатов (JSON)"),
     model: Optional[str] = typer.Option(None, "--model", "-m", help="Модель Whisper (tiny, base, small, medium, large-v2)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Не использовать кэш результатов"),
+    vad: bool = typer.Option(False, "--vad", help="Вырезать тишину и музыку перед транскрипцией"),
+    profile: Optional[str] = typer.Option(None, "--profile", "-p", help="Профиль декодирования (realtime, balanced, archival)"),
+    metrics: bool = typer.Option(False, "--metrics", help="Вывести метрики этапов (время, CPU, память, RTF)"),
+    metrics_file: Optional[str] = typer.Option(None, "--metrics-file", help="Записать метрики этапов в файл Prometheus (.prom)"),
 ):
     """Полный пайплайн обработки аудио файла."""
     try:
+        from file2text import File2Text
+        
         config = load_config()
+        config.cache_enabled = not no_cache
+        config.vad_enabled = vad or config.vad_enabled
+        config.decoding_profile = profile or config.decoding_profile
         processor = File2Text(config=config, whisper_model=model or config.whisper_model, verbose=True)
         
         typer.echo(f"Обработка файла: {audio_path}")
@@ -54,6 +63,17 @@ def process(
                 json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
             typer.echo(f"\nРезультаты сохранены в: {output}")
         
+        if metrics or metrics_file:
+            from file2text.utils.stage_metrics import StageMetricsCollector
+            
+            collector = StageMetricsCollector()
+            collector.add(result.metadata)
+            if metrics:
+                typer.echo(f"\nМетрики этапов:\n{collector.format_table()}")
+            if metrics_file:
+                collector.write_prometheus(metrics_file)
+                typer.echo(f"Метрики сохранены в: {metrics_file}")
+        
     except Exception as e:
         typer.echo(f"Ошибка: {e}", err=True)
         raise typer.Exit(1)
@@ -64,10 +84,18 @@ def transcribe(
     audio_path: str = typer.Argument(..., help="Путь к аудио файлу"),
     output: Optional[str] = typer.Option(None, "--output", "-o", help="Путь для сохранения текста"),
     model: Optional[str] = typer.Option(None, "--model", "-m", help="Модель Whisper"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Не использовать кэш результатов"),
+    vad: bool = typer.Option(False, "--vad", help="Вырезать тишину и музыку перед транскрипцией"),
+    profile: Optional[str] = typer.Option(None, "--profile", "-p", help="Профиль декодирования (realtime, balanced, archival)"),
 ):
     """Только транскрипция аудио в текст."""
     try:
+        from file2text import File2Text
+        
         config = load_config()
+        config.cache_enabled = not no_cache
+        config.vad_enabled = vad or config.vad_enabled
+        config.decoding_profile = profile or config.decoding_profile
         processor = File2Text(config=config, whisper_model=model or config.whisper_model, verbose=True)
         
         typer.echo(f"Транскрипция: {audio_path}")
@@ -88,10 +116,14 @@ def transcribe(
 def summarize(
     text_path: str = typer.Argument(..., help="Путь к текстовому файлу"),
     output: Optional[str] = typer.Option(None, "--output", "-o", help="Путь для сохранения суммаризации"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Не использовать кэш результатов"),
 ):
     """Суммаризация текста."""
     try:
+        from file2text import File2Text
+        
         config = load_config()
+        config.cache_enabled = not no_cache
         processor = File2Text(config=config, verbose=True)
         
         text = Path(text_path).read_text(encoding='utf-8')
@@ -114,12 +146,15 @@ def summarize(
 def vectorize(
     text_path: str = typer.Argument(..., help="Путь к текстовому файлу"),
     output: Optional[str] = typer.Option(None, "--output", "-o", help="Путь для сохранения векторов (.npy)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Не использовать кэш результатов"),
 ):
     """Векторизация текста."""
     try:
         import numpy as np
+        from file2text import File2Text
         
         config = load_config()
+        config.cache_enabled = not no_cache
         processor = File2Text(config=config, verbose=True)
         
         text = Path(text_path).read_text(encoding='utf-8')
@@ -139,5 +174,91 @@ def vectorize(
         raise typer.Exit(1)
 
 
+@app.command()
+def calibrate(
+    reference_dir: str = typer.Argument(..., help="Папка с записями и эталонными расшифровками (<имя>.txt)"),
+    profiles: str = typer.Option("realtime,balanced,archival", "--profiles", help="Профили через запятую"),
+    model: Optional[str] = typer.Option(None, "--model", "-m", help="Модель Whisper"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Путь для сохранения отчета (JSON)"),
+):
+    """Сравнение профилей декодирования: скорость (RTF) и качество (WER)."""
+    try:
+        from file2text.core.calibration import calibrate_profiles
+        
+        config = load_config()
+        reports = calibrate_profiles(
+            reference_dir,
+            profiles=[p.strip() for p in profiles.split(",") if p.strip()],
+            model=model or config.whisper_model,
+            device=config.whisper_device,
+            quantize=config.quantize_int8,
+            cache_dir=config.cache_dir,
+            verbose=True
+        )
+        
+        typer.echo(f"\n{'профиль':<10} {'файлов':>6} {'аудио, с':>9} {'время, с':>9} {'RTF':>7} {'WER':>7}")
+        for report in reports:
+            typer.echo(
+                f"{report.profile:<10} {report.files:>6} {report.audio_seconds:>9.1f} "
+                f"{report.wall_seconds:>9.1f} {report.real_time_factor:>7.3f} "
+                f"{report.word_error_rate:>7.3f}"
+            )
+        
+        if output:
+            with open(output, 'w', encoding='utf-8') as f:
+                json.dump([report.to_dict() for report in reports], f, ensure_ascii=False, indent=2)
+            typer.echo(f"\nОтчет сохранен в: {output}")
+        
+    except Exception as e:
+        typer.echo(f"Ошибка: {e}", err=True)
+        raise typer.Exit(1)
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Адрес для HTTP"),
+    port: int = typer.Option(8765, "--port", help="Порт для HTTP"),
+    socket_path: Optional[str] = typer.Option(None, "--socket", help="Unix-сокет вместо TCP"),
+    workers: int = typer.Option(1, "--workers", "-w", help="Одновременно выполняемых заданий"),
+    queue_size: int = typer.Option(16, "--queue", help="Максимум заданий в очереди"),
+    warm: str = typer.Option("transcribe", "--warm", help="Этапы, модели которых загружаются при запуске (через запятую)"),
+    root: Optional[str] = typer.Option(None, "--root", help="Принимать только файлы из этой папки (по умолчанию - текущая)"),
+    allow_any_path: bool = typer.Option(False, "--allow-any-path", help="Принимать любые файлы, доступные серверу"),
+    model: Optional[str] = typer.Option(None, "--model", "-m", help="Модель Whisper или путь к файлу .pt"),
+    profile: Optional[str] = typer.Option(None, "--profile", "-p", help="Профиль декодирования (realtime, balanced, archival)"),
+    offline: bool = typer.Option(False, "--offline", help="Без сети: модели только из локальных файлов и кэша"),
+):
+    """Сервер с прогретыми моделями: очередь заданий по HTTP, результаты в NDJSON."""
+    try:
+        if root and allow_any_path:
+            raise ValueError("Укажите либо --root, либо --allow-any-path")
+        if offline:
+            enable_offline_mode()
+        
+        from file2text import File2Text
+        from file2text.core.server import serve as run_server
+        
+        config = load_config()
+        config.decoding_profile = profile or config.decoding_profile
+        processor = File2Text(config=config, whisper_model=model or config.whisper_model, verbose=True)
+        
+        run_server(
+            processor,
+            host=host,
+            port=port,
+            socket_path=socket_path,
+            workers=workers,
+            max_queue=queue_size,
+            warm=[stage.strip() for stage in warm.split(",") if stage.strip()],
+            root=root,
+            allow_any_path=allow_any_path,
+            verbose=True
+        )
+        
+    except Exception as e:
+        typer.echo(f"Ошибка: {e}", err=True)
+        raise typer.Exit(1)
+
+
 if __name__ == "__main__":
     app()
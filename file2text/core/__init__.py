@@ -1,15 +1,51 @@
 """Основные модули для обработки аудио и текста."""
 
-from file2text.core.transcriber import Transcriber
-from file2text.core.diarizer import Diarizer
-from file2text.core.summarizer import Summarizer
-from file2text.core.vectorizer import Vectorizer
-from file2text.core.file2text import File2Text
+import importlib
+
+# Классы загружаются при первом обращении (PEP 562)
+_LAZY_ATTRIBUTES = {
+    "Transcriber": "file2text.core.transcriber",
+    "Diarizer": "file2text.core.diarizer",
+    "Summarizer": "file2text.core.summarizer",
+    "Vectorizer": "file2text.core.vectorizer",
+    "VectorIndex": "file2text.core.vector_index",
+    "File2Text": "file2text.core.file2text",
+    "StreamEvent": "file2text.core.file2text",
+    "AsyncFile2Text": "file2text.core.async_file2text",
+    "BatchProcessor": "file2text.core.batch",
+    "BatchReport": "file2text.core.batch",
+    "ProcessingServer": "file2text.core.server",
+    "ModelKey": "file2text.core.registry",
+    "ModelRegistry": "file2text.core.registry",
+    "get_model_registry": "file2text.core.registry",
+}
 
 __all__ = [
     "Transcriber",
     "Diarizer",
     "Summarizer",
     "Vectorizer",
+    "VectorIndex",
     "File2Text",
+    "StreamEvent",
+    "AsyncFile2Text",
+    "BatchProcessor",
+    "BatchReport",
+    "ProcessingServer",
+    "ModelKey",
+    "ModelRegistry",
+    "get_model_registry",
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,295 @@
+"""Асинхронный фасад File2Text для приложений на asyncio."""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from file2text.core.file2text import File2Text, ProcessingResult, _LazyAudio, _stage_timer
+from file2text.core.registry import ModelRegistry
+from file2text.utils.audio_converter import AudioConverter
+from file2text.utils.config import Config
+
+
+class _Cancelled(Exception):
+    """Этап не запускался, так как запрос уже отменен."""
+
+
+class _ModelExecutor:
+    """
+    Пул потоков одной модели.
+    
+    Каждый поток пула получает свой экземпляр File2Text (первый поток - общий
+    экземпляр фасада, остальные - копии с собственным реестром моделей), так
+    как модели Whisper и pyannote не рассчитаны на параллельные вызовы одного
+    экземпляра.
+    """
+    
+    def __init__(self, name: str, processors: List[File2Text]):
+        self.processors = processors
+        self._free: "queue.SimpleQueue[File2Text]" = queue.SimpleQueue()
+        for processor in processors:
+            self._free.put(processor)
+        self._local = threading.local()
+        self.executor = ThreadPoolExecutor(
+            max_workers=len(processors),
+            thread_name_prefix=f"file2text-{name}",
+            initializer=self._init_thread
+        )
+    
+    def _init_thread(self):
+        self._local.processor = self._free.get()
+    
+    def _call(self, func: Callable[[File2Text], Any], cancel: threading.Event) -> Any:
+        # Задача могла дождаться свободного потока уже после отмены запроса
+        if cancel.is_set():
+            raise _Cancelled()
+        return func(self._local.processor)
+    
+    async def run(self, func: Callable[[File2Text], Any], cancel: threading.Event) -> Any:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, self._call, func, cancel)
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+class AsyncFile2Text:
+    """
+    Асинхронный фасад File2Text.
+    
+    Методы process, transcribe, summarize и vectorize - корутины и не
+    блокируют цикл событий: ffmpeg запускается как подпроцесс asyncio, чтение
+    WAV и проверка кэша выполняются в пуле потоков по умолчанию, а этапы с
+    моделями - в отдельных пулах потоков для каждой модели (их размер задается
+    параметрами *_workers). Транскрипция и диаризация, а также суммаризация и
+    векторизация выполняются одновременно.
+    
+    Отмена корутины распространяется на обработку: ffmpeg завершается,
+    ожидающие в очереди этапы не запускаются, а следующие этапы запроса
+    пропускаются. Уже запущенный вызов модели доводится до конца, так как
+    PyTorch не поддерживает прерывание вычислений.
+    """
+    
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        whisper_model: Optional[str] = None,
+        verbose: bool = False,
+        registry: Optional[ModelRegistry] = None,
+        transcribe_workers: int = 1,
+        diarize_workers: int = 1,
+        summarize_workers: int = 1,
+        vectorize_workers: int = 1
+    ):
+        """
+        Инициализация асинхронного фасада.
+        
+        Args:
+            config: Конфигурация. Если None, загружается из переменных окружения
+            whisper_model: Модель Whisper. Если None, берется из конфигурации
+            verbose: Выводить ли подробную информацию
+            registry: Реестр моделей. Если None, используется общий реестр процесса
+            transcribe_workers: Потоки (и копии модели) Whisper
+            diarize_workers: Потоки (и копии модели) pyannote
+            summarize_workers: Потоки (и копии модели) суммаризации
+            vectorize_workers: Потоки (и копии модели) векторизации
+        """
+        self.processor = File2Text(
+            config=config,
+            whisper_model=whisper_model,
+            verbose=verbose,
+            registry=registry
+        )
+        self.config = self.processor.config
+        self.verbose = verbose
+        self._extra_processors: List[File2Text] = []
+        self._executors: Dict[str, _ModelExecutor] = {
+            'transcribe': _ModelExecutor('transcribe', self._worker_processors(transcribe_workers)),
+            'diarize': _ModelExecutor('diarize', self._worker_processors(diarize_workers)),
+            'summarize': _ModelExecutor('summarize', self._worker_processors(summarize_workers)),
+            'vectorize': _ModelExecutor('vectorize', self._worker_processors(vectorize_workers)),
+        }
+    
+    def _worker_processors(self, count: int) -> List[File2Text]:
+        """Экземпляры File2Text для потоков пула модели."""
+        processors = [self.processor]
+        for _ in range(max(1, count) - 1):
+            extra = File2Text(
+                config=self.config,
+                whisper_model=self.processor.whisper_model,
+                verbose=self.verbose,
+                registry=ModelRegistry()
+            )
+            self._extra_processors.append(extra)
+            processors.append(extra)
+        return processors
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Дожидается запущенных этапов и освобождает модели."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close)
+    
+    def close(self):
+        """Останавливает пулы потоков и освобождает модели (блокирующий вызов)."""
+        for executor in self._executors.values():
+            executor.shutdown()
+        self.processor.close()
+        for processor in self._extra_processors:
+            processor.close()
+            processor.registry.evict(force=True)
+        self._extra_processors = []
+    
+    @staticmethod
+    async def _blocking(func: Callable[[], Any]) -> Any:
+        """Выполняет короткую блокирующую операцию (хэш файла, кэш) в пуле по умолчанию."""
+        return await asyncio.get_running_loop().run_in_executor(None, func)
+    
+    @staticmethod
+    async def _gather(coroutines: List[Any], cancel: threading.Event) -> List[Any]:
+        """
+        Выполняет этапы одновременно; если один из них завершился ошибкой
+        (или запрос отменен), остальные отменяются.
+        
+        Этапы, ожидающие свободного потока, не запускаются; уже запущенный
+        вызов модели доводится до конца в своем потоке.
+        """
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            cancel.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    
+    async def _decode(self, result: ProcessingResult) -> _LazyAudio:
+        """Декодирует файл, не блокируя цикл событий."""
+        if self.config.in_memory_decode:
+            audio = await AudioConverter.adecode_to_array(result.audio_path)
+            result.metadata['audio_duration'] = len(audio) / 16000.0
+        else:
+            audio = await self._blocking(lambda: self.processor._convert_stage(result))
+        return _LazyAudio.from_array(audio)
+    
+    async def process(
+        self,
+        audio_path: str,
+        transcribe: bool = True,
+        diarize: bool = False,
+        summarize: bool = False,
+        vectorize: bool = False,
+        word_level_speakers: bool = False,
+        **kwargs
+    ) -> ProcessingResult:
+        """
+        Полный пайплайн обработки (см. File2Text.process).
+        
+        Args:
+            audio_path: Путь к аудио или видео файлу
+            transcribe: Выполнить транскрипцию
+            diarize: Выполнить диаризацию спикеров
+            summarize: Выполнить суммаризацию
+            vectorize: Выполнить векторизацию
+            word_level_speakers: Назначать спикеров по словам
+            **kwargs: Дополнительные параметры для транскрипции
+        
+        Returns:
+            ProcessingResult: Результат обработки
+        """
+        started = time.perf_counter()
+        cancel = threading.Event()
+        result = ProcessingResult(audio_path=audio_path)
+        kwargs = self.processor._transcribe_kwargs(kwargs, word_level_speakers)
+        
+        try:
+            needs_audio = await self._blocking(
+                lambda: self.processor._needs_audio(result, transcribe=transcribe, diarize=diarize, **kwargs)
+            )
+            if needs_audio:
+                with _stage_timer(result, 'convert'):
+                    audio = await self._decode(result)
+            else:
+                audio = self.processor._audio_source(result)
+            
+            def transcribe_stage(processor: File2Text):
+                with _stage_timer(result, 'transcribe'):
+                    processor._transcribe_stage(result, audio, **kwargs)
+            
+            def diarization_turns(processor: File2Text):
+                with _stage_timer(result, 'diarize'):
+                    return processor._diarization_turns(result, audio)
+            
+            if transcribe and diarize and self.config.parallel_stages:
+                _, turns = await self._gather([
+                    self._executors['transcribe'].run(transcribe_stage, cancel),
+                    self._executors['diarize'].run(diarization_turns, cancel),
+                ], cancel)
+                if result.segments:
+                    with _stage_timer(result, 'assign_speakers'):
+                        await self._blocking(lambda: self.processor._assign_speakers_stage(
+                            result, turns, word_level=word_level_speakers
+                        ))
+            else:
+                if transcribe:
+                    await self._executors['transcribe'].run(transcribe_stage, cancel)
+                if diarize:
+                    def diarize_stage(processor: File2Text):
+                        with _stage_timer(result, 'diarize'):
+                            processor._diarize_stage(result, audio, word_level=word_level_speakers)
+                    await self._executors['diarize'].run(diarize_stage, cancel)
+            
+            audio.release()
+            
+            def summarize_stage(processor: File2Text):
+                with _stage_timer(result, 'summarize'):
+                    processor._summarize_stage(result)
+            
+            def vectorize_stage(processor: File2Text):
+                with _stage_timer(result, 'vectorize'):
+                    processor._vectorize_stage(result)
+            
+            postprocess = []
+            if summarize:
+                postprocess.append(self._executors['summarize'].run(summarize_stage, cancel))
+            if vectorize:
+                postprocess.append(self._executors['vectorize'].run(vectorize_stage, cancel))
+            if postprocess:
+                await self._gather(postprocess, cancel)
+        except BaseException:
+            # Ошибка или отмена: оставшиеся этапы запроса не запускаются
+            cancel.set()
+            raise
+        
+        result.metadata.setdefault('timings', {})['total'] = round(time.perf_counter() - started, 3)
+        return result
+    
+    async def transcribe(self, audio_path: str, **kwargs) -> str:
+        """Только транскрипция аудио или видео файла."""
+        result = await self.process(audio_path, transcribe=True, **kwargs)
+        return result.text
+    
+    async def summarize(self, text: str, **kwargs) -> str:
+        """Только суммаризация текста."""
+        return await self._executors['summarize'].run(
+            lambda processor: processor.summarize(text, **kwargs), threading.Event()
+        )
+    
+    async def vectorize(self, text: str) -> Any:
+        """Только векторизация текста."""
+        return await self._executors['vectorize'].run(
+            lambda processor: processor.vectorize(text), threading.Event()
+        )
@@ -0,0 +1,473 @@
+"""Конвейерная пакетная обработка нескольких файлов."""
+
+import hashlib
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from file2text.core.file2text import File2Text, ProcessingResult
+from file2text.core.registry import ModelRegistry
+from file2text.utils.job_ledger import Checkpoint, JobLedger
+from file2text.utils.stage_metrics import measure_stage
+
+
+_DONE = object()
+
+# Период проверки флага остановки при ожидании очередей конвейера, с
+_POLL_SECONDS = 0.1
+
+
+def _put(target: "queue.Queue", item: Any, stop: threading.Event) -> bool:
+    """Кладет элемент в очередь; False, если конвейер остановлен раньше."""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(source: "queue.Queue", stop: threading.Event) -> Any:
+    """Берет элемент из очереди; None, если конвейер остановлен раньше."""
+    while not stop.is_set():
+        try:
+            return source.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            continue
+    return None
+
+
+def _release(item: Any):
+    """Освобождает сигнал элемента, который не дойдет до конца конвейера."""
+    if isinstance(item, BatchItem) and item.audio is not None:
+        item.audio.release()
+
+# Поля результата, которые сохраняет контрольная точка этапа в журнале
+_CHECKPOINT_FIELDS = {
+    'transcribed': ('text', 'segments'),
+    'diarized': ('speaker_segments', 'speakers'),
+    'summarized': ('summary',),
+    'vectorized': ('vector_segments',),
+}
+_CHECKPOINT_METADATA = ('audio_duration', 'language', 'converted_audio_path', 'original_path')
+
+
+@dataclass
+class BatchItem:
+    """Файл в пакетной обработке и его результат."""
+    path: str
+    result: ProcessingResult
+    audio: Any = None
+    audio_seconds: Optional[float] = None
+    error: Optional[str] = None
+    checkpoints: Dict[str, Checkpoint] = field(default_factory=dict)
+    
+    @property
+    def success(self) -> bool:
+        return self.error is None
+    
+    def restore(self, stage: str) -> bool:
+        """
+        Восстанавливает результат этапа из контрольной точки журнала.
+        
+        Returns:
+            bool: True, если контрольная точка была и этап можно пропустить
+        """
+        checkpoint = self.checkpoints.get(stage)
+        if checkpoint is None:
+            return False
+        for name in _CHECKPOINT_FIELDS[stage]:
+            setattr(self.result, name, checkpoint.data[name])
+        for name, value in checkpoint.data.get('metadata', {}).items():
+            self.result.metadata.setdefault(name, value)
+        if stage == 'vectorized':
+            self.result.vectors = checkpoint.array
+        self.result.metadata.setdefault('resumed_stages', []).append(stage)
+        return True
+    
+    def save_checkpoint(self, ledger: Optional[JobLedger], stage: str, fingerprints: Dict[str, str]):
+        """Сохраняет результат этапа в журнал (если он задан)."""
+        if ledger is None:
+            return
+        data = {name: getattr(self.result, name) for name in _CHECKPOINT_FIELDS[stage]}
+        data['metadata'] = {
+            name: self.result.metadata[name]
+            for name in _CHECKPOINT_METADATA if name in self.result.metadata
+        }
+        array = self.result.vectors if stage == 'vectorized' else None
+        ledger.checkpoint(self.path, stage, data, array, fingerprint=fingerprints[stage])
+
+
+@dataclass
+class BatchReport:
+    """Отчет о пропускной способности пакетной обработки."""
+    files_total: int = 0
+    files_failed: int = 0
+    wall_seconds: float = 0.0
+    audio_seconds: float = 0.0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    
+    @property
+    def files_per_hour(self) -> float:
+        """Обработано файлов в час."""
+        if self.wall_seconds <= 0:
+            return 0.0
+        return (self.files_total - self.files_failed) * 3600.0 / self.wall_seconds
+    
+    @property
+    def audio_seconds_per_second(self) -> float:
+        """Секунд аудио на секунду реального времени."""
+        if self.wall_seconds <= 0:
+            return 0.0
+        return self.audio_seconds / self.wall_seconds
+    
+    def format(self) -> str:
+        """Текстовое представление отчета."""
+        lines = [
+            f"Файлов: {self.files_total} (ошибок: {self.files_failed})",
+            f"Время: {self.wall_seconds:.1f} с, аудио: {self.audio_seconds:.1f} с",
+            f"Пропускная способность: {self.files_per_hour:.1f} файлов/ч, "
+            f"{self.audio_seconds_per_second:.2f} с аудио/с",
+        ]
+        for stage, seconds in self.stage_seconds.items():
+            lines.append(f"  {stage}: {seconds:.1f} с суммарно")
+        return "\n".join(lines)
+
+
+class _Stage:
+    """Этап конвейера: пул потоков между двумя очередями."""
+    
+    def __init__(
+        self,
+        name: str,
+        handlers: List[Callable[[BatchItem], None]],
+        in_queue: "queue.Queue",
+        out_queue: "queue.Queue",
+        report: BatchReport,
+        report_lock: threading.Lock,
+        stop: threading.Event
+    ):
+        self.name = name
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self._stop = stop
+        self._report = report
+        self._report_lock = report_lock
+        self._alive = len(handlers)
+        self._alive_lock = threading.Lock()
+        self._threads = [
+            threading.Thread(
+                target=self._run,
+                args=(handler,),
+                name=f"file2text-{name}-{i}",
+                daemon=True
+            )
+            for i, handler in enumerate(handlers)
+        ]
+    
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+    
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+    
+    def _run(self, handler: Callable[[BatchItem], None]):
+        while True:
+            item = _get(self.in_queue, self._stop)
+            if item is None:
+                return
+            if item is _DONE:
+                # Возвращаем маркер для остальных потоков этапа; последний
+                # завершившийся поток передает его следующему этапу
+                _put(self.in_queue, _DONE, self._stop)
+                with self._alive_lock:
+                    self._alive -= 1
+                    last = self._alive == 0
+                if last:
+                    _put(self.out_queue, _DONE, self._stop)
+                return
+            
+            if item.error is None:
+                with measure_stage(item.result.metadata, self.name):
+                    try:
+                        handler(item)
+                    except Exception as e:
+                        item.error = str(e)
+                        if item.audio is not None:
+                            item.audio.release()
+                elapsed = item.result.metadata['stages'][self.name]['wall_seconds']
+                with self._report_lock:
+                    self._report.stage_seconds[self.name] = (
+                        self._report.stage_seconds.get(self.name, 0.0) + elapsed
+                    )
+            
+            if not _put(self.out_queue, item, self._stop):
+                _release(item)
+                return
+
+
+class BatchProcessor:
+    """
+    Конвейерная обработка нескольких файлов.
+    
+    Файлы проходят этапы convert -> transcribe -> diarize -> postprocess
+    (суммаризация и векторизация). Каждый этап обслуживается своим пулом
+    потоков, а этапы соединены ограниченными очередями, поэтому пока Whisper
+    транскрибирует один файл, ffmpeg уже декодирует следующие, а диаризация
+    и суммаризация обрабатывают предыдущие.
+    
+    Первый поток каждого этапа с моделями использует модели переданного
+    File2Text. Дополнительные потоки (workers > 1) получают собственные копии
+    моделей, так как модели Whisper и pyannote не рассчитаны на параллельные
+    вызовы одного экземпляра. Копии переиспользуются следующими вызовами
+    process() и освобождаются в close().
+    """
+    
+    def __init__(
+        self,
+        processor: File2Text,
+        decode_workers: int = 2,
+        transcribe_workers: int = 1,
+        diarize_workers: int = 1,
+        postprocess_workers: int = 1,
+        queue_size: int = 2
+    ):
+        """
+        Инициализация пакетного обработчика.
+        
+        Args:
+            processor: Экземпляр File2Text
+            decode_workers: Потоки конвертации через ffmpeg
+            transcribe_workers: Потоки транскрипции
+            diarize_workers: Потоки диаризации
+            postprocess_workers: Потоки суммаризации и векторизации
+            queue_size: Размер очереди между этапами. Ограничивает число
+                        декодированных, но еще не обработанных файлов
+        """
+        self.processor = processor
+        self.decode_workers = max(1, decode_workers)
+        self.transcribe_workers = max(1, transcribe_workers)
+        self.diarize_workers = max(1, diarize_workers)
+        self.postprocess_workers = max(1, postprocess_workers)
+        self.queue_size = max(1, queue_size)
+        self.report = BatchReport()
+        # Копии File2Text дополнительных потоков по этапам
+        self._extra_processors: Dict[str, List[File2Text]] = {}
+    
+    def _worker_processors(self, stage: str, count: int) -> List[File2Text]:
+        """Экземпляры File2Text для потоков этапа с моделями (копии создаются один раз)."""
+        extras = self._extra_processors.setdefault(stage, [])
+        while len(extras) < count - 1:
+            extras.append(File2Text(
+                config=self.processor.config,
+                whisper_model=self.processor.whisper_model,
+                verbose=self.processor.verbose,
+                registry=ModelRegistry()
+            ))
+        return [self.processor] + extras[:count - 1]
+    
+    def process(
+        self,
+        paths: Iterable[str],
+        diarize: bool = False,
+        summarize: bool = False,
+        vectorize: bool = False,
+        word_level_speakers: bool = False,
+        ledger: Optional[JobLedger] = None,
+        **kwargs
+    ) -> Iterator[BatchItem]:
+        """
+        Обрабатывает файлы и выдает результаты по мере готовности.
+        
+        Порядок результатов может не совпадать с порядком файлов. После
+        завершения итерации в self.report находится отчет о пропускной
+        способности. Если итерация прервана раньше (break, исключение,
+        close() генератора), конвейер останавливается: потоки этапов
+        дорабатывают текущий файл и завершаются, необработанные файлы
+        отбрасываются.
+        
+        Args:
+            paths: Пути к аудио или видео файлам. Читаются по мере
+                   освобождения места во входной очереди, поэтому могут
+                   поступать долго (см. file2text.utils.folder_watcher)
+            diarize: Выполнить диаризацию спикеров
+            summarize: Выполнить суммаризацию
+            vectorize: Выполнить векторизацию
+            word_level_speakers: Назначать спикеров по словам
+            ledger: Журнал заданий. Если задан, результат каждого этапа
+                    сохраняется в нем, а этапы, завершенные в прошлом
+                    запуске, не выполняются повторно (их список - в
+                    metadata['resumed_stages'])
+            **kwargs: Дополнительные параметры для транскрипции
+        
+        Yields:
+            BatchItem: Файл с результатом обработки или текстом ошибки
+        """
+        self.report = BatchReport()
+        report_lock = threading.Lock()
+        kwargs = self.processor._transcribe_kwargs(kwargs, word_level_speakers)
+        fingerprints = self._fingerprints(diarize, word_level_speakers, kwargs)
+        
+        def convert(item: BatchItem):
+            if ledger is not None:
+                item.checkpoints = ledger.start(item.path, fingerprints)
+            item.audio = self.processor._audio_source(item.result)
+            # Декодируем заранее, только если результатов нет в журнале и кэше
+            if self.processor._needs_audio(
+                item.result,
+                transcribe='transcribed' not in item.checkpoints,
+                diarize=diarize and 'diarized' not in item.checkpoints,
+                **kwargs
+            ):
+                item.audio.get()
+            item.audio_seconds = item.result.metadata.get('audio_duration')
+        
+        def transcribe_handler(processor: File2Text):
+            def handler(item: BatchItem):
+                if not item.restore('transcribed'):
+                    processor._transcribe_stage(item.result, item.audio, **kwargs)
+                    item.save_checkpoint(ledger, 'transcribed', fingerprints)
+            return handler
+        
+        def diarize_handler(processor: File2Text):
+            def handler(item: BatchItem):
+                if diarize and not item.restore('diarized'):
+                    processor._diarize_stage(
+                        item.result, item.audio, word_level=word_level_speakers
+                    )
+                    item.save_checkpoint(ledger, 'diarized', fingerprints)
+                item.audio.release()
+                item.audio_seconds = item.result.metadata.get('audio_duration')
+            return handler
+        
+        def postprocess_handler(processor: File2Text):
+            def handler(item: BatchItem):
+                if summarize and not item.restore('summarized'):
+                    processor._summarize_stage(item.result)
+                    item.save_checkpoint(ledger, 'summarized', fingerprints)
+                if vectorize and not item.restore('vectorized'):
+                    processor._vectorize_stage(item.result)
+                    item.save_checkpoint(ledger, 'vectorized', fingerprints)
+            return handler
+        
+        stage_specs = [
+            ("convert", [convert] * self.decode_workers),
+            ("transcribe", [transcribe_handler(p) for p in
+                            self._worker_processors("transcribe", self.transcribe_workers)]),
+            ("diarize", [diarize_handler(p) for p in
+                         self._worker_processors("diarize", self.diarize_workers if diarize else 1)]),
+            ("postprocess", [postprocess_handler(p) for p in
+                             self._worker_processors("postprocess", self.postprocess_workers)]),
+        ]
+        
+        # Очереди на входе и между этапами ограничены, выходная - нет
+        queues = [queue.Queue(maxsize=self.queue_size)]
+        queues += [queue.Queue(maxsize=self.queue_size) for _ in stage_specs[:-1]]
+        queues.append(queue.Queue())
+        
+        stop = threading.Event()
+        stages = [
+            _Stage(name, handlers, queues[i], queues[i + 1], self.report, report_lock, stop)
+            for i, (name, handlers) in enumerate(stage_specs)
+        ]
+        
+        started = time.perf_counter()
+        for stage in stages:
+            stage.start()
+        
+        # Пути читаются в отдельном потоке: paths может быть бесконечным
+        # источником (например, FolderWatcher), а результаты выдаются по мере
+        # готовности. После остановки конвейера поток завершается, как только
+        # источник выдаст следующий путь
+        feed_errors: List[BaseException] = []
+        
+        def feed():
+            try:
+                for path in paths:
+                    item = BatchItem(path=str(path), result=ProcessingResult(audio_path=str(path)))
+                    if not _put(queues[0], item, stop):
+                        return
+                    with report_lock:
+                        self.report.files_total += 1
+            except BaseException as e:
+                feed_errors.append(e)
+            finally:
+                _put(queues[0], _DONE, stop)
+        
+        threading.Thread(target=feed, name="file2text-feed", daemon=True).start()
+        
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _DONE:
+                    if feed_errors:
+                        raise feed_errors[0]
+                    break
+                
+                if item.error is not None:
+                    self.report.files_failed += 1
+                    if ledger is not None:
+                        ledger.fail(item.path, item.error)
+                elif item.audio_seconds:
+                    self.report.audio_seconds += item.audio_seconds
+                self.report.wall_seconds = time.perf_counter() - started
+                
+                yield item
+        finally:
+            # При досрочном выходе останавливаем этапы и освобождаем сигналы
+            # файлов, оставшихся в очередях
+            stop.set()
+            for stage in stages:
+                stage.join()
+            for pending in queues:
+                while True:
+                    try:
+                        _release(pending.get_nowait())
+                    except queue.Empty:
+                        break
+            self.report.wall_seconds = time.perf_counter() - started
+    
+    def _fingerprints(
+        self,
+        diarize: bool,
+        word_level_speakers: bool,
+        kwargs: Dict[str, Any]
+    ) -> Dict[str, str]:
+        """
+        Fingerprint каждого этапа журнала заданий.
+        
+        Берутся те же модели и параметры, что входят в ключи кэша этапа, и
+        fingerprint этапов, от результатов которых он зависит: суммаризация и
+        векторизация работают с репликами спикеров, если диаризация включена.
+        Поэтому смена параметров этапа сбрасывает его контрольную точку и
+        точки зависимых этапов, но не предыдущих.
+        """
+        params = self.processor._stage_fingerprint(kwargs)
+        
+        def digest(*parts: Any) -> str:
+            payload = json.dumps(parts, sort_keys=True, default=str)
+            return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+        
+        transcribed = digest(params['transcribe'])
+        diarized = digest(transcribed, params['diarize'], word_level_speakers)
+        speech = diarized if diarize else transcribed
+        return {
+            'transcribed': transcribed,
+            'diarized': diarized,
+            'summarized': digest(speech, params['summarize']),
+            'vectorized': digest(speech, params['vectorize']),
+        }
+    
+    def close(self):
+        """Освобождает модели дополнительных потоков."""
+        for extras in self._extra_processors.values():
+            for processor in extras:
+                processor.close()
+                processor.registry.evict(force=True)
+        self._extra_processors = {}
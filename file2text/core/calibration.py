@@ -0,0 +1,150 @@
+"""Калибровка профилей декодирования Whisper на эталонном наборе записей."""
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from file2text.core.registry import ModelRegistry
+from file2text.core.transcriber import DECODING_PROFILES, Transcriber
+from file2text.utils.audio_converter import AudioConverter
+from file2text.utils.evaluation import tokenize_words, word_error_rate
+
+
+@dataclass
+class ProfileReport:
+    """Скорость и качество одного профиля декодирования."""
+    profile: str
+    files: int = 0
+    audio_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    reference_words: int = 0
+    word_errors: float = 0.0
+    
+    @property
+    def real_time_factor(self) -> float:
+        """Время обработки на секунду аудио (меньше 1 - быстрее реального времени)."""
+        if self.audio_seconds <= 0:
+            return 0.0
+        return self.wall_seconds / self.audio_seconds
+    
+    @property
+    def word_error_rate(self) -> float:
+        """WER по всему набору (ошибки всех файлов на все слова эталонов)."""
+        if self.reference_words <= 0:
+            return 0.0
+        return self.word_errors / self.reference_words
+    
+    def to_dict(self) -> dict:
+        return {
+            'profile': self.profile,
+            'files': self.files,
+            'audio_seconds': round(self.audio_seconds, 3),
+            'wall_seconds': round(self.wall_seconds, 3),
+            'real_time_factor': round(self.real_time_factor, 4),
+            'word_error_rate': round(self.word_error_rate, 4),
+        }
+
+
+def find_reference_pairs(reference_dir: str) -> List[Tuple[Path, Path]]:
+    """
+    Находит записи с эталонными расшифровками.
+    
+    Эталон записи - текстовый файл с тем же именем и расширением .txt
+    (например, interview.mp3 и interview.txt).
+    
+    Args:
+        reference_dir: Папка эталонного набора
+    
+    Returns:
+        List[Tuple[Path, Path]]: Пары (аудио или видео файл, эталонный текст)
+    """
+    pairs = []
+    for path in sorted(Path(reference_dir).iterdir()):
+        reference = path.with_suffix('.txt')
+        if path.is_file() and AudioConverter.is_media_file(str(path)) and reference.exists():
+            pairs.append((path, reference))
+    return pairs
+
+
+def calibrate_profiles(
+    reference_dir: str,
+    profiles: Optional[Sequence[str]] = None,
+    model: str = "medium",
+    device: Optional[str] = None,
+    language: str = "ru",
+    quantize: bool = False,
+    cache_dir: Optional[str] = None,
+    registry: Optional[ModelRegistry] = None,
+    verbose: bool = False
+) -> List[ProfileReport]:
+    """
+    Прогоняет профили декодирования на эталонном наборе.
+    
+    Каждая запись декодируется один раз и транскрибируется всеми профилями
+    одной загруженной моделью. Время декодирования файла в замер не входит.
+    
+    Args:
+        reference_dir: Папка с записями и эталонными расшифровками (см.
+                       find_reference_pairs)
+        profiles: Имена профилей. Если None, все профили DECODING_PROFILES
+        model: Модель Whisper
+        device: Устройство для обработки
+        language: Язык записей
+        quantize: Квантовать модель в int8 (только для CPU)
+        cache_dir: Папка кэша для квантованной модели
+        registry: Реестр моделей. Если None, используется общий реестр процесса
+        verbose: Выводить ли прогресс
+    
+    Returns:
+        List[ProfileReport]: Отчеты в порядке profiles
+    """
+    profiles = list(profiles or DECODING_PROFILES)
+    pairs = find_reference_pairs(reference_dir)
+    if not pairs:
+        raise FileNotFoundError(
+            f"В папке {reference_dir} нет записей с эталонными расшифровками (<имя>.txt)"
+        )
+    
+    transcribers = {
+        profile: Transcriber(
+            model=model,
+            device=device,
+            registry=registry,
+            quantize=quantize,
+            cache_dir=cache_dir,
+            profile=profile
+        )
+        for profile in profiles
+    }
+    reports = {profile: ProfileReport(profile=profile) for profile in profiles}
+    
+    try:
+        for audio_path, reference_path in pairs:
+            audio = AudioConverter.decode_to_array(str(audio_path))
+            audio_seconds = len(audio) / 16000
+            reference = reference_path.read_text(encoding='utf-8')
+            reference_words = len(tokenize_words(reference))
+            
+            for profile, transcriber in transcribers.items():
+                started = time.perf_counter()
+                text = transcriber.transcribe(audio, language=language)['text']
+                elapsed = time.perf_counter() - started
+                
+                report = reports[profile]
+                report.files += 1
+                report.audio_seconds += audio_seconds
+                report.wall_seconds += elapsed
+                report.reference_words += reference_words
+                report.word_errors += word_error_rate(reference, text) * reference_words
+                
+                if verbose:
+                    print(
+                        f"{audio_path.name} [{profile}]: {elapsed:.1f} с, "
+                        f"WER {word_error_rate(reference, text):.3f}"
+                    )
+    finally:
+        for transcriber in transcribers.values():
+            transcriber.close()
+    
+    return [reports[profile] for profile in profiles]
@@ -1,8 +1,65 @@
 """Модуль для диаризации спикеров в аудио."""
 
 import os
-from typing import Dict, List, Optional, Any
-from pyannote.audio import Pipeline
+import heapq
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple, Union
+
+import numpy as np
+
+from file2text.core.registry import ModelKey, ModelRegistry, get_model_registry
+
+
+def _best_overlap_speakers(
+    intervals: List[Tuple[float, float]],
+    turns: List[Tuple[float, float, str]]
+) -> List[Optional[str]]:
+    """
+    Для каждого интервала находит спикера с максимальным перекрытием.
+    
+    Интервалы обходятся по возрастанию начала; реплики добавляются в кучу
+    активных по мере начала и удаляются из нее по окончании, поэтому каждая
+    реплика обрабатывается один раз.
+    
+    Args:
+        intervals: Список интервалов (start, end)
+        turns: Реплики (start, end, speaker), отсортированные по start
+        
+    Returns:
+        List[Optional[str]]: Спикер для каждого интервала (None, если
+                             интервал не пересекается ни с одной репликой)
+    """
+    speakers: List[Optional[str]] = [None] * len(intervals)
+    order = sorted(range(len(intervals)), key=lambda i: intervals[i][0])
+    active: List[Tuple[float, int]] = []  # куча (end, индекс реплики)
+    next_turn = 0
+    
+    for i in order:
+        start, end = intervals[i]
+        
+        while next_turn < len(turns) and turns[next_turn][0] <= end:
+            heapq.heappush(active, (turns[next_turn][1], next_turn))
+            next_turn += 1
+        
+        while active and active[0][0] < start:
+            heapq.heappop(active)
+        
+        # Суммарное перекрытие по спикерам; при равенстве побеждает
+        # спикер, чья реплика началась раньше
+        overlaps: Dict[str, float] = {}
+        first_turn: Dict[str, int] = {}
+        for turn_end, k in active:
+            turn_start, _, speaker = turns[k]
+            if turn_start > end:
+                continue
+            overlap = min(end, turn_end) - max(start, turn_start)
+            overlaps[speaker] = overlaps.get(speaker, 0.0) + overlap
+            first_turn[speaker] = min(first_turn.get(speaker, k), k)
+        
+        if overlaps:
+            speakers[i] = max(overlaps, key=lambda spk: (overlaps[spk], -first_turn[spk]))
+    
+    return speakers
 
 
 class Diarizer:
@@ -11,7 +68,9 @@ class Diarizer:
     def __init__(
         self,
         auth_token: Optional[str] = None,
-        verbose: bool = False
+        verbose: bool = False,
+        registry: Optional[ModelRegistry] = None,
+        model: str = "pyannote/speaker-diarization"
     ):
         """
         Инициализация диаризатора.
@@ -20,64 +79,136 @@ class Diarizer:
             auth_token: Hugging Face токен для доступа к модели диаризации.
                       Если None, берется из переменной окружения HUGGINGFACE_TOKEN
             verbose: Выводить ли подробную информацию
+            registry: Реестр моделей. Если None, используется общий реестр процесса
+            model: Модель диаризации на Hugging Face или путь к локальному
+                   config.yaml пайплайна (для работы без сети токен не нужен)
         """
         self.verbose = verbose
+        self.registry = registry or get_model_registry()
         
         # Получаем токен
         if not auth_token:
             auth_token = os.getenv("HUGGINGFACE_TOKEN")
         
-        if not auth_token:
+        if not auth_token and not Path(model).exists():
             raise ValueError(
                 "HUGGINGFACE_TOKEN не установлен. "
                 "Установите переменную окружения HUGGINGFACE_TOKEN или "
                 "передайте auth_token при инициализации."
             )
         
+        self._auth_token = auth_token
+        self._model_key = ModelKey("pyannote", model, "cpu")
+        self.pipeline = self.registry.acquire(self._model_key, self._load_pipeline)
+    
+    def _load_pipeline(self):
+        """Загружает пайплайн диаризации (вызывается реестром один раз на ключ)."""
         if self.verbose:
             print("Загрузка модели диаризации...")
         
-        # Загружаем модель диаризации
-        self.pipeline = Pipeline.from_pretrained(
-            "pyannote/speaker-diarization",
-            use_auth_token=auth_token
+        from pyannote.audio import Pipeline
+        
+        pipeline = Pipeline.from_pretrained(
+            self._model_key.name,
+            use_auth_token=self._auth_token
         )
         
         if self.verbose:
             print("Модель диаризации загружена")
+        
+        return pipeline
+    
+    def close(self):
+        """Освобождает модель в реестре (повторный вызов безопасен)."""
+        if self.pipeline is not None:
+            self.registry.release(self._model_key)
+            self.pipeline = None
     
-    def diarize(self, audio_path: str) -> Any:
+    def diarize(
+        self,
+        audio_path: Union[str, np.ndarray],
+        sample_rate: int = 16000,
+        num_speakers: Optional[int] = None
+    ) -> Any:
         """
         Выполняет диаризацию спикеров в аудио файле.
         
         Args:
-            audio_path: Путь к аудио файлу
+            audio_path: Путь к аудио файлу или уже декодированный моно сигнал float32
+            sample_rate: Частота дискретизации сигнала (если передан массив)
+            num_speakers: Известное число спикеров (None - определяется моделью)
             
         Returns:
             Результат диаризации от pyannote.audio
         """
-        if self.verbose:
-            print(f"Начинаю диаризацию: {audio_path}")
+        if isinstance(audio_path, np.ndarray):
+            import torch
+            
+            if self.verbose:
+                print(f"Начинаю диаризацию сигнала: {len(audio_path) / sample_rate:.1f} с")
+            audio = {
+                "waveform": torch.from_numpy(audio_path).unsqueeze(0),
+                "sample_rate": sample_rate
+            }
+        else:
+            if self.verbose:
+                print(f"Начинаю диаризацию: {audio_path}")
+            audio = audio_path
         
-        diarization = self.pipeline(audio_path)
+        if num_speakers:
+            diarization = self.pipeline(audio, num_speakers=num_speakers)
+        else:
+            diarization = self.pipeline(audio)
         
         if self.verbose:
             print("Диаризация завершена")
         
         return diarization
     
+    @staticmethod
+    def get_turns(diarization: Any) -> List[Tuple[float, float, str]]:
+        """
+        Извлекает реплики спикеров из результата диаризации.
+        
+        Args:
+            diarization: Результат диаризации от pyannote.audio или уже
+                        готовый список кортежей (start, end, speaker)
+            
+        Returns:
+            List[Tuple[float, float, str]]: Реплики, отсортированные по времени начала
+        """
+        if hasattr(diarization, 'itertracks'):
+            turns = [
+                (float(turn.start), float(turn.end), spk)
+                for turn, _, spk in diarization.itertracks(yield_label=True)
+            ]
+        else:
+            turns = [(float(start), float(end), spk) for start, end, spk in diarization]
+        
+        turns.sort(key=lambda t: t[0])
+        return turns
+    
+    @staticmethod
     def assign_speakers(
-        self,
         transcript_segments: List[Dict[str, Any]],
-        diarization: Any
+        diarization: Any,
+        word_level: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Сопоставляет спикеров с сегментами транскрипции.
         
+        Каждому сегменту назначается спикер с максимальным суммарным перекрытием
+        по времени. Сопоставление выполняется одним проходом по отсортированным
+        сегментам и репликам за O((n + m) log m).
+        
         Args:
             transcript_segments: Список сегментов транскрипции с ключами:
-                                start, end, text
-            diarization: Результат диаризации от pyannote.audio
+                                start, end, text (и words, если Whisper
+                                запускался с word_timestamps=True)
+            diarization: Результат диаризации от pyannote.audio или список
+                        кортежей (start, end, speaker)
+            word_level: Назначать спикеров по отдельным словам. Сегмент, в котором
+                       говорят несколько спикеров, разбивается на части
             
         Returns:
             List[Dict]: Список сегментов с информацией о спикере:
@@ -85,37 +216,65 @@ class Diarizer:
                        - text: Текст сегмента
                        - start: Время начала
                        - end: Время окончания
+                       - words: Слова со спикерами (только при word_level=True)
         """
+        turns = Diarizer.get_turns(diarization)
+        
+        segment_speakers = _best_overlap_speakers(
+            [(segment['start'], segment['end']) for segment in transcript_segments],
+            turns
+        )
+        
+        word_speakers = []
+        if word_level:
+            intervals = [
+                (word['start'], word['end'])
+                for segment in transcript_segments
+                for word in segment.get('words') or []
+            ]
+            word_speakers = _best_overlap_speakers(intervals, turns)
+        
         speaker_transcript = []
+        word_index = 0
         
-        for segment in transcript_segments:
-            start = segment['start']
-            end = segment['end']
-            text = segment['text']
-            
-            # Найти спикера для данного сегмента
-            speaker = None
-            for turn, _, spk in diarization.itertracks(yield_label=True):
-                if (turn.start <= start <= turn.end or 
-                    turn.start <= end <= turn.end or 
-                    (start <= turn.start and end >= turn.end)):
-                    speaker = spk
-                    break
-            
+        for segment, speaker in zip(transcript_segments, segment_speakers):
             if speaker is None:
                 speaker = "Unknown"
             
-            speaker_transcript.append({
-                'speaker': speaker,
-                'text': text.strip(),
-                'start': start,
-                'end': end
-            })
+            words = (segment.get('words') or []) if word_level else []
+            if not words:
+                speaker_transcript.append({
+                    'speaker': speaker,
+                    'text': segment['text'].strip(),
+                    'start': segment['start'],
+                    'end': segment['end']
+                })
+                continue
+            
+            # Разбиваем сегмент на подряд идущие слова одного спикера
+            runs = []
+            for word in words:
+                word_speaker = word_speakers[word_index] or speaker
+                word_index += 1
+                word = {**word, 'speaker': word_speaker}
+                if runs and runs[-1][0] == word_speaker:
+                    runs[-1][1].append(word)
+                else:
+                    runs.append((word_speaker, [word]))
+            
+            for run_speaker, run_words in runs:
+                speaker_transcript.append({
+                    'speaker': run_speaker,
+                    'text': ''.join(word['word'] for word in run_words).strip(),
+                    'start': run_words[0]['start'],
+                    'end': run_words[-1]['end'],
+                    'words': run_words
+                })
         
         return speaker_transcript
     
+    @staticmethod
     def get_speakers_text(
-        self,
         speaker_segments: List[Dict[str, Any]]
     ) -> Dict[str, str]:
         """
@@ -1,15 +1,27 @@
 """Главный класс File2Text для единого API."""
 
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Any, Union
 from pathlib import Path
 
-from file2text.core.transcriber import Transcriber
+import numpy as np
+
+from file2text.core.transcriber import DECODING_PROFILES, Transcriber
 from file2text.core.diarizer import Diarizer
 from file2text.core.summarizer import Summarizer
 from file2text.core.vectorizer import Vectorizer
+from file2text.core.registry import ModelRegistry, get_model_registry
 from file2text.utils.audio_converter import AudioConverter
+from file2text.utils.cache import ResultCache
 from file2text.utils.config import Config, load_config
+from file2text.utils.stage_metrics import measure_stage
 
 
 @dataclass
@@ -22,6 +34,7 @@ class ProcessingResult:
     speaker_segments: List[Dict[str, Any]] = field(default_factory=list)
     summary: Dict[str, str] = field(default_factory=dict)
     vectors: Optional[Any] = None
+    vector_segments: List[Dict[str, Any]] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -35,9 +48,67 @@ class ProcessingResult:
         }
         if self.vectors is not None:
             result["vectors_shape"] = self.vectors.shape if hasattr(self.vectors, 'shape') else None
+            result["vector_segments"] = self.vector_segments
         return result
 
 
+@dataclass
+class StreamEvent:
+    """
+    Событие потоковой обработки (File2Text.process_stream).
+    
+    Виды событий:
+        - segment: сегмент транскрипции сразу после распознавания
+        - speaker_segment: тот же сегмент (или его часть) со спикером
+        - summary: словарь суммаризаций (как ProcessingResult.summary)
+        - vectors: {'vectors': матрица, 'vector_segments': сегменты строк}
+        - result: итоговый ProcessingResult, последнее событие
+    """
+    kind: str
+    data: Any
+
+
+@contextmanager
+def _stage_timer(result: ProcessingResult, stage: str):
+    """Записывает время и метрики этапа в result.metadata (см. measure_stage)."""
+    with measure_stage(result.metadata, stage):
+        yield
+
+
+class _LazyAudio:
+    """Аудио файла, которое подготавливается при первом обращении и один раз."""
+    
+    def __init__(self, load: Optional[Callable[[], Union[str, np.ndarray]]]):
+        self._load = load
+        self._audio = None
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_array(cls, audio: Union[str, np.ndarray]) -> "_LazyAudio":
+        """
+        Обертка над уже подготовленным аудио.
+        
+        Ссылка на сигнал хранится только в самой обертке, поэтому release()
+        действительно освобождает память.
+        """
+        lazy = cls(None)
+        lazy._audio = audio
+        return lazy
+    
+    def get(self) -> Union[str, np.ndarray]:
+        with self._lock:
+            if self._audio is None:
+                if self._load is None:
+                    raise RuntimeError("Аудио уже освобождено")
+                self._audio = self._load()
+            return self._audio
+    
+    def release(self):
+        """Освобождает декодированный сигнал."""
+        with self._lock:
+            self._audio = None
+
+
 class File2Text:
     """Главный класс для обработки аудио в текст с суммаризацией и векторизацией."""
     
@@ -45,7 +116,8 @@ class File2Text:
         self,
         config: Optional[Config] = None,
         whisper_model: str = "medium",
-        verbose: bool = False
+        verbose: bool = False,
+        registry: Optional[ModelRegistry] = None
     ):
         """
         Инициализация File2Text.
@@ -54,38 +126,121 @@ class File2Text:
             config: Объект конфигурации. Если None, загружается из переменных окружения
             whisper_model: Модель Whisper для транскрипции
             verbose: Выводить ли подробную информацию
+            registry: Реестр моделей. Если None, используется общий реестр процесса,
+                      и экземпляры File2Text с одинаковыми моделями разделяют веса
         """
         if config is None:
             config = load_config()
         
         self.config = config
         self.verbose = verbose
+        self.whisper_model = whisper_model or config.whisper_model
+        self.registry = registry or get_model_registry()
         
-        # Инициализируем компоненты
-        self.transcriber = Transcriber(
-            model=whisper_model or config.whisper_model,
-            device=config.whisper_device,
-            verbose=verbose
-        )
-        
-        self.diarizer = Diarizer(
-            auth_token=config.huggingface_token,
-            verbose=verbose
-        )
-        
-        self.summarizer = Summarizer(
-            model=config.summarizer_model,
-            device=config.whisper_device,
-            verbose=verbose
-        )
+        # Компоненты создаются при первом обращении, чтобы не загружать
+        # модели, которые не понадобятся для выбранных этапов обработки
+        self._transcriber: Optional[Transcriber] = None
+        self._diarizer: Optional[Diarizer] = None
+        self._summarizer: Optional[Summarizer] = None
+        self._vectorizer: Optional[Vectorizer] = None
+        self._components_lock = threading.Lock()
         
-        self.vectorizer = Vectorizer(
-            model=config.vectorizer_model,
-            device=config.whisper_device,
-            verbose=verbose
+        self.audio_converter = AudioConverter()
+        self.cache = ResultCache(
+            os.path.join(config.cache_dir, "results"),
+            max_size_mb=config.cache_max_size_mb,
+            enabled=config.cache_enabled
         )
+    
+    @property
+    def transcriber(self) -> Transcriber:
+        """Транскриптор Whisper (загружается при первом обращении)."""
+        if self._transcriber is None:
+            with self._components_lock:
+                if self._transcriber is None:
+                    self._transcriber = Transcriber(
+                        model=self.whisper_model,
+                        device=self.config.whisper_device,
+                        verbose=self.verbose,
+                        registry=self.registry,
+                        vad=self.config.vad_enabled,
+                        quantize=self.config.quantize_int8,
+                        cache_dir=self.config.cache_dir,
+                        profile=self.config.decoding_profile
+                    )
+        return self._transcriber
+    
+    @property
+    def diarizer(self) -> Diarizer:
+        """Диаризатор pyannote (загружается при первом обращении)."""
+        if self._diarizer is None:
+            with self._components_lock:
+                if self._diarizer is None:
+                    self._diarizer = Diarizer(
+                        auth_token=self.config.huggingface_token,
+                        verbose=self.verbose,
+                        registry=self.registry,
+                        model=self.config.diarization_model
+                    )
+        return self._diarizer
+    
+    @property
+    def summarizer(self) -> Summarizer:
+        """Суммаризатор (загружается при первом обращении)."""
+        if self._summarizer is None:
+            with self._components_lock:
+                if self._summarizer is None:
+                    self._summarizer = Summarizer(
+                        model=self.config.summarizer_model,
+                        device=self.config.whisper_device,
+                        verbose=self.verbose,
+                        batch_size=self.config.summary_batch_size,
+                        registry=self.registry,
+                        quantize=self.config.quantize_int8,
+                        cache_dir=self.config.cache_dir,
+                        max_input_tokens=self.config.summary_max_input_tokens or None,
+                        chunk_overlap_tokens=self.config.summary_chunk_overlap_tokens
+                    )
+        return self._summarizer
+    
+    @property
+    def vectorizer(self) -> Vectorizer:
+        """Векторизатор (загружается при первом обращении)."""
+        if self._vectorizer is None:
+            with self._components_lock:
+                if self._vectorizer is None:
+                    self._vectorizer = Vectorizer(
+                        model=self.config.vectorizer_model,
+                        device=self.config.whisper_device,
+                        verbose=self.verbose,
+                        registry=self.registry,
+                        quantize=self.config.quantize_int8,
+                        cache_dir=self.config.cache_dir
+                    )
+        return self._vectorizer
+    
+    def close(self):
+        """
+        Освобождает загруженные модели в реестре.
         
-        self.audio_converter = AudioConverter()
+        Сами веса остаются в памяти, пока их используют другие экземпляры
+        или пока не вызван registry.evict().
+        """
+        with self._components_lock:
+            for component in (self._transcriber, self._diarizer,
+                              self._summarizer, self._vectorizer):
+                if component is not None:
+                    component.close()
+            self._transcriber = None
+            self._diarizer = None
+            self._summarizer = None
+            self._vectorizer = None
+    
+    def __enter__(self) -> "File2Text":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
     
     def process(
         self,
@@ -94,6 +249,7 @@ class File2Text:
         diarize: bool = False,
         summarize: bool = False,
         vectorize: bool = False,
+        word_level_speakers: bool = False,
         **kwargs
     ) -> ProcessingResult:
         """
@@ -105,54 +261,564 @@ class File2Text:
             diarize: Выполнить диаризацию спикеров
             summarize: Выполнить суммаризацию
             vectorize: Выполнить векторизацию
+            word_level_speakers: Назначать спикеров по словам (по временным
+                                меткам слов Whisper), разбивая сегменты со
+                                сменой спикера
             **kwargs: Дополнительные параметры для транскрипции
             
         Returns:
-            ProcessingResult: Результат обработки
+            ProcessingResult: Результат обработки. Время этапов в секундах
+                              находится в metadata['timings'], подробные
+                              метрики этапов (время CPU и память
+                              процесса, RTF) - в metadata['stages']
         """
+        started = time.perf_counter()
         result = ProcessingResult(audio_path=audio_path)
+        audio = self._audio_source(result)
+        kwargs = self._transcribe_kwargs(kwargs, word_level_speakers)
         
-        # Конвертируем медиа файл (аудио или видео) в WAV если нужно
-        original_path = audio_path
-        if not Path(audio_path).suffix.lower() == '.wav':
-            if self.verbose:
-                if self.audio_converter.is_video_file(audio_path):
-                    print(f"Обнаружен видео файл, извлекаю аудио...")
-                else:
-                    print(f"Конвертирую аудио в WAV...")
+        # Декодируем один раз до этапов, если результатов нет в кэше
+        if self._needs_audio(result, transcribe=transcribe, diarize=diarize, **kwargs):
+            with _stage_timer(result, 'convert'):
+                audio.get()
+        
+        if transcribe and diarize and self.config.parallel_stages:
+            # Диаризации нужен только сигнал, поэтому она выполняется
+            # параллельно с транскрипцией; результаты сводятся при
+            # назначении спикеров
+            def diarization_turns():
+                with _stage_timer(result, 'diarize'):
+                    return self._diarization_turns(result, audio)
+            
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="file2text-diarize") as executor:
+                turns_future = executor.submit(diarization_turns)
+                with _stage_timer(result, 'transcribe'):
+                    self._transcribe_stage(result, audio, **kwargs)
+                turns = turns_future.result()
+            
+            if result.segments:
+                with _stage_timer(result, 'assign_speakers'):
+                    self._assign_speakers_stage(result, turns, word_level=word_level_speakers)
+        else:
+            # Транскрипция
+            if transcribe:
+                with _stage_timer(result, 'transcribe'):
+                    self._transcribe_stage(result, audio, **kwargs)
             
-            audio_path = self.audio_converter.convert_to_wav(audio_path)
-            result.metadata['converted_audio_path'] = audio_path
-            result.metadata['original_path'] = original_path
-        
-        # Транскрипция
-        if transcribe:
-            transcript_result = self.transcriber.transcribe(audio_path, **kwargs)
-            result.text = transcript_result['text']
-            result.segments = transcript_result.get('segments', [])
-            result.metadata['language'] = transcript_result.get('language', 'ru')
-        
-        # Диаризация
-        if diarize and result.segments:
-            diarization = self.diarizer.diarize(audio_path)
-            result.speaker_segments = self.diarizer.assign_speakers(result.segments, diarization)
-            result.speakers = self.diarizer.get_speakers_text(result.speaker_segments)
+            # Диаризация
+            if diarize:
+                with _stage_timer(result, 'diarize'):
+                    self._diarize_stage(result, audio, word_level=word_level_speakers)
+        
+        audio.release()
         
         # Суммаризация
         if summarize:
-            if result.text:
-                result.summary['full'] = self.summarizer.summarize_full(result.text)
-            
-            if result.speakers:
-                result.summary['by_speakers'] = self.summarizer.summarize_by_speakers(result.speakers)
+            with _stage_timer(result, 'summarize'):
+                self._summarize_stage(result)
         
         # Векторизация
         if vectorize:
-            if result.text:
-                result.vectors = self.vectorizer.vectorize(result.text)
+            with _stage_timer(result, 'vectorize'):
+                self._vectorize_stage(result)
         
+        result.metadata.setdefault('timings', {})['total'] = round(time.perf_counter() - started, 3)
         return result
     
+    def process_stream(
+        self,
+        audio_path: str,
+        diarize: bool = False,
+        summarize: bool = False,
+        vectorize: bool = False,
+        word_level_speakers: bool = False,
+        window_seconds: float = 60.0,
+        **kwargs
+    ) -> Iterator[StreamEvent]:
+        """
+        Потоковый вариант process(): выдает результаты по мере готовности.
+        
+        Сегменты транскрипции выдаются сразу после распознавания очередного
+        окна (см. Transcriber.transcribe_stream). Диаризация идет параллельно;
+        как только она готова, уже выданные и последующие сегменты выдаются
+        повторно со спикерами. Суммаризация, векторы и итоговый результат
+        приходят последними событиями.
+        
+        Args:
+            audio_path: Путь к аудио или видео файлу
+            diarize: Выполнить диаризацию спикеров
+            summarize: Выполнить суммаризацию
+            vectorize: Выполнить векторизацию
+            word_level_speakers: Назначать спикеров по словам
+            window_seconds: Длина окна транскрипции в секундах
+            **kwargs: Дополнительные параметры для транскрипции
+            
+        Yields:
+            StreamEvent: События обработки, последнее - "result"
+        """
+        started = time.perf_counter()
+        result = ProcessingResult(audio_path=audio_path)
+        audio = self._audio_source(result)
+        kwargs = self._transcribe_kwargs(kwargs, word_level_speakers)
+        
+        key = self._transcript_key(result, {**kwargs, 'stream_window': window_seconds})
+        cached = self.cache.get("transcribe", key) if key else None
+        
+        executor = None
+        turns_future = None
+        if diarize:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="file2text-diarize")
+            turns_future = executor.submit(self._diarization_turns, result, audio)
+        
+        turns = None
+        assigned = 0
+        
+        def speaker_events():
+            # Назначает спикеров сегментам, которые еще не выдавались со спикером
+            nonlocal assigned
+            new_segments = Diarizer.assign_speakers(
+                result.segments[assigned:], turns, word_level=word_level_speakers
+            )
+            assigned = len(result.segments)
+            for segment in new_segments:
+                result.speaker_segments.append(segment)
+                yield StreamEvent('speaker_segment', segment)
+        
+        try:
+            with _stage_timer(result, 'transcribe'):
+                if cached is not None:
+                    segments = iter(cached['segments'])
+                else:
+                    segments = self.transcriber.transcribe_stream(
+                        audio.get(), window_seconds=window_seconds, **kwargs
+                    )
+                
+                for segment in segments:
+                    result.segments.append(segment)
+                    yield StreamEvent('segment', segment)
+                    
+                    if turns is None and turns_future is not None and turns_future.done():
+                        turns = turns_future.result()
+                    if turns is not None:
+                        yield from speaker_events()
+            
+            result.text = "".join(segment['text'] for segment in result.segments)
+            result.metadata['language'] = kwargs.get('language', 'ru')
+            if result.metadata.get('audio_duration') is None and cached is not None:
+                result.metadata['audio_duration'] = cached.get('audio_duration')
+            if cached is None and key:
+                self.cache.set("transcribe", key, {
+                    'text': result.text,
+                    'segments': result.segments,
+                    'language': result.metadata['language'],
+                    'audio_duration': result.metadata.get('audio_duration'),
+                })
+            
+            if turns_future is not None:
+                with _stage_timer(result, 'diarize'):
+                    turns = turns_future.result()
+                yield from speaker_events()
+                result.speakers = Diarizer.get_speakers_text(result.speaker_segments)
+        finally:
+            if executor is not None:
+                turns_future.cancel()
+                executor.shutdown(wait=False)
+            audio.release()
+        
+        if summarize:
+            with _stage_timer(result, 'summarize'):
+                self._summarize_stage(result)
+            yield StreamEvent('summary', result.summary)
+        
+        if vectorize:
+            with _stage_timer(result, 'vectorize'):
+                self._vectorize_stage(result)
+            yield StreamEvent('vectors', {
+                'vectors': result.vectors,
+                'vector_segments': result.vector_segments
+            })
+        
+        result.metadata.setdefault('timings', {})['total'] = round(time.perf_counter() - started, 3)
+        yield StreamEvent('result', result)
+    
+    async def aprocess_stream(self, audio_path: str, **kwargs) -> AsyncIterator[StreamEvent]:
+        """
+        Асинхронный итератор поверх process_stream.
+        
+        Обработка выполняется в отдельном потоке, события передаются в цикл
+        событий по мере появления. Параметры такие же, как у process_stream.
+        """
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+        
+        def produce():
+            try:
+                for event in self.process_stream(audio_path, **kwargs):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(events.put_nowait, event)
+            except BaseException as e:
+                loop.call_soon_threadsafe(events.put_nowait, e)
+            else:
+                loop.call_soon_threadsafe(events.put_nowait, done)
+        
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item = await events.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+            await producer
+        finally:
+            # Потребитель прервал итерацию: поток завершится на следующем событии
+            stop.set()
+    
+    # Этапы пайплайна. process() вызывает их последовательно, а пакетная
+    # обработка (file2text.core.batch) - в разных потоках для разных файлов.
+    # Результаты этапов кэшируются в config.cache_dir по хэшу содержимого
+    # файла (или текста), имени модели и параметрам.
+    
+    def _audio_source(self, result: ProcessingResult) -> _LazyAudio:
+        """Аудио файла, которое декодируется только если его не нашли в кэше."""
+        return _LazyAudio(lambda: self._convert_stage(result))
+    
+    def _transcribe_kwargs(self, kwargs: Dict[str, Any], word_level_speakers: bool) -> Dict[str, Any]:
+        """Параметры транскрипции: назначению спикеров по словам нужны метки слов."""
+        profile = DECODING_PROFILES.get(self.config.decoding_profile, {})
+        if word_level_speakers and not profile.get('word_timestamps', True):
+            return {'word_timestamps': True, **kwargs}
+        return kwargs
+    
+    def _needs_audio(
+        self,
+        result: ProcessingResult,
+        transcribe: bool = True,
+        diarize: bool = False,
+        **kwargs
+    ) -> bool:
+        """Нужно ли декодировать аудио для этапов, результатов которых нет в кэше."""
+        if transcribe and self.cache.get("transcribe", self._transcript_key(result, kwargs)) is None:
+            return True
+        if diarize and self.cache.get("diarize", self._diarization_key(result)) is None:
+            return True
+        return False
+    
+    def _content_hash(self, result: ProcessingResult) -> str:
+        """Хэш содержимого входного файла (вычисляется один раз на результат)."""
+        if 'content_hash' not in result.metadata:
+            result.metadata['content_hash'] = ResultCache.file_hash(result.audio_path)
+        return result.metadata['content_hash']
+    
+    def _model_id(self, name: str) -> str:
+        """Имя модели для ключа кэша: квантованная модель дает другой результат."""
+        if self.config.quantize_int8 and self.config.whisper_device == "cpu":
+            return f"{name}:int8"
+        return name
+    
+    def _transcript_params(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Параметры транскрипции, влияющие на результат (ключ кэша и журнала заданий)."""
+        params = {k: v for k, v in kwargs.items() if k != 'verbose'}
+        if self.config.vad_enabled:
+            params['vad'] = True
+        if self.config.long_audio_workers != 1:
+            params['long_audio_window'] = self.config.long_audio_window
+        if self.config.decoding_profile != "archival":
+            params['profile'] = self.config.decoding_profile
+        return params
+    
+    def _summary_params(self) -> Dict[str, Any]:
+        """Параметры разбиения на чанки, влияющие на суммаризацию."""
+        return {
+            'max_input_tokens': self.config.summary_max_input_tokens,
+            'chunk_overlap_tokens': self.config.summary_chunk_overlap_tokens,
+        }
+    
+    def _stage_fingerprint(self, transcribe_kwargs: Dict[str, Any], **extra) -> Dict[str, Any]:
+        """
+        Модели и параметры всех этапов - те же, что входят в ключи кэша.
+        
+        Args:
+            transcribe_kwargs: Параметры транскрипции (после _transcribe_kwargs)
+            **extra: Дополнительные параметры вызова (например, word_level_speakers)
+        
+        Returns:
+            Dict: JSON-совместимое описание параметров обработки
+        """
+        return {
+            'transcribe': [
+                self._model_id(f"whisper:{self.whisper_model}"), self._transcript_params(transcribe_kwargs)
+            ],
+            'diarize': [self.config.diarization_model, self._diarization_params()],
+            'summarize': [self._model_id(self.config.summarizer_model), self._summary_params()],
+            'vectorize': self._model_id(self.config.vectorizer_model),
+            **extra
+        }
+    
+    def _transcript_key(self, result: ProcessingResult, kwargs: Dict[str, Any]) -> Optional[str]:
+        if not self.cache.enabled:
+            return None
+        return self.cache.make_key(
+            self._content_hash(result),
+            self._model_id(f"whisper:{self.whisper_model}"),
+            self._transcript_params(kwargs)
+        )
+    
+    def _diarization_params(self) -> Dict[str, Any]:
+        """
+        Параметры диаризации, влияющие на реплики в кэше.
+        
+        В кэше хранятся реплики до назначения спикеров сегментам, поэтому
+        word_level в ключ не входит: назначение пересчитывается при каждом вызове.
+        """
+        params = {}
+        if self.config.diarization_num_speakers:
+            params['num_speakers'] = self.config.diarization_num_speakers
+        return params
+    
+    def _diarization_key(self, result: ProcessingResult) -> Optional[str]:
+        if not self.cache.enabled:
+            return None
+        return self.cache.make_key(
+            self._content_hash(result), self.config.diarization_model, self._diarization_params()
+        )
+    
+    def _convert_stage(self, result: ProcessingResult) -> Union[str, np.ndarray]:
+        """
+        Подготавливает аудио для транскрипции и диаризации.
+        
+        Файл декодируется один раз в массив float32, который используют и
+        Whisper, и pyannote. PCM WAV читается без ffmpeg (с передискретизацией
+        и сведением в моно при необходимости). Без config.in_memory_decode
+        медиа файл сначала конвертируется в WAV рядом с исходным (или в
+        config.converted_dir), если этого требуют параметры из заголовка.
+        """
+        audio_path = result.audio_path
+        
+        if self.config.in_memory_decode:
+            if self.verbose:
+                print(f"Декодирую аудио в память...")
+            audio = self.audio_converter.decode_to_array(audio_path)
+            result.metadata['audio_duration'] = len(audio) / 16000.0
+            return audio
+        
+        if self.verbose:
+            if self.audio_converter.is_video_file(audio_path):
+                print(f"Обнаружен видео файл, извлекаю аудио...")
+            elif Path(audio_path).suffix.lower() != '.wav':
+                print(f"Конвертирую аудио в WAV...")
+        
+        output_path = None
+        if self.config.converted_dir:
+            # Хэш в имени различает одноименные файлы из разных папок
+            os.makedirs(self.config.converted_dir, exist_ok=True)
+            output_path = os.path.join(
+                self.config.converted_dir,
+                f"{Path(audio_path).stem}.{self._content_hash(result)[:12]}.wav"
+            )
+        
+        converted_path = self.audio_converter.convert_to_wav(audio_path, output_path=output_path)
+        if converted_path != audio_path:
+            result.metadata['converted_audio_path'] = converted_path
+            result.metadata['original_path'] = result.audio_path
+        
+        audio = self.audio_converter.read_wav(converted_path)
+        result.metadata['audio_duration'] = len(audio) / 16000.0
+        return audio
+    
+    def _transcribe_stage(
+        self,
+        result: ProcessingResult,
+        audio: _LazyAudio,
+        **kwargs
+    ):
+        """Транскрибирует аудио и заполняет text, segments и язык."""
+        key = self._transcript_key(result, kwargs)
+        cached = self.cache.get("transcribe", key) if key else None
+        
+        if cached is None:
+            if self.config.long_audio_workers != 1:
+                transcript_result = self.transcriber.transcribe_long(
+                    audio.get(),
+                    workers=self.config.long_audio_workers or None,
+                    window_seconds=self.config.long_audio_window,
+                    **kwargs
+                )
+            else:
+                transcript_result = self.transcriber.transcribe(audio.get(), **kwargs)
+            cached = {
+                'text': transcript_result['text'],
+                'segments': transcript_result.get('segments', []),
+                'language': transcript_result.get('language', 'ru'),
+                'audio_duration': result.metadata.get('audio_duration'),
+            }
+            if key:
+                self.cache.set("transcribe", key, cached)
+        elif self.verbose:
+            print("Транскрипция взята из кэша")
+        
+        result.text = cached['text']
+        result.segments = cached['segments']
+        result.metadata['language'] = cached['language']
+        if result.metadata.get('audio_duration') is None:
+            result.metadata['audio_duration'] = cached.get('audio_duration')
+    
+    def _diarize_stage(
+        self,
+        result: ProcessingResult,
+        audio: _LazyAudio,
+        word_level: bool = False
+    ):
+        """Выполняет диаризацию и сопоставляет спикеров с сегментами."""
+        if not result.segments:
+            return
+        
+        turns = self._diarization_turns(result, audio)
+        self._assign_speakers_stage(result, turns, word_level=word_level)
+    
+    def _diarization_turns(self, result: ProcessingResult, audio: _LazyAudio) -> List:
+        """Реплики спикеров (start, end, speaker) из кэша или от модели диаризации."""
+        key = self._diarization_key(result)
+        turns = self.cache.get("diarize", key) if key else None
+        
+        if turns is None:
+            turns = Diarizer.get_turns(self.diarizer.diarize(audio.get(), **self._diarization_params()))
+            if key:
+                self.cache.set("diarize", key, turns)
+        elif self.verbose:
+            print("Диаризация взята из кэша")
+        
+        return turns
+    
+    def _assign_speakers_stage(
+        self,
+        result: ProcessingResult,
+        turns: List,
+        word_level: bool = False
+    ):
+        """Сопоставляет реплики спикеров с сегментами транскрипции."""
+        result.speaker_segments = Diarizer.assign_speakers(
+            result.segments, turns, word_level=word_level
+        )
+        result.speakers = Diarizer.get_speakers_text(result.speaker_segments)
+    
+    def _summary_key(self, kind: str, payload: str, **params) -> Optional[str]:
+        if not self.cache.enabled:
+            return None
+        return self.cache.make_key(
+            self.cache.text_hash(payload),
+            self._model_id(self.config.summarizer_model),
+            {'kind': kind, **self._summary_params(), **params}
+        )
+    
+    def _summarize_stage(self, result: ProcessingResult):
+        """
+        Суммаризирует весь текст и текст каждого спикера.
+        
+        Недостающие в кэше суммаризации считаются одним вызовом
+        summarize_conversation, чтобы чанки полного текста и всех спикеров
+        попали в общие батчи модели.
+        """
+        full_key = speakers_key = None
+        full = by_speakers = None
+        
+        if result.text:
+            full_key = self._summary_key('full', result.text)
+            full = self.cache.get("summarize", full_key) if full_key else None
+        
+        if result.speakers:
+            speakers_key = self._summary_key(
+                'by_speakers', json.dumps(result.speakers, sort_keys=True, ensure_ascii=False)
+            )
+            by_speakers = self.cache.get("summarize", speakers_key) if speakers_key else None
+        
+        need_full = bool(result.text) and full is None
+        need_speakers = bool(result.speakers) and by_speakers is None
+        
+        if need_full or need_speakers:
+            computed = self.summarizer.summarize_conversation(
+                result.text if need_full else None,
+                result.speakers if need_speakers else None
+            )
+            if need_full:
+                full = computed['full']
+                if full_key:
+                    self.cache.set("summarize", full_key, full)
+            if need_speakers:
+                by_speakers = computed['by_speakers']
+                if speakers_key:
+                    self.cache.set("summarize", speakers_key, by_speakers)
+        
+        if result.text:
+            result.summary['full'] = full
+        
+        if result.speakers:
+            result.summary['by_speakers'] = by_speakers
+    
+    def _cached_vectors(self, text: str) -> np.ndarray:
+        """Векторизация с кэшированием по хэшу текста."""
+        if not self.cache.enabled:
+            return self.vectorizer.vectorize(text)
+        
+        key = self.cache.make_key(
+            self.cache.text_hash(text), self._model_id(self.config.vectorizer_model)
+        )
+        vectors = self.cache.get("vectorize", key)
+        if vectors is None:
+            vectors = self.vectorizer.vectorize(text)
+            self.cache.set("vectorize", key, vectors)
+        return vectors
+    
+    def _vectorize_stage(self, result: ProcessingResult):
+        """
+        Векторизует транскрипцию по сегментам.
+        
+        Единицы векторизации - реплики спикеров (speaker_segments), а без
+        диаризации - сегменты Whisper. Строка i матрицы result.vectors
+        соответствует result.vector_segments[i] с временными метками, поэтому
+        найденный вектор указывает на конкретный момент в аудио.
+        """
+        source = result.speaker_segments or result.segments
+        vector_segments = []
+        for segment in source:
+            text = (segment.get('text') or '').strip()
+            if text:
+                vector_segments.append({
+                    'start': segment.get('start'),
+                    'end': segment.get('end'),
+                    'speaker': segment.get('speaker'),
+                    'text': text
+                })
+        
+        if not vector_segments:
+            if not result.text:
+                return
+            # Сегментов нет (например, текст без временных меток)
+            vector_segments = [{'start': None, 'end': None, 'speaker': None, 'text': result.text}]
+        
+        texts = [segment['text'] for segment in vector_segments]
+        key = None
+        vectors = None
+        if self.cache.enabled:
+            key = self.cache.make_key(
+                self.cache.text_hash(json.dumps(texts, ensure_ascii=False)),
+                self._model_id(self.config.vectorizer_model),
+                {'unit': 'segments'}
+            )
+            vectors = self.cache.get("vectorize", key)
+        
+        if vectors is None:
+            vectors = self.vectorizer.vectorize_batch(texts)
+            if key:
+                self.cache.set("vectorize", key, vectors)
+        
+        result.vectors = vectors
+        result.vector_segments = vector_segments
+    
     def transcribe(self, audio_path: str, **kwargs) -> str:
         """
         Только транскрипция аудио или видео файла.
@@ -164,12 +830,9 @@ class File2Text:
         Returns:
             str: Транскрибированный текст
         """
-        # Автоматически конвертируем если нужно
-        if not Path(audio_path).suffix.lower() == '.wav':
-            audio_path = self.audio_converter.convert_to_wav(audio_path)
-        
-        result = self.transcriber.transcribe(audio_path, **kwargs)
-        return result['text']
+        result = ProcessingResult(audio_path=audio_path)
+        self._transcribe_stage(result, self._audio_source(result), **kwargs)
+        return result.text
     
     def transcribe_with_speakers(self, audio_path: str, **kwargs) -> ProcessingResult:
         """
@@ -186,8 +849,14 @@ class File2Text:
     
     def summarize(self, text: str, **kwargs) -> str:
         """Только суммаризация текста."""
-        return self.summarizer.summarize(text, **kwargs)
+        key = self._summary_key('text', text, **kwargs)
+        summary = self.cache.get("summarize", key) if key else None
+        if summary is None:
+            summary = self.summarizer.summarize(text, **kwargs)
+            if key:
+                self.cache.set("summarize", key, summary)
+        return summary
     
     def vectorize(self, text: str) -> Any:
         """Только векторизация текста."""
-        return self.vectorizer.vectorize(text)
+        return self._cached_vectors(text)
@@ -0,0 +1,153 @@
+"""Общий реестр загруженных моделей для всего процесса."""
+
+import gc
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+
+class ModelKey(NamedTuple):
+    """Ключ модели в реестре."""
+    kind: str
+    name: str
+    device: str
+    dtype: str = "float32"
+
+
+@dataclass
+class _RegistryEntry:
+    """Запись реестра: загруженная модель и число ее пользователей."""
+    model: Any = None
+    refcount: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ModelRegistry:
+    """
+    Реестр моделей с подсчетом ссылок.
+    
+    Компоненты (Transcriber, Diarizer, Summarizer, Vectorizer) получают модели
+    через acquire() по ключу (тип, имя модели, устройство, тип данных), поэтому
+    несколько пайплайнов в одном процессе используют одни и те же веса.
+    Освобожденные модели остаются в памяти до явного вызова evict().
+    """
+    
+    def __init__(self):
+        self._entries: Dict[ModelKey, _RegistryEntry] = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, key: ModelKey, loader: Callable[[], Any]) -> Any:
+        """
+        Получить модель по ключу, загрузив ее при необходимости.
+        
+        Args:
+            key: Ключ модели
+            loader: Функция без аргументов, загружающая модель
+        
+        Returns:
+            Загруженная модель
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _RegistryEntry()
+                self._entries[key] = entry
+            entry.refcount += 1
+        
+        # Загрузка под блокировкой записи: параллельные запросы одной модели
+        # дождутся первой загрузки, а разные модели грузятся независимо
+        try:
+            with entry.lock:
+                if entry.model is None:
+                    entry.model = loader()
+        except BaseException:
+            with self._lock:
+                entry.refcount -= 1
+                if entry.model is None and entry.refcount <= 0:
+                    self._entries.pop(key, None)
+            raise
+        
+        return entry.model
+    
+    def register(self, key: ModelKey, model: Any):
+        """
+        Зарегистрировать уже загруженную модель под указанным ключом.
+        
+        Args:
+            key: Ключ модели
+            model: Объект модели
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _RegistryEntry()
+                self._entries[key] = entry
+            entry.model = model
+    
+    def release(self, key: ModelKey):
+        """
+        Уменьшить счетчик ссылок модели. Модель остается загруженной.
+        
+        Args:
+            key: Ключ модели
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.refcount > 0:
+                entry.refcount -= 1
+    
+    def evict(self, key: Optional[ModelKey] = None, force: bool = False) -> List[ModelKey]:
+        """
+        Выгрузить модели из памяти.
+        
+        Args:
+            key: Ключ модели. Если None, выгружаются все неиспользуемые модели
+            force: Выгрузить даже если модель еще используется
+        
+        Returns:
+            List[ModelKey]: Ключи выгруженных моделей
+        """
+        with self._lock:
+            if key is None:
+                keys = list(self._entries)
+            else:
+                keys = [key] if key in self._entries else []
+            
+            evicted = []
+            for k in keys:
+                if force or self._entries[k].refcount <= 0:
+                    del self._entries[k]
+                    evicted.append(k)
+        
+        if evicted:
+            gc.collect()
+        
+        return evicted
+    
+    def refcount(self, key: ModelKey) -> int:
+        """Текущее число пользователей модели."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.refcount if entry is not None else 0
+    
+    def loaded(self) -> Dict[ModelKey, int]:
+        """Словарь {ключ: число пользователей} для загруженных моделей."""
+        with self._lock:
+            return {
+                key: entry.refcount
+                for key, entry in self._entries.items()
+                if entry.model is not None
+            }
+    
+    def __contains__(self, key: ModelKey) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.model is not None
+
+
+_default_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Вернуть общий для процесса реестр моделей."""
+    return _default_registry
@@ -0,0 +1,606 @@
+"""
+Локальный сервер обработки с прогретыми моделями и очередью заданий.
+
+Сервер держит модели загруженными между заданиями, поэтому время ответа
+складывается только из инференса. Задания принимаются по HTTP (TCP или
+Unix-сокет), ставятся в ограниченную очередь и выполняются заданным числом
+потоков; события обработки (StreamEvent) отдаются клиенту в формате NDJSON
+по мере готовности.
+
+API:
+    GET    /health             состояние сервера и очереди
+    POST   /jobs               поставить задание: {"path": ..., "diarize": ...,
+                               "stream": true} - при stream ответом сразу
+                               идут события задания
+    GET    /jobs               список заданий
+    GET    /jobs/<id>          состояние задания (после завершения - с итоговым
+                               результатом)
+    GET    /jobs/<id>/events   события задания (NDJSON, до завершения); события,
+                               уже прочитанные клиентами, сервер не хранит
+    DELETE /jobs/<id>          отменить задание, ожидающее в очереди
+"""
+
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from file2text.core.file2text import File2Text, StreamEvent
+from file2text.core.registry import ModelRegistry
+
+
+# Параметры задания, которые передаются в File2Text.process_stream
+JOB_OPTIONS = {
+    'diarize': bool,
+    'summarize': bool,
+    'vectorize': bool,
+    'word_level_speakers': bool,
+    'window_seconds': (int, float),
+    'language': str,
+}
+
+# Этапы, модели которых можно загрузить при запуске сервера
+WARM_STAGES = {
+    'transcribe': 'transcriber',
+    'diarize': 'diarizer',
+    'summarize': 'summarizer',
+    'vectorize': 'vectorizer',
+}
+
+_STOP = object()
+
+
+def _event_to_dict(event: StreamEvent) -> Dict[str, Any]:
+    """Событие обработки в виде, пригодном для JSON."""
+    if event.kind == 'result':
+        data = event.data.to_dict()
+    elif event.kind == 'vectors':
+        vectors = event.data['vectors']
+        data = {
+            'vectors': vectors.tolist() if hasattr(vectors, 'tolist') else vectors,
+            'vector_segments': event.data['vector_segments'],
+        }
+    else:
+        data = event.data
+    return {'kind': event.kind, 'data': data}
+
+
+@dataclass
+class Job:
+    """
+    Задание сервера и еще не прочитанные события его обработки.
+    
+    События хранятся, пока их не прочитают все подключенные читатели
+    (follow): прочитанные удаляются. После завершения задания остается
+    только итоговый результат (ProcessingResult.to_dict, без векторов),
+    поэтому история заданий не держит в памяти сегменты и матрицы.
+    """
+    id: str
+    path: str
+    options: Dict[str, Any] = field(default_factory=dict)
+    status: str = "queued"
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    # Номер первого хранимого события с начала задания
+    _first: int = field(default=0, repr=False)
+    # Позиции подключенных читателей (следующее непрочитанное событие)
+    _readers: Dict[int, int] = field(default_factory=dict, repr=False)
+    _changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+    
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+    
+    def publish(self, event: Dict[str, Any]):
+        """Добавляет событие и будит читателей."""
+        with self._changed:
+            if event['kind'] == 'result':
+                self.result = event['data']
+            self.events.append(event)
+            self._changed.notify_all()
+    
+    def set_status(self, status: str, error: Optional[str] = None):
+        with self._changed:
+            self.status = status
+            self.error = error
+            if status == "running":
+                self.started = time.time()
+            elif self.done:
+                self.finished = time.time()
+                self._trim()
+            self._changed.notify_all()
+    
+    def _trim(self):
+        # Вызывается под _changed: удаляет события, прочитанные всеми читателями.
+        # Без читателей события ждут первого из них, пока задание выполняется
+        if self._readers:
+            keep_from = min(self._readers.values())
+        elif self.done:
+            keep_from = self._first + len(self.events)
+        else:
+            return
+        del self.events[:keep_from - self._first]
+        self._first = keep_from
+    
+    def follow(self) -> Iterator[Dict[str, Any]]:
+        """
+        Непрочитанные события задания и новые до его завершения.
+        
+        Yields:
+            Dict: Хранимые события, затем новые по мере появления; итоговый
+                  результат (если он уже удален из событий) и последним -
+                  событие "status"
+        """
+        token = object()
+        with self._changed:
+            position = self._first
+            self._readers[id(token)] = position
+        seen_result = False
+        try:
+            while True:
+                with self._changed:
+                    while position == self._first + len(self.events) and not self.done:
+                        self._changed.wait()
+                    pending = self.events[position - self._first:]
+                    position = self._first + len(self.events)
+                    self._readers[id(token)] = position
+                    self._trim()
+                    finished = self.done and position == self._first + len(self.events)
+                    result = self.result
+                seen_result = seen_result or any(event['kind'] == 'result' for event in pending)
+                yield from pending
+                if finished:
+                    if result is not None and not seen_result:
+                        yield {'kind': 'result', 'data': result}
+                    yield {'kind': 'status', 'data': self.to_dict()}
+                    return
+        finally:
+            with self._changed:
+                del self._readers[id(token)]
+                self._trim()
+    
+    def to_dict(self, with_result: bool = False) -> Dict[str, Any]:
+        """
+        Состояние задания.
+        
+        Args:
+            with_result: Добавить итоговый результат (если задание его вернуло)
+        """
+        data = {
+            'id': self.id,
+            'path': self.path,
+            'options': self.options,
+            'status': self.status,
+            'error': self.error,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'queue_seconds': round(self.started - self.created, 3) if self.started else None,
+            'processing_seconds': (
+                round(self.finished - self.started, 3) if self.started and self.finished else None
+            ),
+        }
+        if with_result:
+            data['result'] = self.result
+        return data
+
+
+class JobError(Exception):
+    """Задание не может быть принято; status - код ответа HTTP."""
+    
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+class ProcessingServer:
+    """
+    Очередь заданий поверх прогретых экземпляров File2Text.
+    
+    Каждый поток обработки использует свой экземпляр File2Text: первый -
+    переданный, дополнительные получают собственные копии моделей (как в
+    BatchProcessor), так как модели Whisper и pyannote не рассчитаны на
+    параллельные вызовы одного экземпляра. Очередь ограничена: если она
+    заполнена, новое задание отклоняется, а не копится в памяти.
+    """
+    
+    def __init__(
+        self,
+        processor: File2Text,
+        workers: int = 1,
+        max_queue: int = 16,
+        root: Optional[str] = None,
+        history: int = 100,
+        allow_any_path: bool = False
+    ):
+        """
+        Инициализация сервера.
+        
+        Args:
+            processor: Экземпляр File2Text
+            workers: Число одновременно выполняемых заданий
+            max_queue: Максимальное число заданий, ожидающих в очереди
+            root: Папка, файлы из которой принимаются. Если None - текущая папка
+            history: Сколько завершенных заданий хранить для запросов состояния
+            allow_any_path: Принимать любые файлы, которые может прочитать
+                            процесс сервера (root не учитывается)
+        """
+        self.processor = processor
+        self.workers = max(1, workers)
+        self.root = None if allow_any_path else Path(root or os.getcwd()).resolve()
+        self.history = max(0, history)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queue))
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._processors = [processor]
+        for _ in range(self.workers - 1):
+            self._processors.append(File2Text(
+                config=processor.config,
+                whisper_model=processor.whisper_model,
+                verbose=processor.verbose,
+                registry=ModelRegistry()
+            ))
+        self._threads: List[threading.Thread] = []
+    
+    def warm_up(self, stages: Iterable[str] = ("transcribe",)):
+        """
+        Загружает модели этапов во всех экземплярах File2Text.
+        
+        Args:
+            stages: Этапы из WARM_STAGES
+        """
+        attributes = []
+        for stage in stages:
+            if stage not in WARM_STAGES:
+                raise ValueError(
+                    f"Неизвестный этап: {stage}. Доступны: {', '.join(WARM_STAGES)}"
+                )
+            attributes.append(WARM_STAGES[stage])
+        for processor in self._processors:
+            for attribute in attributes:
+                getattr(processor, attribute)
+    
+    def start(self):
+        """Запускает потоки обработки."""
+        for i, processor in enumerate(self._processors):
+            thread = threading.Thread(
+                target=self._run,
+                args=(processor,),
+                name=f"file2text-serve-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+    
+    def shutdown(self):
+        """Дожидается текущих заданий, отменяет ожидающие и освобождает модели."""
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not _STOP:
+                job.set_status("cancelled")
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for processor in self._processors:
+            processor.close()
+        for processor in self._processors[1:]:
+            processor.registry.evict(force=True)
+    
+    def submit(self, path: str, **options) -> Job:
+        """
+        Ставит задание в очередь.
+        
+        Args:
+            path: Путь к аудио или видео файлу на машине сервера
+            **options: Параметры из JOB_OPTIONS
+        
+        Returns:
+            Job: Принятое задание
+        
+        Raises:
+            JobError: Неверные параметры, файл не найден или очередь заполнена
+        """
+        for name, value in options.items():
+            expected = JOB_OPTIONS.get(name)
+            if expected is None:
+                raise JobError(f"Неизвестный параметр: {name}")
+            if not isinstance(value, expected):
+                raise JobError(f"Неверный тип параметра: {name}")
+        
+        resolved = Path(path).expanduser().resolve()
+        if self.root is not None and self.root not in resolved.parents:
+            raise JobError(f"Файл вне разрешенной папки: {path}", HTTPStatus.FORBIDDEN)
+        if not resolved.is_file():
+            raise JobError(f"Файл не найден: {path}", HTTPStatus.NOT_FOUND)
+        
+        job = Job(id=uuid.uuid4().hex, path=str(resolved), options=options)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise JobError("Очередь заданий заполнена", HTTPStatus.SERVICE_UNAVAILABLE)
+        
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+            self._forget_finished()
+        return job
+    
+    def _forget_finished(self):
+        # Вызывается под _jobs_lock: удаляет самые старые завершенные задания
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+    
+    def jobs(self) -> List[Job]:
+        with self._jobs_lock:
+            return list(self._jobs.values())
+    
+    def cancel(self, job_id: str) -> bool:
+        """
+        Отменяет задание, которое еще ждет в очереди.
+        
+        Returns:
+            bool: True, если задание отменено
+        """
+        job = self.get(job_id)
+        if job is None:
+            return False
+        with job._changed:
+            if job.status != "queued":
+                return False
+            job.status = "cancelled"
+            job.finished = time.time()
+            job._trim()
+            job._changed.notify_all()
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        jobs = self.jobs()
+        return {
+            'status': 'ok',
+            'workers': self.workers,
+            'queued': sum(job.status == "queued" for job in jobs),
+            'running': sum(job.status == "running" for job in jobs),
+            'queue_capacity': self._queue.maxsize,
+            'whisper_model': self.processor.whisper_model,
+            'offline': self.processor.config.offline,
+        }
+    
+    def _run(self, processor: File2Text):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            with job._changed:
+                if job.status != "queued":
+                    continue
+                job.status = "running"
+                job.started = time.time()
+            
+            try:
+                for event in processor.process_stream(job.path, **job.options):
+                    job.publish(_event_to_dict(event))
+            except Exception as e:
+                job.set_status("failed", str(e))
+            else:
+                job.set_status("done")
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """HTTP API сервера (см. описание модуля)."""
+    
+    server_version = "file2text"
+    
+    @property
+    def service(self) -> ProcessingServer:
+        return self.server.service
+    
+    def address_string(self) -> str:
+        # У Unix-сокета нет адреса клиента
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return "unix"
+    
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+    
+    def _send_json(self, data: Any, status: HTTPStatus = HTTPStatus.OK):
+        body = json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_error(self, message: str, status: HTTPStatus):
+        self._send_json({'error': message}, status)
+    
+    def _stream_job(self, job: Job):
+        # Ответ без Content-Length: события пишутся по строке и соединение
+        # закрывается после последнего
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("X-Job-Id", job.id)
+        self.end_headers()
+        try:
+            for event in job.follow():
+                line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+                self.wfile.write(line.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Клиент отключился; задание продолжает выполняться
+            pass
+    
+    def _job_from_path(self) -> Optional[Job]:
+        parts = self.path.strip("/").split("/")
+        job = self.service.get(parts[1]) if len(parts) >= 2 else None
+        if job is None:
+            self._send_error("Задание не найдено", HTTPStatus.NOT_FOUND)
+        return job
+    
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts == ["health"]:
+            self._send_json(self.service.stats())
+        elif parts == ["jobs"]:
+            self._send_json([job.to_dict() for job in self.service.jobs()])
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._job_from_path()
+            if job is not None:
+                self._send_json(job.to_dict(with_result=True))
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            job = self._job_from_path()
+            if job is not None:
+                self._stream_job(job)
+        else:
+            self._send_error("Не найдено", HTTPStatus.NOT_FOUND)
+    
+    def do_POST(self):
+        if self.path.strip("/") != "jobs":
+            self._send_error("Не найдено", HTTPStatus.NOT_FOUND)
+            return
+        
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict) or not isinstance(request.get('path'), str):
+                raise JobError("Ожидается JSON-объект с полем path")
+            stream = bool(request.pop('stream', False))
+            job = self.service.submit(request.pop('path'), **request)
+        except json.JSONDecodeError:
+            self._send_error("Некорректный JSON", HTTPStatus.BAD_REQUEST)
+            return
+        except JobError as e:
+            self._send_error(str(e), e.status)
+            return
+        
+        if stream:
+            self._stream_job(job)
+        else:
+            self._send_json(job.to_dict(), HTTPStatus.ACCEPTED)
+    
+    def do_DELETE(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "jobs":
+            self._send_error("Не найдено", HTTPStatus.NOT_FOUND)
+            return
+        job = self._job_from_path()
+        if job is None:
+            return
+        if self.service.cancel(job.id):
+            self._send_json(job.to_dict())
+        else:
+            self._send_error("Задание уже выполняется или завершено", HTTPStatus.CONFLICT)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_http_server(
+    service: ProcessingServer,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+    verbose: bool = False
+) -> socketserver.BaseServer:
+    """
+    Создает HTTP сервер для очереди заданий.
+    
+    Args:
+        service: Очередь заданий
+        host: Адрес TCP (по умолчанию только локальный)
+        port: Порт TCP
+        socket_path: Путь к Unix-сокету; если задан, TCP не используется
+        verbose: Писать ли журнал запросов
+    
+    Returns:
+        socketserver.BaseServer: Сервер (запускается serve_forever())
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = _UnixHTTPServer(socket_path, _RequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), _RequestHandler)
+        server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def serve(
+    processor: File2Text,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+    workers: int = 1,
+    max_queue: int = 16,
+    warm: Iterable[str] = ("transcribe",),
+    root: Optional[str] = None,
+    allow_any_path: bool = False,
+    verbose: bool = False
+):
+    """
+    Запускает сервер и обслуживает запросы до прерывания (Ctrl+C).
+    
+    Args:
+        processor: Экземпляр File2Text
+        host: Адрес TCP
+        port: Порт TCP
+        socket_path: Путь к Unix-сокету вместо TCP
+        workers: Число одновременно выполняемых заданий
+        max_queue: Размер очереди заданий
+        warm: Этапы, модели которых загружаются при запуске
+        root: Папка, файлы из которой принимаются. Если None - текущая папка
+        allow_any_path: Принимать любые файлы, которые может прочитать процесс сервера
+        verbose: Выводить ли подробную информацию
+    """
+    service = ProcessingServer(
+        processor, workers=workers, max_queue=max_queue, root=root, allow_any_path=allow_any_path
+    )
+    
+    if verbose:
+        print(f"Загрузка моделей: {', '.join(warm) or 'нет'}")
+    started = time.perf_counter()
+    service.warm_up(warm)
+    if verbose:
+        print(f"Модели загружены за {time.perf_counter() - started:.1f} с")
+    
+    server = make_http_server(service, host=host, port=port, socket_path=socket_path, verbose=verbose)
+    service.start()
+    if verbose:
+        print(f"Сервер слушает {socket_path or f'http://{host}:{port}'}")
+        print(f"Принимаются файлы: {service.root or 'любые (--allow-any-path)'}")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        service.shutdown()
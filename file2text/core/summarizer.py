@@ -1,43 +1,90 @@
 """Модуль для суммаризации текста."""
 
 import re
-import torch
-from transformers import pipeline
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from file2text.core.registry import ModelKey, ModelRegistry, get_model_registry
 from file2text.utils.text_cleaner import clean_text, postprocess_summary
 
+# Лимит входа модели, если токенизатор его не задает
+_DEFAULT_INPUT_TOKENS = 512
+# Запас на служебные токены, которые пайплайн добавляет к чанку
+_INPUT_MARGIN_TOKENS = 8
 
-def _split_text_into_chunks(text: str, max_length: int = 1000, overlap: int = 200) -> list:
-    """Разбивает текст на чанки с перекрытием для обработки длинных текстов."""
-    if len(text) <= max_length:
+
+def _split_text_into_chunks(
+    text: str,
+    max_length: int = 1000,
+    overlap: int = 200,
+    measure: Optional[Callable[[List[str]], List[int]]] = None
+) -> List[str]:
+    """
+    Разбивает текст на чанки по предложениям с перекрытием.
+    
+    Предложения добавляются в чанк, пока их суммарная длина не превысит
+    max_length. Следующий чанк начинается с последних предложений
+    предыдущего общей длиной не больше overlap. Длина измеряется функцией
+    measure, которая вызывается один раз для всех предложений (например,
+    число токенов токенизатора модели); без нее - в символах, с учетом
+    разделителя ". " между предложениями. Предложение длиннее max_length
+    делится по словам.
+    
+    Args:
+        text: Исходный текст
+        max_length: Максимальная длина чанка
+        overlap: Длина перекрытия соседних чанков
+        measure: Длины списка предложений в тех же единицах, что max_length
+        
+    Returns:
+        List[str]: Чанки (исходный текст целиком, если он помещается в max_length)
+    """
+    if measure is None and len(text) <= max_length:
         return [text]
     
-    chunks = []
-    sentences = re.split(r'[.!?]\s+', text)
-    current_chunk = []
-    current_length = 0
+    sentences = [sentence.strip() for sentence in re.split(r'[.!?]\s+', text)]
+    sentences = [sentence for sentence in sentences if sentence]
+    if not sentences:
+        return []
+    if measure is not None:
+        lengths = measure(sentences)
+    else:
+        lengths = [len(sentence) + 2 for sentence in sentences]
+    if sum(lengths) <= max_length:
+        return [text]
     
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
+    # Слишком длинные предложения делятся по словам на части; длина части
+    # оценивается пропорционально числу слов, без повторного измерения
+    pieces: List[str] = []
+    piece_lengths: List[int] = []
+    for sentence, length in zip(sentences, lengths):
+        words = sentence.split()
+        if length <= max_length or len(words) < 2:
+            pieces.append(sentence)
+            piece_lengths.append(length)
             continue
-            
-        sentence_length = len(sentence)
-        
-        if current_length + sentence_length > max_length and current_chunk:
-            chunk_text = '. '.join(current_chunk) + '.'
-            chunks.append(chunk_text)
-            overlap_sentences = current_chunk[-3:] if len(current_chunk) >= 3 else current_chunk
-            current_chunk = overlap_sentences + [sentence]
-            current_length = sum(len(s) for s in current_chunk)
-        else:
-            current_chunk.append(sentence)
-            current_length += sentence_length
+        step = -(-len(words) // (length // max_length + 1))
+        for start in range(0, len(words), step):
+            part = words[start:start + step]
+            pieces.append(' '.join(part))
+            piece_lengths.append(-(-length * len(part) // len(words)))
     
-    if current_chunk:
-        chunk_text = '. '.join(current_chunk) + '.'
-        chunks.append(chunk_text)
+    chunks = []
+    start = 0
+    current_length = 0
+    for i, length in enumerate(piece_lengths):
+        if current_length + length > max_length and i > start:
+            chunks.append('. '.join(pieces[start:i]) + '.')
+            # Перекрытие набирается с конца чанка по уже известным длинам;
+            # новый чанк всегда начинается дальше предыдущего
+            start_next, current_length = i, 0
+            while (start_next - 1 > start
+                   and current_length + piece_lengths[start_next - 1] <= overlap
+                   and current_length + piece_lengths[start_next - 1] + length <= max_length):
+                start_next -= 1
+                current_length += piece_lengths[start_next]
+            start = start_next
+        current_length += length
     
+    chunks.append('. '.join(pieces[start:]) + '.')
     return chunks
 
 
@@ -48,7 +95,13 @@ class Summarizer:
         self,
         model: str = "IlyaGusev/rut5_base_sum_gazeta",
         device: Optional[str] = None,
-        verbose: bool = False
+        verbose: bool = False,
+        registry: Optional[ModelRegistry] = None,
+        batch_size: int = 8,
+        quantize: bool = False,
+        cache_dir: Optional[str] = None,
+        max_input_tokens: Optional[int] = None,
+        chunk_overlap_tokens: int = 64
     ):
         """
         Инициализация суммаризатора.
@@ -57,120 +110,298 @@ class Summarizer:
             model: Модель для суммаризации
             device: Устройство для обработки. Если None, определяется автоматически
             verbose: Выводить ли подробную информацию
+            registry: Реестр моделей. Если None, используется общий реестр процесса
+            batch_size: Количество чанков в одном вызове модели
+            quantize: Квантовать линейные слои в int8 (только для CPU)
+            cache_dir: Папка кэша для квантованной модели
+            max_input_tokens: Размер чанка в токенах. Если None, берется лимит
+                              входа токенизатора модели
+            chunk_overlap_tokens: Перекрытие соседних чанков в токенах
         """
         self.model_name = model
         self.verbose = verbose
+        self.batch_size = max(1, batch_size)
+        self.registry = registry or get_model_registry()
         
         if device is None:
+            import torch
             self.device = 0 if torch.cuda.is_available() else -1
         else:
             self.device = 0 if device == "cuda" else -1
         
+        self.quantize = quantize and self.device == -1
+        self.cache_dir = cache_dir
+        
+        self._model_key = ModelKey(
+            "summarization", model, "cuda" if self.device == 0 else "cpu",
+            "int8" if self.quantize else "float32"
+        )
+        self.summarizer = self.registry.acquire(self._model_key, self._load_pipeline)
+        self.max_input_tokens = self._input_limit(max_input_tokens)
+        self.chunk_overlap_tokens = max(0, chunk_overlap_tokens)
+    
+    def _load_pipeline(self):
+        """Загружает пайплайн суммаризации (вызывается реестром один раз на ключ)."""
         if self.verbose:
             print("Загрузка модели суммаризации...")
         
-        self.summarizer = pipeline(
+        from transformers import pipeline
+        
+        model = self.model_name
+        if self.quantize:
+            from transformers import AutoModelForSeq2SeqLM
+            from file2text.utils.quantization import load_quantized
+            model = load_quantized(
+                f"summarization-{self.model_name}",
+                lambda: AutoModelForSeq2SeqLM.from_pretrained(self.model_name),
+                cache_dir=self.cache_dir,
+                verbose=self.verbose
+            )
+        
+        summarizer = pipeline(
             'summarization',
             model=model,
             device=self.device,
-            tokenizer=model
+            tokenizer=self.model_name
         )
         
         if self.verbose:
             print("Модель суммаризации загружена")
+        
+        return summarizer
     
-    def summarize(
+    def _input_limit(self, max_input_tokens: Optional[int]) -> int:
+        """Лимит входа в токенах: не больше, чем пайплайн оставит при усечении."""
+        limit = getattr(getattr(self.summarizer, 'tokenizer', None), 'model_max_length', None)
+        # Токенизаторы без лимита сообщают огромное значение
+        if not isinstance(limit, int) or limit > 100_000:
+            limit = _DEFAULT_INPUT_TOKENS
+        return min(max_input_tokens, limit) if max_input_tokens else limit
+    
+    def _split(self, text: str) -> List[str]:
+        """
+        Разбивает текст на чанки по лимиту входа модели.
+        
+        Каждое предложение токенизируется один раз, и чанк заполняется
+        предложениями почти до лимита, поэтому вызовов модели меньше и
+        пайплайн не отрезает конец чанка. Без токенизатора (заглушки)
+        чанки считаются в символах.
+        """
+        tokenizer = getattr(self.summarizer, 'tokenizer', None)
+        if tokenizer is None:
+            return _split_text_into_chunks(text, max_length=1000, overlap=200)
+        
+        budget = max(1, self.max_input_tokens - _INPUT_MARGIN_TOKENS)
+        
+        def measure(sentences: List[str]) -> List[int]:
+            encoded = tokenizer(sentences, add_special_tokens=False)['input_ids']
+            # Плюс токен на разделитель ". " между предложениями
+            return [len(ids) + 1 for ids in encoded]
+        
+        return _split_text_into_chunks(
+            text,
+            max_length=budget,
+            overlap=min(self.chunk_overlap_tokens, budget // 2),
+            measure=measure
+        )
+    
+    def close(self):
+        """Освобождает модель в реестре (повторный вызов безопасен)."""
+        if self.summarizer is not None:
+            self.registry.release(self._model_key)
+            self.summarizer = None
+    
+    def _generate(
         self,
-        text: str,
-        max_length: int = 250,
-        min_length: int = 50
-    ) -> str:
+        texts: List[str],
+        max_length: int,
+        min_length: int
+    ) -> List[Optional[str]]:
         """
-        Суммаризирует текст.
+        Прогоняет тексты через модель батчами.
+        
+        Тексты сортируются по длине, чтобы в батч попадали тексты близкой
+        длины и на паддинг уходило меньше вычислений. Если батч не удалось
+        обработать, его тексты обрабатываются по одному.
         
         Args:
-            text: Исходный текст
+            texts: Тексты для суммаризации
             max_length: Максимальная длина суммаризации
             min_length: Минимальная длина суммаризации
             
         Returns:
-            str: Суммаризированный текст
+            List[Optional[str]]: Суммаризации в исходном порядке
+                                 (None для текстов, которые не удалось обработать)
         """
-        if not text or len(text.strip()) < 50:
-            return text
+        params = {
+            'max_length': max_length,
+            'min_length': min_length,
+            'do_sample': False,
+            'truncation': True
+        }
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        outputs: List[Optional[str]] = [None] * len(texts)
         
-        # Очистка текста от артефактов перед суммаризацией
-        text = clean_text(text)
-        
-        if not text or len(text.strip()) < 50:
-            return text
-        
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Если текст короткий, суммаризируем напрямую
-        if len(text) <= 1000:
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
             try:
-                result = self.summarizer(
-                    text,
-                    max_length=max_length,
-                    min_length=min_length,
-                    do_sample=False,
-                    truncation=True
+                results = self.summarizer(
+                    [texts[i] for i in batch], batch_size=len(batch), **params
                 )
-                summary = result[0]['summary_text'].strip()
-                return postprocess_summary(summary)
+                for i, result in zip(batch, results):
+                    outputs[i] = result['summary_text'].strip()
             except Exception as e:
                 if self.verbose:
-                    print(f"Ошибка при суммаризации короткого текста: {e}")
-                return text
+                    print(f"Ошибка при суммаризации батча, обрабатываю по одному: {e}")
+                for i in batch:
+                    try:
+                        result = self.summarizer(texts[i], **params)
+                        outputs[i] = result[0]['summary_text'].strip()
+                    except Exception as e:
+                        if self.verbose:
+                            print(f"Ошибка при суммаризации чанка: {e}")
+            
+            if self.verbose:
+                print(f"  Обработано чанков: {min(start + self.batch_size, len(order))}/{len(order)}")
+        
+        return outputs
+    
+    def _summarize_requests(
+        self,
+        requests: List[Tuple[str, int, int]]
+    ) -> List[str]:
+        """
+        Суммаризирует несколько текстов за минимальное число вызовов модели.
         
-        # Для длинных текстов разбиваем на чанки
-        chunks = _split_text_into_chunks(text, max_length=1000, overlap=200)
-        summaries = []
+        Чанки всех текстов собираются вместе и обрабатываются батчами
+        (отдельно для каждой пары max_length/min_length, так как параметры
+        генерации общие для батча). Повторная суммаризация слишком длинных
+        объединенных результатов также выполняется одним батчевым проходом.
         
-        for i, chunk in enumerate(chunks):
-            if len(chunk.strip()) < 50:
+        Args:
+            requests: Список (текст, max_length, min_length)
+            
+        Returns:
+            List[str]: Суммаризации в порядке запросов
+        """
+        summaries: List[Optional[str]] = [None] * len(requests)
+        # Для каждого запроса: список чанков и признак прямой суммаризации
+        plans: Dict[int, Tuple[List[str], bool]] = {}
+        
+        for i, (text, _, _) in enumerate(requests):
+            if not text or len(text.strip()) < 50:
+                summaries[i] = text
                 continue
-                
-            try:
-                result = self.summarizer(
-                    chunk,
-                    max_length=max_length,
-                    min_length=min_length,
-                    do_sample=False,
-                    truncation=True
-                )
-                chunk_summary = result[0]['summary_text'].strip()
-                chunk_summary = postprocess_summary(chunk_summary)
-                summaries.append(chunk_summary)
-                if self.verbose:
-                    print(f"  Обработан чанк {i+1}/{len(chunks)}")
-            except Exception as e:
-                if self.verbose:
-                    print(f"Ошибка при суммаризации чанка {i+1}: {e}")
-                summaries.append(chunk[:200] + "...")
+            
+            # Очистка текста от артефактов перед суммаризацией
+            text = clean_text(text)
+            
+            if not text or len(text.strip()) < 50:
+                summaries[i] = text
+                continue
+            
+            text = re.sub(r'\s+', ' ', text).strip()
+            
+            chunks = self._split(text)
+            if len(chunks) > 1:
+                chunks = [chunk for chunk in chunks if len(chunk.strip()) >= 50]
+            if not chunks:
+                # Разбиение не дало пригодных чанков - возвращаем очищенный текст
+                summaries[i] = text
+            elif len(chunks) == 1:
+                # Текст помещается во вход модели, суммаризируем напрямую
+                plans[i] = (chunks, True)
+            else:
+                plans[i] = (chunks, False)
         
-        combined_summary = ' '.join(summaries)
-        combined_summary = postprocess_summary(combined_summary)
+        chunk_summaries = self._generate_grouped(
+            [(chunk, requests[i][1], requests[i][2])
+             for i, (chunks, _) in plans.items() for chunk in chunks]
+        )
         
-        # Если объединенная суммаризация все еще длинная, суммаризируем еще раз
-        if len(combined_summary) > 1500:
-            try:
-                final_result = self.summarizer(
-                    combined_summary,
-                    max_length=max_length,
-                    min_length=min_length,
-                    do_sample=False,
-                    truncation=True
-                )
-                final_summary = final_result[0]['summary_text'].strip()
-                return postprocess_summary(final_summary)
-            except Exception as e:
-                if self.verbose:
-                    print(f"Ошибка при финальной суммаризации: {e}")
-                return combined_summary
+        final_requests = {}
+        position = 0
+        for i, (chunks, direct) in plans.items():
+            results = chunk_summaries[position:position + len(chunks)]
+            position += len(chunks)
+            
+            if direct:
+                summary = results[0]
+                summaries[i] = postprocess_summary(summary) if summary is not None else chunks[0]
+                continue
+            
+            parts = [
+                postprocess_summary(summary) if summary is not None else chunk[:200] + "..."
+                for chunk, summary in zip(chunks, results)
+            ]
+            combined_summary = postprocess_summary(' '.join(parts))
+            summaries[i] = combined_summary
+            
+            # Если объединенная суммаризация все еще длинная, суммаризируем еще раз
+            if len(combined_summary) > 1500:
+                final_requests[i] = combined_summary
+        
+        if final_requests:
+            final_summaries = self._generate_grouped(
+                [(text, requests[i][1], requests[i][2]) for i, text in final_requests.items()]
+            )
+            for i, summary in zip(final_requests, final_summaries):
+                if summary is not None:
+                    summaries[i] = postprocess_summary(summary)
+        
+        return summaries
+    
+    def _generate_grouped(self, items: List[Tuple[str, int, int]]) -> List[Optional[str]]:
+        """Вызывает _generate отдельно для каждой пары (max_length, min_length)."""
+        outputs: List[Optional[str]] = [None] * len(items)
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        for i, (_, max_length, min_length) in enumerate(items):
+            groups.setdefault((max_length, min_length), []).append(i)
+        
+        for (max_length, min_length), indices in groups.items():
+            results = self._generate([items[i][0] for i in indices], max_length, min_length)
+            for i, result in zip(indices, results):
+                outputs[i] = result
+        
+        return outputs
+    
+    def summarize(
+        self,
+        text: str,
+        max_length: int = 250,
+        min_length: int = 50
+    ) -> str:
+        """
+        Суммаризирует текст.
         
-        return combined_summary
+        Args:
+            text: Исходный текст
+            max_length: Максимальная длина суммаризации
+            min_length: Минимальная длина суммаризации
+            
+        Returns:
+            str: Суммаризированный текст
+        """
+        return self._summarize_requests([(text, max_length, min_length)])[0]
+    
+    def summarize_many(
+        self,
+        texts: List[str],
+        max_length: int = 250,
+        min_length: int = 50
+    ) -> List[str]:
+        """
+        Суммаризирует несколько текстов, обрабатывая их чанки общими батчами.
+        
+        Args:
+            texts: Исходные тексты
+            max_length: Максимальная длина суммаризации
+            min_length: Минимальная длина суммаризации
+            
+        Returns:
+            List[str]: Суммаризации в порядке текстов
+        """
+        return self._summarize_requests([(text, max_length, min_length) for text in texts])
     
     def summarize_by_speakers(
         self,
@@ -189,19 +420,9 @@ class Summarizer:
         Returns:
             Dict[str, str]: Словарь {speaker: summary}
         """
-        summaries = {}
-        
-        for speaker, text in speakers_text.items():
-            if len(text.strip()) < 50:
-                continue
-            
-            if self.verbose:
-                print(f"  Суммаризирую текст спикера {speaker}...")
-            
-            summary = self.summarize(text, max_length=max_length, min_length=min_length)
-            summaries[speaker] = summary
-        
-        return summaries
+        return self.summarize_conversation(
+            None, speakers_text, speaker_max_length=max_length, speaker_min_length=min_length
+        )['by_speakers']
     
     def summarize_full(
         self,
@@ -221,3 +442,54 @@ class Summarizer:
             str: Суммаризированный текст
         """
         return self.summarize(text, max_length=max_length, min_length=min_length)
+    
+    def summarize_conversation(
+        self,
+        text: Optional[str],
+        speakers_text: Optional[Dict[str, str]] = None,
+        max_length: int = 300,
+        min_length: int = 100,
+        speaker_max_length: int = 200,
+        speaker_min_length: int = 50
+    ) -> Dict[str, object]:
+        """
+        Суммаризирует весь разговор и текст каждого спикера за один проход.
+        
+        Чанки полного текста и текстов всех спикеров обрабатываются общими
+        батчами, а не отдельным вызовом summarize() на каждого спикера.
+        
+        Args:
+            text: Полный текст разговора (None - не суммаризировать)
+            speakers_text: Словарь {speaker: text}
+            max_length: Максимальная длина суммаризации всего текста
+            min_length: Минимальная длина суммаризации всего текста
+            speaker_max_length: Максимальная длина суммаризации спикера
+            speaker_min_length: Минимальная длина суммаризации спикера
+            
+        Returns:
+            Dict с ключами:
+                - full: Суммаризация всего текста (если text передан)
+                - by_speakers: Словарь {speaker: summary}
+        """
+        requests = []
+        if text:
+            requests.append((text, max_length, min_length))
+        
+        speakers = [
+            speaker for speaker, speaker_text in (speakers_text or {}).items()
+            if len(speaker_text.strip()) >= 50
+        ]
+        if self.verbose and speakers:
+            print(f"  Суммаризирую текст спикеров: {', '.join(map(str, speakers))}...")
+        requests.extend(
+            (speakers_text[speaker], speaker_max_length, speaker_min_length)
+            for speaker in speakers
+        )
+        
+        summaries = self._summarize_requests(requests)
+        
+        result: Dict[str, object] = {}
+        if text:
+            result['full'] = summaries.pop(0)
+        result['by_speakers'] = dict(zip(speakers, summaries))
+        return result
@@ -1,10 +1,108 @@
 """Модуль для транскрипции аудио в текст с помощью Whisper."""
 
-import whisper
-import torch
-from typing import Dict, List, Optional, Any
+import multiprocessing
+import os
+import threading
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Any, Union
 from pathlib import Path
 
+from file2text.core.registry import ModelKey, ModelRegistry, get_model_registry
+from file2text.utils.audio_converter import AudioConverter
+from file2text.utils.vad import concatenate_speech, detect_speech, remap_segments, split_on_silence
+
+
+# Профили декодирования Whisper: от быстрого к точному. archival - прежние
+# параметры по умолчанию (лучевой поиск шириной 5 и метки слов)
+DECODING_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Жадное декодирование без меток слов и без опоры на предыдущий текст
+    "realtime": {
+        "beam_size": None,
+        "best_of": None,
+        "patience": None,
+        "condition_on_previous_text": False,
+        "word_timestamps": False,
+    },
+    # Узкий лучевой поиск, только метки сегментов
+    "balanced": {
+        "beam_size": 2,
+        "best_of": 2,
+        "patience": 1.0,
+        "condition_on_previous_text": True,
+        "word_timestamps": False,
+    },
+    "archival": {
+        "beam_size": 5,
+        "best_of": 5,
+        "patience": 1.0,
+        "condition_on_previous_text": True,
+        "word_timestamps": True,
+    },
+}
+
+
+# Транскриптор процесса-исполнителя transcribe_long (своя модель в каждом процессе)
+_worker_transcriber = None
+
+
+def _init_long_worker(
+    model: str,
+    device: str,
+    vad: bool,
+    threads: int,
+    quantize: bool = False,
+    cache_dir: Optional[str] = None,
+    profile: str = "archival"
+):
+    """Загружает модель в процессе-исполнителе transcribe_long."""
+    global _worker_transcriber
+    import torch
+    torch.set_num_threads(threads)
+    _worker_transcriber = Transcriber(
+        model=model,
+        device=device,
+        registry=ModelRegistry(),
+        vad=vad,
+        quantize=quantize,
+        cache_dir=cache_dir,
+        profile=profile
+    )
+
+
+def _transcribe_window(
+    audio: np.ndarray,
+    language: str,
+    word_timestamps: Optional[bool],
+    kwargs: Dict[str, Any]
+):
+    """Транскрибирует одно окно в процессе-исполнителе."""
+    return _worker_transcriber.transcribe(
+        audio, language=language, word_timestamps=word_timestamps, **kwargs
+    )
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _shift_segment(segment: Dict[str, Any], offset: float) -> Dict[str, Any]:
+    """Копия сегмента (и его слов) со временем, сдвинутым на offset секунд."""
+    segment = dict(segment)
+    segment['start'] += offset
+    segment['end'] += offset
+    if 'seek' in segment:
+        # seek у Whisper - в кадрах мел-спектрограммы (100 кадров в секунду)
+        segment['seek'] += int(round(offset * 100))
+    if segment.get('words'):
+        segment['words'] = [
+            {**word, 'start': word['start'] + offset, 'end': word['end'] + offset}
+            for word in segment['words']
+        ]
+    return segment
+
 
 class Transcriber:
     """Класс для транскрипции аудио файлов в текст."""
@@ -13,7 +111,12 @@ class Transcriber:
         self,
         model: str = "medium",
         device: Optional[str] = None,
-        verbose: bool = False
+        verbose: bool = False,
+        registry: Optional[ModelRegistry] = None,
+        vad: bool = False,
+        quantize: bool = False,
+        cache_dir: Optional[str] = None,
+        profile: str = "archival"
     ):
         """
         Инициализация транскриптора.
@@ -22,29 +125,75 @@ class Transcriber:
             model: Модель Whisper (tiny, base, small, medium, large-v2, large-v3)
             device: Устройство для обработки ("cuda" или "cpu"). Если None, определяется автоматически
             verbose: Выводить ли подробную информацию
+            registry: Реестр моделей. Если None, используется общий реестр процесса
+            vad: Удалять тишину и музыку перед транскрипцией (см. file2text.utils.vad)
+            quantize: Квантовать линейные слои в int8 (только для CPU)
+            cache_dir: Папка кэша для квантованной модели
+            profile: Профиль декодирования (realtime, balanced, archival),
+                     см. DECODING_PROFILES
         """
+        if profile not in DECODING_PROFILES:
+            raise ValueError(
+                f"Неизвестный профиль декодирования: {profile}. "
+                f"Доступны: {', '.join(DECODING_PROFILES)}"
+            )
+        
         self.model_name = model
+        self.profile = profile
         self.verbose = verbose
+        self.vad = vad
+        self.registry = registry or get_model_registry()
         
         # Определяем устройство
         if device is None:
+            import torch
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
         else:
             self.device = device
         
+        # Динамическое квантование PyTorch работает только на CPU
+        self.quantize = quantize and self.device == "cpu"
+        self.cache_dir = cache_dir
+        
         if self.verbose:
             print(f"Используемое устройство: {self.device}")
-            print(f"Загрузка модели Whisper: {model}...")
+            if quantize and not self.quantize:
+                print("Квантование int8 доступно только на CPU, модель загружается без него")
+        
+        self._model_key = ModelKey("whisper", model, self.device, "int8" if self.quantize else "float32")
+        self.model = self.registry.acquire(self._model_key, self._load_model)
+        
+        # Пул процессов transcribe_long: создается при первом вызове и живет
+        # до close(), чтобы модель не загружалась в процессы заново для каждого файла
+        self._long_pool: Optional[ProcessPoolExecutor] = None
+        self._long_pool_size = 0
+        self._long_pool_lock = threading.Lock()
+    
+    def _load_model(self):
+        """Загружает модель Whisper (вызывается реестром один раз на ключ)."""
+        if self.verbose:
+            print(f"Загрузка модели Whisper: {self.model_name}...")
+        
+        import whisper
         
-        # Загружаем модель
         try:
-            self.model = whisper.load_model(model, device=self.device)
+            if self.quantize:
+                from file2text.utils.quantization import load_quantized
+                model = load_quantized(
+                    f"whisper-{self.model_name}",
+                    lambda: whisper.load_model(self.model_name, device="cpu"),
+                    cache_dir=self.cache_dir,
+                    verbose=self.verbose
+                )
+            else:
+                model = whisper.load_model(self.model_name, device=self.device)
             if self.verbose:
-                print(f"Модель {model} загружена успешно")
+                print(f"Модель {self.model_name} загружена успешно")
+            return model
         except RuntimeError as e:
             if "out of memory" in str(e).lower() or "cuda" in str(e).lower():
                 error_msg = (
-                    f"ОШИБКА: Не хватает памяти для модели {model}\n"
+                    f"ОШИБКА: Не хватает памяти для модели {self.model_name}\n"
                     "Попробуйте использовать модель 'small' или 'base'\n"
                     "Или закройте другие приложения, использующие GPU"
                 )
@@ -54,20 +203,57 @@ class Transcriber:
             else:
                 raise
     
+    def close(self):
+        """Освобождает модель в реестре и останавливает пул transcribe_long (повторный вызов безопасен)."""
+        self._shutdown_long_pool()
+        if self.model is not None:
+            self.registry.release(self._model_key)
+            self.model = None
+    
+    def _get_long_pool(self, size: int) -> ProcessPoolExecutor:
+        """Пул из size процессов-исполнителей; пул другого размера пересоздается."""
+        with self._long_pool_lock:
+            if self._long_pool is not None and self._long_pool_size != size:
+                self._long_pool.shutdown(wait=True)
+                self._long_pool = None
+            if self._long_pool is None:
+                cpu_count = os.cpu_count() or 1
+                # spawn: fork процесса с уже инициализированным torch может зависнуть
+                self._long_pool = ProcessPoolExecutor(
+                    max_workers=size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_long_worker,
+                    initargs=(
+                        self.model_name, self.device, self.vad, max(1, cpu_count // size),
+                        self.quantize, self.cache_dir, self.profile
+                    )
+                )
+                self._long_pool_size = size
+            return self._long_pool
+    
+    def _shutdown_long_pool(self):
+        with self._long_pool_lock:
+            if self._long_pool is not None:
+                self._long_pool.shutdown(wait=True)
+                self._long_pool = None
+                self._long_pool_size = 0
+    
     def transcribe(
         self,
-        audio_path: str,
+        audio_path: Union[str, np.ndarray],
         language: str = "ru",
-        word_timestamps: bool = True,
+        word_timestamps: Optional[bool] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
         Транскрибирует аудио файл в текст.
         
         Args:
-            audio_path: Путь к аудио файлу
+            audio_path: Путь к аудио файлу или уже декодированный сигнал
+                       (float32, моно, 16 кГц)
             language: Язык аудио (по умолчанию "ru")
-            word_timestamps: Включать ли временные метки слов
+            word_timestamps: Включать ли временные метки слов. Если None,
+                             определяется профилем декодирования
             **kwargs: Дополнительные параметры для whisper.transcribe()
             
         Returns:
@@ -76,18 +262,45 @@ class Transcriber:
                 - segments: Список сегментов с временными метками
                 - language: Определенный язык
         """
-        audio_path = Path(audio_path)
-        if not audio_path.exists():
-            raise FileNotFoundError(f"Аудио файл не найден: {audio_path}")
+        if isinstance(audio_path, np.ndarray):
+            audio = audio_path
+        else:
+            audio_path = Path(audio_path)
+            if not audio_path.exists():
+                raise FileNotFoundError(f"Аудио файл не найден: {audio_path}")
+            if self.verbose:
+                print(f"Декодирую аудио: {audio_path}")
+            audio = AudioConverter.decode_to_array(str(audio_path))
+        
+        params = self._decode_params(language, word_timestamps, kwargs)
+        
+        if self.vad:
+            return self._transcribe_speech(audio, params)
+        
+        if self.verbose:
+            print(f"Начинаю транскрипцию сигнала: {len(audio) / 16000:.1f} с")
+        
+        result = self.model.transcribe(audio, **params)
+        
+        if self.verbose:
+            print(f"Транскрипция завершена. Длина текста: {len(result['text'])} символов")
+        
+        return result
+    
+    def _decode_params(
+        self,
+        language: str,
+        word_timestamps: Optional[bool],
+        kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Параметры whisper.transcribe() с учетом профиля и переданных kwargs."""
+        profile = dict(DECODING_PROFILES[self.profile])
+        profile_word_timestamps = profile.pop("word_timestamps")
         
-        # Параметры по умолчанию для лучшего качества
         default_params = {
             "task": "transcribe",
             "temperature": 0.0,
-            "beam_size": 5,
-            "best_of": 5,
-            "patience": 1.0,
-            "condition_on_previous_text": True,
+            **profile,
             "initial_prompt": "Это разговор на русском языке. ",
             "verbose": self.verbose
         }
@@ -95,12 +308,188 @@ class Transcriber:
         # Объединяем параметры (kwargs имеют приоритет)
         params = {**default_params, **kwargs}
         params["language"] = language
-        params["word_timestamps"] = word_timestamps
+        params["word_timestamps"] = (
+            profile_word_timestamps if word_timestamps is None else word_timestamps
+        )
+        return params
+    
+    def transcribe_long(
+        self,
+        audio_path: Union[str, np.ndarray],
+        workers: Optional[int] = None,
+        window_seconds: float = 180.0,
+        language: str = "ru",
+        word_timestamps: Optional[bool] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Транскрибирует длинную запись параллельно в нескольких процессах.
+        
+        Сигнал делится в паузах на окна около window_seconds (см.
+        split_on_silence), окна транскрибируются в пуле процессов, где каждый
+        процесс держит свою модель, а результаты сшиваются: временные метки
+        сдвигаются на начало окна, а повторенный на стыке окон сегмент
+        удаляется. Рассчитано на CPU: потоки torch делятся между процессами.
+        Пул переиспользуется следующими вызовами с тем же workers и
+        останавливается в close().
+        
+        Args:
+            audio_path: Путь к аудио файлу или декодированный сигнал (float32, моно, 16 кГц)
+            workers: Количество процессов. Если None - по числу ядер
+            window_seconds: Желаемая длина окна в секундах
+            language: Язык аудио
+            word_timestamps: Включать ли временные метки слов. Если None,
+                             определяется профилем декодирования
+            **kwargs: Дополнительные параметры для transcribe()
+            
+        Returns:
+            Dict: Результат в формате transcribe()
+        """
+        if isinstance(audio_path, np.ndarray):
+            audio = audio_path
+        else:
+            if not Path(audio_path).exists():
+                raise FileNotFoundError(f"Аудио файл не найден: {audio_path}")
+            audio = AudioConverter.decode_to_array(str(audio_path))
+        
+        windows = split_on_silence(audio, window_seconds=window_seconds)
+        workers = workers or os.cpu_count() or 1
+        
+        if workers <= 1 or len(windows) <= 1:
+            return self.transcribe(audio, language=language, word_timestamps=word_timestamps, **kwargs)
         
         if self.verbose:
-            print(f"Начинаю транскрипцию: {audio_path}")
+            print(
+                f"Транскрипция {len(audio) / 16000:.1f} с аудио: {len(windows)} окон, "
+                f"{min(workers, len(windows))} процессов"
+            )
+        
+        kwargs = {k: v for k, v in kwargs.items() if k != 'verbose'}
+        
+        pool = self._get_long_pool(workers)
+        try:
+            futures = [
+                pool.submit(_transcribe_window, audio[start:end], language, word_timestamps, kwargs)
+                for start, end in windows
+            ]
+            results = [future.result() for future in futures]
+        except BrokenProcessPool:
+            # Процесс-исполнитель упал: следующий вызов создаст новый пул
+            self._shutdown_long_pool()
+            raise
         
-        result = self.model.transcribe(str(audio_path), **params)
+        segments = []
+        for (start, _), result in zip(windows, results):
+            offset = start / 16000.0
+            window_segments = result.get('segments', [])
+            
+            # Whisper иногда повторяет последнюю фразу окна в начале следующего
+            if (
+                segments and window_segments
+                and _normalize_text(window_segments[0]['text']) == _normalize_text(segments[-1]['text'])
+            ):
+                window_segments = window_segments[1:]
+            
+            for segment in window_segments:
+                segment = _shift_segment(segment, offset)
+                segment['id'] = len(segments)
+                segments.append(segment)
+        
+        text = "".join(segment['text'] for segment in segments)
+        
+        if self.verbose:
+            print(f"Транскрипция завершена. Длина текста: {len(text)} символов")
+        
+        return {
+            'text': text,
+            'segments': segments,
+            'language': results[0].get('language', language),
+        }
+    
+    def transcribe_stream(
+        self,
+        audio_path: Union[str, np.ndarray],
+        window_seconds: float = 60.0,
+        language: str = "ru",
+        word_timestamps: Optional[bool] = None,
+        **kwargs
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Транскрибирует аудио окнами и выдает сегменты по мере готовности.
+        
+        Сигнал делится в паузах на окна около window_seconds, окна
+        транскрибируются по очереди. Конец текста предыдущего окна передается
+        в initial_prompt следующего, чтобы сохранить контекст между окнами.
+        
+        Args:
+            audio_path: Путь к аудио файлу или декодированный сигнал (float32, моно, 16 кГц)
+            window_seconds: Желаемая длина окна в секундах
+            language: Язык аудио
+            word_timestamps: Включать ли временные метки слов. Если None,
+                             определяется профилем декодирования
+            **kwargs: Дополнительные параметры для whisper.transcribe()
+            
+        Yields:
+            Dict: Сегмент транскрипции с временными метками на шкале всего файла
+        """
+        if isinstance(audio_path, np.ndarray):
+            audio = audio_path
+        else:
+            if not Path(audio_path).exists():
+                raise FileNotFoundError(f"Аудио файл не найден: {audio_path}")
+            audio = AudioConverter.decode_to_array(str(audio_path))
+        
+        params = self._decode_params(language, word_timestamps, kwargs)
+        base_prompt = params.get("initial_prompt") or ""
+        windows = split_on_silence(
+            audio, window_seconds=window_seconds, search_seconds=window_seconds / 4
+        )
+        
+        index = 0
+        last_text = None
+        for start, end in windows:
+            if self.vad:
+                result = self._transcribe_speech(audio[start:end], params)
+            else:
+                result = self.model.transcribe(audio[start:end], **params)
+            
+            offset = start / 16000.0
+            for i, segment in enumerate(result.get('segments', [])):
+                # Повтор последней фразы предыдущего окна
+                if i == 0 and _normalize_text(segment['text']) == last_text:
+                    continue
+                segment = _shift_segment(segment, offset)
+                segment['id'] = index
+                index += 1
+                last_text = _normalize_text(segment['text'])
+                yield segment
+            
+            if params.get("condition_on_previous_text", True):
+                params["initial_prompt"] = base_prompt + result.get('text', '')[-200:]
+    
+    def _transcribe_speech(self, audio: np.ndarray, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Транскрибирует только участки речи и возвращает метки на исходной шкале.
+        
+        Участки без речи вырезаются, оставшиеся склеиваются через короткие
+        паузы, а временные метки сегментов и слов переводятся обратно на
+        шкалу исходного сигнала.
+        """
+        regions = detect_speech(audio)
+        speech_seconds = sum(end - start for start, end in regions)
+        
+        if self.verbose:
+            print(
+                f"VAD: речь {speech_seconds:.1f} с из {len(audio) / 16000:.1f} с "
+                f"({len(regions)} участков)"
+            )
+        
+        if not regions:
+            return {'text': '', 'segments': [], 'language': params['language']}
+        
+        speech, offsets = concatenate_speech(audio, regions)
+        result = self.model.transcribe(speech, **params)
+        result['segments'] = remap_segments(result.get('segments', []), offsets)
         
         if self.verbose:
             print(f"Транскрипция завершена. Длина текста: {len(result['text'])} символов")
@@ -124,13 +513,20 @@ class Transcriber:
     def transcribe_batch(
         self,
         audio_paths: List[str],
+        decode_workers: int = 2,
         **kwargs
     ) -> List[Dict[str, Any]]:
         """
         Транскрибирует несколько аудио файлов.
         
+        Декодирование следующих файлов выполняется в пуле потоков
+        параллельно с транскрипцией текущего, поэтому модель не простаивает
+        в ожидании чтения файлов.
+        
         Args:
             audio_paths: Список путей к аудио файлам
+            decode_workers: Количество потоков декодирования (0 - без
+                           параллельного декодирования)
             **kwargs: Дополнительные параметры для transcribe()
             
         Returns:
@@ -139,24 +535,58 @@ class Transcriber:
         results = []
         total = len(audio_paths)
         
-        for i, audio_path in enumerate(audio_paths, 1):
-            if self.verbose:
-                print(f"Обработка {i}/{total}: {audio_path}")
+        def load(audio_path: str) -> np.ndarray:
+            if not Path(audio_path).exists():
+                raise FileNotFoundError(f"Аудио файл не найден: {audio_path}")
+            return AudioConverter.decode_to_array(str(audio_path))
+        
+        # Держим в очереди не больше decode_workers + 1 декодированных файлов,
+        # чтобы не занимать память сигналами всех файлов сразу
+        prefetch = decode_workers + 1 if decode_workers > 0 else 0
+        pool = ThreadPoolExecutor(max_workers=decode_workers) if decode_workers > 0 else None
+        pending = deque()
+        paths = iter(audio_paths)
+        
+        def submit_next():
+            audio_path = next(paths, None)
+            if audio_path is not None:
+                pending.append((audio_path, pool.submit(load, audio_path)))
+        
+        try:
+            if pool is not None:
+                for _ in range(prefetch):
+                    submit_next()
             
-            try:
-                result = self.transcribe(audio_path, **kwargs)
-                results.append({
-                    "audio_path": audio_path,
-                    "success": True,
-                    "result": result
-                })
-            except Exception as e:
+            for i, audio_path in enumerate(audio_paths, 1):
                 if self.verbose:
-                    print(f"Ошибка при обработке {audio_path}: {e}")
-                results.append({
-                    "audio_path": audio_path,
-                    "success": False,
-                    "error": str(e)
-                })
+                    print(f"Обработка {i}/{total}: {audio_path}")
+                
+                try:
+                    if pool is not None:
+                        _, future = pending.popleft()
+                        submit_next()
+                        audio = future.result()
+                    else:
+                        audio = audio_path
+                    
+                    result = self.transcribe(audio, **kwargs)
+                    results.append({
+                        "audio_path": audio_path,
+                        "success": True,
+                        "result": result
+                    })
+                except Exception as e:
+                    if self.verbose:
+                        print(f"Ошибка при обработке {audio_path}: {e}")
+                    results.append({
+                        "audio_path": audio_path,
+                        "success": False,
+                        "error": str(e)
+                    })
+        finally:
+            if pool is not None:
+                for _, future in pending:
+                    future.cancel()
+                pool.shutdown(wait=False)
         
         return results
@@ -0,0 +1,497 @@
+"""Постоянный индекс векторов для поиска по сохраненным эмбеддингам."""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Количество строк матрицы, обрабатываемых за раз при обходе блоков
+_CHUNK_ROWS = 65536
+
+
+def _import_faiss(required: bool = True):
+    """
+    Импортирует faiss при первом обращении к HNSW, а не при импорте пакета.
+    
+    Args:
+        required: Бросать ImportError, если faiss не установлен (иначе вернуть None)
+    """
+    try:
+        import faiss
+    except ImportError:
+        if required:
+            raise ImportError(
+                "Для режима 'hnsw' нужен faiss. Установите: pip install file2text[vector-db]"
+            )
+        return None
+    return faiss
+
+
+class VectorIndex:
+    """
+    Индекс нормализованных векторов float32 с поиском по косинусной схожести.
+    
+    Векторы нормализуются при добавлении, поэтому схожесть считается одним
+    скалярным произведением. Сохраненный индекс открывается через memory map,
+    новые векторы дописываются в память отдельными блоками, удаление помечает
+    строки и не перестраивает матрицу до вызова compact() или save().
+    
+    Режимы поиска:
+        - exact: точный top-k через argpartition
+        - ivf: приближенный поиск по nprobe ближайшим кластерам k-means
+        - hnsw: граф HNSW из faiss (требует установки file2text[vector-db])
+    
+    Структура папки индекса:
+        vectors.npy - матрица векторов (n, dimension)
+        meta.json - идентификаторы, метаданные элементов и параметры
+        centroids.npy, lists.npy - кластеры IVF (если построены)
+        hnsw.faiss - граф HNSW (если используется)
+    """
+    
+    MODES = ("exact", "ivf", "hnsw")
+    
+    def __init__(
+        self,
+        dimension: int,
+        path: Optional[str] = None,
+        mode: str = "exact",
+        nprobe: int = 8,
+        hnsw_m: int = 32
+    ):
+        """
+        Инициализация пустого индекса.
+        
+        Args:
+            dimension: Размерность векторов
+            path: Папка для сохранения индекса (можно указать позже в save())
+            mode: Режим поиска по умолчанию: "exact", "ivf" или "hnsw"
+            nprobe: Количество просматриваемых кластеров в режиме "ivf"
+            hnsw_m: Число связей на узел графа в режиме "hnsw"
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим индекса: {mode}. Доступны: {', '.join(self.MODES)}")
+        if mode == "hnsw":
+            _import_faiss()
+        
+        self.dimension = dimension
+        self.path = Path(path) if path else None
+        self.mode = mode
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        
+        # Блоки матрицы: первый может быть memory map сохраненного файла
+        self._blocks: List[np.ndarray] = []
+        self._ids: List[int] = []
+        self._items: List[Any] = []
+        self._deleted = np.zeros(0, dtype=bool)
+        self._row_by_id: Dict[int, int] = {}
+        self._next_id = 0
+        
+        # Кластеры IVF
+        self._centroids: Optional[np.ndarray] = None
+        self._lists = np.zeros(0, dtype=np.int32)
+        
+        self._hnsw = None
+        self._hnsw_rows = 0
+    
+    # Построение и изменение
+    
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[np.newaxis, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+    
+    def add(
+        self,
+        vectors: np.ndarray,
+        items: Optional[Iterable[Any]] = None
+    ) -> List[int]:
+        """
+        Добавляет векторы в индекс.
+        
+        Args:
+            vectors: Массив (n, dimension) или один вектор
+            items: Метаданные для каждого вектора (текст, сегмент и т.п.),
+                   должны сериализоваться в JSON
+        
+        Returns:
+            List[int]: Идентификаторы добавленных векторов
+        """
+        vectors = self._normalize(vectors)
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Размерность векторов {vectors.shape[1]} не совпадает с индексом ({self.dimension})"
+            )
+        
+        items = list(items) if items is not None else [None] * len(vectors)
+        if len(items) != len(vectors):
+            raise ValueError("Количество метаданных не совпадает с количеством векторов")
+        
+        start_row = len(self._ids)
+        ids = list(range(self._next_id, self._next_id + len(vectors)))
+        self._next_id += len(vectors)
+        
+        self._blocks.append(vectors)
+        self._ids.extend(ids)
+        self._items.extend(items)
+        self._deleted = np.concatenate([self._deleted, np.zeros(len(vectors), dtype=bool)])
+        for offset, vector_id in enumerate(ids):
+            self._row_by_id[vector_id] = start_row + offset
+        
+        if self._centroids is not None:
+            self._lists = np.concatenate([self._lists, self._assign_lists(vectors)])
+        
+        return ids
+    
+    def delete(self, ids: Iterable[int]) -> int:
+        """
+        Помечает векторы как удаленные.
+        
+        Args:
+            ids: Идентификаторы векторов
+        
+        Returns:
+            int: Количество удаленных векторов
+        """
+        deleted = 0
+        for vector_id in ids:
+            row = self._row_by_id.pop(vector_id, None)
+            if row is not None and not self._deleted[row]:
+                self._deleted[row] = True
+                self._items[row] = None
+                deleted += 1
+        
+        return deleted
+    
+    def compact(self):
+        """
+        Физически удаляет помеченные строки.
+        
+        Копируются только блоки, в которых есть удаленные строки; остальные
+        (в том числе memory map сохраненного файла) остаются как есть.
+        """
+        keep = ~self._deleted
+        blocks = []
+        offset = 0
+        for block in self._blocks:
+            block_keep = keep[offset:offset + len(block)]
+            offset += len(block)
+            if block_keep.all():
+                blocks.append(block)
+            elif block_keep.any():
+                blocks.append(np.ascontiguousarray(block[block_keep], dtype=np.float32))
+        
+        self._blocks = blocks
+        self._ids = [vector_id for vector_id, k in zip(self._ids, keep) if k]
+        self._items = [item for item, k in zip(self._items, keep) if k]
+        self._lists = self._lists[keep] if len(self._lists) == len(keep) else self._lists
+        self._deleted = np.zeros(len(self._ids), dtype=bool)
+        self._row_by_id = {vector_id: row for row, vector_id in enumerate(self._ids)}
+        self._hnsw = None
+    
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10, seed: int = 0):
+        """
+        Строит кластеры k-means для приближенного поиска (режим "ivf").
+        
+        Матрица обходится блоками по _CHUNK_ROWS строк, поэтому индекс,
+        открытый через memory map, не читается в память целиком.
+        
+        Args:
+            nlist: Количество кластеров. По умолчанию ~sqrt(n)
+            iterations: Количество итераций k-means
+            seed: Начальное значение генератора случайных чисел
+        """
+        alive = np.flatnonzero(~self._deleted)
+        if len(alive) == 0:
+            raise ValueError("Индекс пуст")
+        
+        nlist = nlist or max(1, int(np.sqrt(len(alive))))
+        nlist = min(nlist, len(alive))
+        
+        rng = np.random.default_rng(seed)
+        centroids = self._take(alive[rng.choice(len(alive), size=nlist, replace=False)])
+        
+        # Сферический k-means: центры нормализуются, близость - скалярное произведение
+        for _ in range(iterations):
+            sums = np.zeros_like(centroids)
+            counts = np.zeros(nlist, dtype=np.int64)
+            for start, chunk in self._chunks():
+                chunk = chunk[~self._deleted[start:start + len(chunk)]]
+                if not len(chunk):
+                    continue
+                labels = np.argmax(chunk @ centroids.T, axis=1)
+                np.add.at(sums, labels, chunk)
+                counts += np.bincount(labels, minlength=nlist)
+            sums[counts == 0] = centroids[counts == 0]
+            centroids = self._normalize(sums)
+        
+        self._centroids = centroids
+        lists = [self._assign_lists(block) for block in self._blocks]
+        self._lists = np.concatenate(lists) if lists else np.zeros(0, dtype=np.int32)
+    
+    def _assign_lists(self, vectors: np.ndarray) -> np.ndarray:
+        lists = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), _CHUNK_ROWS):
+            block = np.asarray(vectors[start:start + _CHUNK_ROWS])
+            lists[start:start + len(block)] = np.argmax(block @ self._centroids.T, axis=1)
+        return lists
+    
+    def _chunks(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """Части матрицы в памяти: (номер первой строки, строки)."""
+        offset = 0
+        for block in self._blocks:
+            for start in range(0, len(block), _CHUNK_ROWS):
+                yield offset + start, np.asarray(block[start:start + _CHUNK_ROWS], dtype=np.float32)
+            offset += len(block)
+    
+    def _take(self, rows: np.ndarray) -> np.ndarray:
+        """Копия строк матрицы с указанными номерами."""
+        result = np.empty((len(rows), self.dimension), dtype=np.float32)
+        offset = 0
+        for block in self._blocks:
+            mask = (rows >= offset) & (rows < offset + len(block))
+            if mask.any():
+                result[mask] = block[rows[mask] - offset]
+            offset += len(block)
+        return result
+    
+    # Поиск
+    
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int = 5,
+        threshold: float = 0.0,
+        mode: Optional[str] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Ищет ближайшие векторы по косинусной схожести.
+        
+        Args:
+            query: Вектор запроса
+            top_k: Количество результатов
+            threshold: Минимальный порог схожести
+            mode: Режим поиска. Если None, используется режим индекса
+        
+        Returns:
+            List[Tuple[int, float]]: Список (идентификатор, схожесть),
+                                     отсортированный по убыванию
+        """
+        mode = mode or self.mode
+        query = self._normalize(query)[0]
+        
+        if top_k <= 0 or not self._row_by_id:
+            return []
+        
+        if mode == "hnsw":
+            rows, scores = self._search_hnsw(query, top_k)
+        else:
+            candidates = None
+            if mode == "ivf":
+                if self._centroids is None:
+                    self.build_ivf()
+                nprobe = min(self.nprobe, len(self._centroids))
+                probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+                candidates = np.flatnonzero(np.isin(self._lists, probe) & ~self._deleted)
+            rows, scores = self._search_exact(query, top_k, candidates)
+        
+        return [
+            (self._ids[row], float(score))
+            for row, score in zip(rows, scores)
+            if score >= threshold
+        ]
+    
+    def _search_exact(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        candidates: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Точный top-k по всем строкам (или по кандидатам) блоками матрицы."""
+        best_rows: List[np.ndarray] = []
+        best_scores: List[np.ndarray] = []
+        offset = 0
+        
+        for block in self._blocks:
+            block_rows = np.arange(offset, offset + len(block))
+            if candidates is not None:
+                block_rows = candidates[(candidates >= offset) & (candidates < offset + len(block))]
+                scores = np.asarray(block[block_rows - offset]) @ query
+            else:
+                scores = np.asarray(block) @ query
+                scores[self._deleted[offset:offset + len(block)]] = -np.inf
+            offset += len(block)
+            
+            if len(scores) > top_k:
+                part = np.argpartition(-scores, top_k - 1)[:top_k]
+                block_rows, scores = block_rows[part], scores[part]
+            best_rows.append(block_rows)
+            best_scores.append(scores)
+        
+        if not best_rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        
+        rows = np.concatenate(best_rows)
+        scores = np.concatenate(best_scores)
+        keep = np.isfinite(scores)
+        rows, scores = rows[keep], scores[keep]
+        order = np.argsort(-scores, kind='stable')[:top_k]
+        return rows[order], scores[order]
+    
+    def _search_hnsw(self, query: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Приближенный поиск по графу HNSW faiss."""
+        if self._hnsw is None or self._hnsw_rows != len(self._ids):
+            faiss = _import_faiss()
+            self._hnsw = faiss.IndexHNSWFlat(self.dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            for _, chunk in self._chunks():
+                self._hnsw.add(np.ascontiguousarray(chunk))
+            self._hnsw_rows = len(self._ids)
+        
+        # Запрашиваем с запасом на удаленные строки
+        k = min(len(self._ids), top_k + int(self._deleted.sum()))
+        if k == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        scores, rows = self._hnsw.search(query[np.newaxis, :].astype(np.float32), k)
+        rows, scores = rows[0], scores[0]
+        keep = (rows >= 0)
+        rows, scores = rows[keep], scores[keep]
+        keep = ~self._deleted[rows]
+        return rows[keep][:top_k], scores[keep][:top_k]
+    
+    # Доступ к элементам
+    
+    def item(self, vector_id: int) -> Any:
+        """Метаданные вектора по идентификатору."""
+        return self._items[self._row_by_id[vector_id]]
+    
+    def vector(self, vector_id: int) -> np.ndarray:
+        """Нормализованный вектор по идентификатору."""
+        row = self._row_by_id[vector_id]
+        for block in self._blocks:
+            if row < len(block):
+                return np.array(block[row])
+            row -= len(block)
+        raise KeyError(vector_id)
+    
+    def __len__(self) -> int:
+        return len(self._row_by_id)
+    
+    def __contains__(self, vector_id: int) -> bool:
+        return vector_id in self._row_by_id
+    
+    # Сохранение и загрузка
+    
+    def save(self, path: Optional[str] = None):
+        """
+        Сохраняет индекс в папку. Удаленные строки при этом вычищаются.
+        
+        Args:
+            path: Папка индекса. Если None, используется путь из конструктора
+        """
+        path = Path(path) if path else self.path
+        if path is None:
+            raise ValueError("Не указан путь для сохранения индекса")
+        path.mkdir(parents=True, exist_ok=True)
+        
+        if self._deleted.any():
+            self.compact()
+        
+        # Пишем матрицу во временный файл блоками, не собирая ее целиком в памяти
+        n_rows = sum(len(block) for block in self._blocks)
+        tmp_vectors = path / "vectors.npy.tmp"
+        out = np.lib.format.open_memmap(
+            tmp_vectors, mode='w+', dtype=np.float32, shape=(n_rows, self.dimension)
+        )
+        offset = 0
+        for block in self._blocks:
+            out[offset:offset + len(block)] = block
+            offset += len(block)
+        out.flush()
+        del out
+        
+        # Закрываем memory map старого файла перед заменой (важно для Windows)
+        self._blocks = []
+        os.replace(tmp_vectors, path / "vectors.npy")
+        
+        if self._centroids is not None:
+            np.save(path / "centroids.npy", self._centroids)
+            np.save(path / "lists.npy", self._lists)
+        else:
+            for name in ("centroids.npy", "lists.npy"):
+                (path / name).unlink(missing_ok=True)
+        
+        if self._hnsw is not None and self._hnsw_rows == len(self._ids):
+            _import_faiss().write_index(self._hnsw, str(path / "hnsw.faiss"))
+        else:
+            (path / "hnsw.faiss").unlink(missing_ok=True)
+        
+        meta = {
+            "dimension": self.dimension,
+            "mode": self.mode,
+            "nprobe": self.nprobe,
+            "hnsw_m": self.hnsw_m,
+            "next_id": self._next_id,
+            "ids": self._ids,
+            "items": self._items,
+        }
+        tmp_meta = path / "meta.json.tmp"
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_meta, path / "meta.json")
+        
+        self.path = path
+        self._blocks = [np.load(path / "vectors.npy", mmap_mode='r')] if n_rows else []
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "VectorIndex":
+        """
+        Загружает индекс из папки.
+        
+        Args:
+            path: Папка индекса
+            mmap: Открыть матрицу через memory map, не читая ее в память
+        
+        Returns:
+            VectorIndex: Загруженный индекс
+        """
+        path = Path(path)
+        with open(path / "meta.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        
+        mode = meta.get("mode", "exact")
+        faiss = _import_faiss(required=False) if mode == "hnsw" or (path / "hnsw.faiss").exists() else None
+        if mode == "hnsw" and faiss is None:
+            mode = "exact"
+        
+        index = cls(
+            dimension=meta["dimension"],
+            path=str(path),
+            mode=mode,
+            nprobe=meta.get("nprobe", 8),
+            hnsw_m=meta.get("hnsw_m", 32)
+        )
+        
+        matrix = np.load(path / "vectors.npy", mmap_mode='r' if mmap else None)
+        if len(matrix):
+            index._blocks = [matrix]
+        index._ids = list(meta["ids"])
+        index._items = list(meta["items"])
+        index._next_id = meta["next_id"]
+        index._deleted = np.zeros(len(index._ids), dtype=bool)
+        index._row_by_id = {vector_id: row for row, vector_id in enumerate(index._ids)}
+        
+        if (path / "centroids.npy").exists():
+            index._centroids = np.load(path / "centroids.npy")
+            index._lists = np.load(path / "lists.npy")
+        
+        if faiss is not None and (path / "hnsw.faiss").exists():
+            index._hnsw = faiss.read_index(str(path / "hnsw.faiss"))
+            index._hnsw_rows = len(index._ids)
+        
+        return index
@@ -1,9 +1,10 @@
 """Модуль для векторизации текста."""
 
 import numpy as np
-from typing import List, Tuple, Optional, Union
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import Any, List, Tuple, Optional, Union
+
+from file2text.core.registry import ModelKey, ModelRegistry, get_model_registry
+from file2text.core.vector_index import VectorIndex
 
 
 class Vectorizer:
@@ -13,7 +14,10 @@ class Vectorizer:
         self,
         model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
         device: Optional[str] = None,
-        verbose: bool = False
+        verbose: bool = False,
+        registry: Optional[ModelRegistry] = None,
+        quantize: bool = False,
+        cache_dir: Optional[str] = None
     ):
         """
         Инициализация векторизатора.
@@ -22,18 +26,61 @@ class Vectorizer:
             model: Модель для векторизации (sentence-transformers)
             device: Устройство для обработки. Если None, определяется автоматически
             verbose: Выводить ли подробную информацию
+            registry: Реестр моделей. Если None, используется общий реестр процесса
+            quantize: Квантовать линейные слои в int8 (только для CPU)
+            cache_dir: Папка кэша для квантованной модели
         """
         self.model_name = model
         self.verbose = verbose
+        self.device = device
+        self.registry = registry or get_model_registry()
+        self.cache_dir = cache_dir
         
-        if self.verbose:
-            print(f"Загрузка модели векторизации: {model}...")
+        if quantize and device is None:
+            import torch
+            quantize = not torch.cuda.is_available()
+        self.quantize = quantize and device in (None, "cpu")
+        if self.quantize:
+            self.device = "cpu"
         
-        self.model = SentenceTransformer(model, device=device)
+        self._model_key = ModelKey(
+            "sentence-transformers", model, self.device or "auto",
+            "int8" if self.quantize else "float32"
+        )
+        self.model = self.registry.acquire(self._model_key, self._load_model)
         self.vector_dimension = self.model.get_sentence_embedding_dimension()
+    
+    def _load_model(self):
+        """Загружает модель векторизации (вызывается реестром один раз на ключ)."""
+        if self.verbose:
+            print(f"Загрузка модели векторизации: {self.model_name}...")
+        
+        from sentence_transformers import SentenceTransformer
+        
+        if self.quantize:
+            from file2text.utils.quantization import load_quantized
+            model = load_quantized(
+                f"sentence-transformers-{self.model_name}",
+                lambda: SentenceTransformer(self.model_name, device="cpu"),
+                cache_dir=self.cache_dir,
+                verbose=self.verbose
+            )
+        else:
+            model = SentenceTransformer(self.model_name, device=self.device)
         
         if self.verbose:
-            print(f"Модель векторизации загружена. Размерность векторов: {self.vector_dimension}")
+            print(
+                "Модель векторизации загружена. Размерность векторов: "
+                f"{model.get_sentence_embedding_dimension()}"
+            )
+        
+        return model
+    
+    def close(self):
+        """Освобождает модель в реестре (повторный вызов безопасен)."""
+        if self.model is not None:
+            self.registry.release(self._model_key)
+            self.model = None
     
     def vectorize(self, text: Union[str, List[str]]) -> np.ndarray:
         """
@@ -74,41 +121,75 @@ class Vectorizer:
         Returns:
             float: Косинусная схожесть (0-1)
         """
+        from sklearn.metrics.pairwise import cosine_similarity
+        
         vec1 = self.vectorize(text1)
         vec2 = self.vectorize(text2)
         return float(cosine_similarity([vec1], [vec2])[0][0])
     
+    def build_index(
+        self,
+        texts: List[str],
+        path: Optional[str] = None,
+        mode: str = "exact",
+        batch_size: int = 32
+    ) -> VectorIndex:
+        """
+        Векторизует тексты и строит по ним индекс для поиска.
+        
+        Args:
+            texts: Список текстов
+            path: Папка для сохранения индекса (если None, индекс не сохраняется)
+            mode: Режим поиска индекса: "exact", "ivf" или "hnsw"
+            batch_size: Размер батча для векторизации
+            
+        Returns:
+            VectorIndex: Индекс, где метаданные элементов - исходные тексты
+        """
+        index = VectorIndex(self.vector_dimension, path=path, mode=mode)
+        if texts:
+            index.add(self.vectorize_batch(texts, batch_size=batch_size), items=texts)
+        if path:
+            index.save()
+        return index
+    
     def search(
         self,
         query: str,
-        texts: List[str],
+        texts: Optional[List[str]] = None,
         top_k: int = 5,
-        threshold: float = 0.0
-    ) -> List[Tuple[str, float]]:
+        threshold: float = 0.0,
+        index: Optional[VectorIndex] = None
+    ) -> List[Tuple[Any, float]]:
         """
         Ищет наиболее похожие тексты на запрос.
         
+        При переданном index векторизуется только запрос, а поиск идет по
+        сохраненным в индексе векторам. Если передан только texts, для них
+        строится временный индекс (тексты векторизуются при каждом вызове).
+        
         Args:
             query: Поисковый запрос
             texts: Список текстов для поиска
             top_k: Количество результатов
             threshold: Минимальный порог схожести
+            index: Готовый индекс (см. build_index и VectorIndex.load)
             
         Returns:
-            List[Tuple[str, float]]: Список (текст, схожесть) отсортированный по убыванию
+            List[Tuple[Any, float]]: Список (элемент индекса или текст, схожесть),
+                                     отсортированный по убыванию
         """
-        query_vec = self.vectorize(query)
-        text_vecs = self.vectorize_batch(texts)
-        
-        similarities = cosine_similarity([query_vec], text_vecs)[0]
+        if index is None:
+            if texts is None:
+                raise ValueError("Нужно передать texts или index")
+            index = self.build_index(texts)
         
-        # Фильтруем по порогу и сортируем
-        results = [(texts[i], float(similarities[i])) 
-                   for i in range(len(texts)) 
-                   if similarities[i] >= threshold]
-        results.sort(key=lambda x: x[1], reverse=True)
+        query_vec = self.vectorize(query)
         
-        return results[:top_k]
+        return [
+            (index.item(vector_id), score)
+            for vector_id, score in index.search(query_vec, top_k=top_k, threshold=threshold)
+        ]
     
     def save_vectors(self, vectors: np.ndarray, path: str):
         """
@@ -132,7 +213,7 @@ class Vectorizer:
         """
         return np.load(path)
     
-    # Методы для будущей интеграции с векторными БД
+    # Методы для интеграции с внешними векторными БД
     def prepare_for_vector_db(self, vectors: np.ndarray) -> dict:
         """
         Подготавливает векторы для сохранения в векторную БД.
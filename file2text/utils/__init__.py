@@ -3,6 +3,12 @@
 from file2text.utils.audio_converter import AudioConverter
 from file2text.utils.text_cleaner import clean_text, postprocess_summary
 from file2text.utils.config import Config, load_config
+from file2text.utils.cache import ResultCache
+from file2text.utils.vad import detect_speech
+from file2text.utils.evaluation import rouge_l, word_error_rate
+from file2text.utils.stage_metrics import StageMetricsCollector, measure_stage
+from file2text.utils.job_ledger import JobLedger
+from file2text.utils.folder_watcher import FolderWatcher
 
 __all__ = [
     "AudioConverter",
@@ -10,4 +16,12 @@ __all__ = [
     "postprocess_summary",
     "Config",
     "load_config",
+    "ResultCache",
+    "detect_speech",
+    "word_error_rate",
+    "rouge_l",
+    "StageMetricsCollector",
+    "measure_stage",
+    "JobLedger",
+    "FolderWatcher",
 ]
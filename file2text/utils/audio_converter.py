@@ -1,9 +1,132 @@
 """Утилиты для конвертации аудио и видео файлов."""
 
+import asyncio
 import os
+import struct
+import wave
 import subprocess
+from math import gcd
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+
+# Коды формата в заголовке WAV
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _ffmpeg_decode_command(input_path: str, sample_rate: int) -> list:
+    """Команда ffmpeg, выводящая моно s16le сигнал в stdout."""
+    return [
+        'ffmpeg',
+        '-nostdin',
+        '-threads', '0',
+        '-i', str(input_path),
+        '-vn',  # Без видео
+        '-f', 's16le',
+        '-ac', '1',
+        '-acodec', 'pcm_s16le',
+        '-ar', str(sample_rate),
+        '-'
+    ]
+
+
+class WavInfo(NamedTuple):
+    """Параметры WAV файла из заголовка."""
+    sample_rate: int
+    channels: int
+    bits_per_sample: int
+    is_float: bool
+    data_offset: int
+    frames: int
+    
+    @property
+    def duration(self) -> float:
+        """Длительность в секундах."""
+        return self.frames / float(self.sample_rate)
+    
+    @property
+    def supported(self) -> bool:
+        """Можно ли прочитать сэмплы без ffmpeg."""
+        if self.is_float:
+            return self.bits_per_sample in (32, 64)
+        return self.bits_per_sample in (8, 16, 24, 32)
+
+
+def resample(
+    audio: np.ndarray,
+    orig_sr: int,
+    target_sr: int,
+    block_size: int = 32768
+) -> np.ndarray:
+    """
+    Передискретизация сигнала полифазным FIR-фильтром.
+    
+    Сигнал повышается в up раз, фильтруется windowed-sinc фильтром (окно
+    Кайзера) и прореживается в down раз, где up/down = target_sr/orig_sr.
+    Вычисляются только нужные выходные отсчеты, нули повышенного сигнала
+    в свертке не участвуют.
+    
+    Args:
+        audio: Моно сигнал
+        orig_sr: Исходная частота дискретизации
+        target_sr: Целевая частота дискретизации
+        block_size: Число выходных отсчетов, считаемых за одно умножение
+        
+    Returns:
+        np.ndarray: Сигнал float32 с частотой target_sr
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    if orig_sr == target_sr or len(audio) == 0:
+        return audio
+    
+    divisor = gcd(orig_sr, target_sr)
+    up = target_sr // divisor
+    down = orig_sr // divisor
+    
+    # Фильтр нижних частот с частотой среза min(fs_in, fs_out) / 2
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    cutoff = 1.0 / max_rate
+    n = np.arange(-half_len, half_len + 1)
+    taps = cutoff * np.sinc(cutoff * n) * np.kaiser(2 * half_len + 1, 5.0)
+    taps *= up / taps.sum()
+    
+    # Полифазное разложение: bank[p, j] = taps[p + (width - 1 - j) * up]
+    width = -(-len(taps) // up)
+    bank = np.zeros(up * width)
+    bank[:len(taps)] = taps
+    bank = np.ascontiguousarray(bank.reshape(width, up).T[:, ::-1], dtype=np.float32)
+    
+    n_out = -(-len(audio) * up // down)
+    max_base = ((n_out - 1) * down + half_len) // up
+    padded = np.zeros(width + max(len(audio), max_base + 1) + down, dtype=np.float32)
+    padded[width:width + len(audio)] = audio
+    
+    # Выходы n = r + t * up при одном r используют одну фазу фильтра, а их
+    # окна входного сигнала сдвинуты на down отсчетов: это строки
+    # матрицы-представления padded без копирования, которые умножаются на
+    # фазу фильтра блоками
+    output = np.zeros(n_out, dtype=np.float32)
+    item = padded.strides[0]
+    for r in range(min(up, n_out)):
+        count = (n_out - 1 - r) // up + 1
+        base, phase = divmod(r * down + half_len, up)
+        frames = as_strided(
+            padded[base + 1:],
+            shape=(count, width),
+            strides=(down * item, item),
+            writeable=False
+        )
+        out = output[r::up]
+        for i in range(0, count, block_size):
+            out[i:i + block_size] = frames[i:i + block_size] @ bank[phase]
+    
+    return output
 
 
 class AudioConverter:
@@ -165,11 +288,27 @@ class AudioConverter:
         else:
             output_path = Path(output_path)
         
-        # Если уже WAV, проверяем параметры
+        # Если уже WAV, проверяем параметры по заголовку
         if input_path.suffix.lower() == '.wav':
-            # Можно добавить проверку параметров существующего WAV
-            # Пока просто возвращаем исходный путь
-            return str(input_path)
+            info = AudioConverter.probe_wav(str(input_path))
+            if (
+                info is not None
+                and not info.is_float
+                and info.bits_per_sample == 16
+                and info.sample_rate == sample_rate
+                and info.channels == channels
+            ):
+                return str(input_path)
+            
+            # Нужна конвертация: пишем рядом файл с другим именем
+            if output_path == input_path:
+                output_path = input_path.with_name(f"{input_path.stem}_{sample_rate}.wav")
+            
+            # Передискретизацию и сведение в моно PCM WAV делаем без ffmpeg
+            if info is not None and info.supported and channels == 1 and sample_format == "s16":
+                audio = AudioConverter.read_wav(str(input_path), sample_rate=sample_rate, info=info)
+                AudioConverter.write_wav(audio, str(output_path), sample_rate=sample_rate)
+                return str(output_path)
         
         # Автоматически определяем тип файла
         if auto_detect:
@@ -213,6 +352,243 @@ class AudioConverter:
         
         return str(output_path)
     
+    @staticmethod
+    def probe_wav(file_path: str) -> Optional[WavInfo]:
+        """
+        Читает параметры WAV файла из заголовка RIFF.
+        
+        Args:
+            file_path: Путь к файлу
+            
+        Returns:
+            Optional[WavInfo]: Параметры файла или None, если это не WAV
+                               с PCM или float сэмплами
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                header = f.read(12)
+                if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+                    return None
+                
+                fmt = None
+                while True:
+                    chunk = f.read(8)
+                    if len(chunk) < 8:
+                        return None
+                    chunk_id, chunk_size = chunk[:4], struct.unpack('<I', chunk[4:])[0]
+                    
+                    if chunk_id == b'fmt ':
+                        fmt = f.read(chunk_size)
+                        if chunk_size % 2:
+                            f.seek(1, os.SEEK_CUR)
+                    elif chunk_id == b'data':
+                        if fmt is None or len(fmt) < 16:
+                            return None
+                        data_offset = f.tell()
+                        break
+                    else:
+                        # Чанки выровнены по 2 байта
+                        f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+                
+                file_size = os.fstat(f.fileno()).st_size
+        except OSError:
+            return None
+        
+        format_tag, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+        if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            format_tag = struct.unpack('<H', fmt[24:26])[0]
+        if format_tag not in (_WAVE_FORMAT_PCM, _WAVE_FORMAT_IEEE_FLOAT):
+            return None
+        if channels == 0 or sample_rate == 0 or block_align == 0:
+            return None
+        
+        # Размер данных в заголовке бывает неверным у записей, прерванных
+        # на лету (0 или 0xFFFFFFFF), поэтому ограничиваем его размером файла
+        data_size = file_size - data_offset
+        if chunk_size:
+            data_size = min(chunk_size, data_size)
+        return WavInfo(
+            sample_rate=sample_rate,
+            channels=channels,
+            bits_per_sample=bits,
+            is_float=format_tag == _WAVE_FORMAT_IEEE_FLOAT,
+            data_offset=data_offset,
+            frames=data_size // block_align
+        )
+    
+    @staticmethod
+    def read_wav(
+        file_path: str,
+        sample_rate: int = 16000,
+        info: Optional[WavInfo] = None
+    ) -> np.ndarray:
+        """
+        Читает WAV файл в моно сигнал float32 без ffmpeg.
+        
+        Каналы усредняются, сигнал с другой частотой дискретизации
+        передискретизируется функцией resample.
+        
+        Args:
+            file_path: Путь к WAV файлу
+            sample_rate: Целевая частота дискретизации
+            info: Результат probe_wav (если уже получен)
+            
+        Returns:
+            np.ndarray: Моно сигнал float32 в диапазоне [-1, 1]
+        """
+        if info is None:
+            info = AudioConverter.probe_wav(file_path)
+        if info is None or not info.supported:
+            raise ValueError(f"Неподдерживаемый формат WAV: {file_path}")
+        
+        width = info.bits_per_sample // 8
+        count = info.frames * info.channels
+        if info.is_float:
+            dtype = '<f4' if width == 4 else '<f8'
+            samples = np.fromfile(file_path, dtype=dtype, count=count, offset=info.data_offset)
+            samples = samples.astype(np.float32)
+        elif width == 3:
+            raw = np.fromfile(file_path, dtype=np.uint8, count=count * 3, offset=info.data_offset)
+            raw = raw.reshape(-1, 3).astype(np.int32)
+            samples = (raw[:, 0] << 8) | (raw[:, 1] << 16) | (raw[:, 2] << 24)
+            samples = samples.astype(np.float32) / 2147483648.0
+        elif width == 1:
+            samples = np.fromfile(file_path, dtype=np.uint8, count=count, offset=info.data_offset)
+            samples = (samples.astype(np.float32) - 128.0) / 128.0
+        else:
+            dtype = '<i2' if width == 2 else '<i4'
+            samples = np.fromfile(file_path, dtype=dtype, count=count, offset=info.data_offset)
+            samples = samples.astype(np.float32) / float(2 ** (info.bits_per_sample - 1))
+        
+        if info.channels > 1:
+            samples = samples[:len(samples) - len(samples) % info.channels]
+            samples = samples.reshape(-1, info.channels).mean(axis=1, dtype=np.float32)
+        
+        return resample(samples, info.sample_rate, sample_rate)
+    
+    @staticmethod
+    def write_wav(audio: np.ndarray, output_path: str, sample_rate: int = 16000) -> str:
+        """
+        Записывает моно сигнал float32 в 16-bit PCM WAV.
+        
+        Args:
+            audio: Моно сигнал в диапазоне [-1, 1]
+            output_path: Путь к выходному файлу
+            sample_rate: Частота дискретизации
+            
+        Returns:
+            str: Путь к записанному файлу
+        """
+        pcm = np.clip(np.round(audio * 32768.0), -32768, 32767).astype('<i2')
+        with wave.open(str(output_path), 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(pcm.tobytes())
+        return str(output_path)
+    
+    @staticmethod
+    def decode_to_array(
+        input_path: str,
+        sample_rate: int = 16000
+    ) -> np.ndarray:
+        """
+        Декодирует аудио или видео файл в память без записи промежуточного WAV.
+        
+        PCM и float WAV читаются напрямую (см. read_wav). Остальные форматы
+        декодирует ffmpeg: он выдает моно сигнал в формате s16le в stdout,
+        который сразу преобразуется в float32. Полученный массив можно
+        передавать и в Transcriber.transcribe, и в Diarizer.diarize, поэтому
+        файл декодируется один раз.
+        
+        Args:
+            input_path: Путь к аудио или видео файлу
+            sample_rate: Частота дискретизации (по умолчанию 16kHz для Whisper)
+            
+        Returns:
+            np.ndarray: Моно сигнал float32 в диапазоне [-1, 1]
+        """
+        input_path = Path(input_path)
+        
+        if not input_path.exists():
+            raise FileNotFoundError(f"Файл не найден: {input_path}")
+        
+        info = AudioConverter.probe_wav(str(input_path))
+        if info is not None and info.supported:
+            return AudioConverter.read_wav(str(input_path), sample_rate=sample_rate, info=info)
+        
+        try:
+            process = subprocess.run(
+                _ffmpeg_decode_command(str(input_path), sample_rate),
+                check=True,
+                capture_output=True
+            )
+        except subprocess.CalledProcessError as e:
+            error_msg = e.stderr.decode() if e.stderr else str(e)
+            raise RuntimeError(f"Ошибка декодирования аудио: {error_msg}")
+        except FileNotFoundError:
+            raise RuntimeError(
+                "ffmpeg не найден. Установите ffmpeg и добавьте его в PATH."
+            )
+        
+        return np.frombuffer(process.stdout, np.int16).astype(np.float32) / 32768.0
+    
+    @staticmethod
+    async def adecode_to_array(
+        input_path: str,
+        sample_rate: int = 16000
+    ) -> np.ndarray:
+        """
+        Асинхронный вариант decode_to_array, не блокирующий цикл событий.
+        
+        WAV читается в пуле потоков по умолчанию, остальные форматы
+        декодирует ffmpeg, запущенный как подпроцесс asyncio. При отмене
+        корутины процесс ffmpeg завершается.
+        
+        Args:
+            input_path: Путь к аудио или видео файлу
+            sample_rate: Частота дискретизации (по умолчанию 16kHz для Whisper)
+            
+        Returns:
+            np.ndarray: Моно сигнал float32 в диапазоне [-1, 1]
+        """
+        loop = asyncio.get_running_loop()
+        input_path = Path(input_path)
+        
+        if not input_path.exists():
+            raise FileNotFoundError(f"Файл не найден: {input_path}")
+        
+        info = await loop.run_in_executor(None, AudioConverter.probe_wav, str(input_path))
+        if info is not None and info.supported:
+            return await loop.run_in_executor(
+                None, lambda: AudioConverter.read_wav(str(input_path), sample_rate=sample_rate, info=info)
+            )
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *_ffmpeg_decode_command(str(input_path), sample_rate),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise RuntimeError(
+                "ffmpeg не найден. Установите ffmpeg и добавьте его в PATH."
+            )
+        
+        try:
+            stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        
+        if process.returncode != 0:
+            error_msg = stderr.decode(errors='replace') if stderr else f"код {process.returncode}"
+            raise RuntimeError(f"Ошибка декодирования аудио: {error_msg}")
+        
+        return np.frombuffer(stdout, np.int16).astype(np.float32) / 32768.0
+    
     @staticmethod
     def is_audio_file(file_path: str) -> bool:
         """
@@ -252,4 +628,19 @@ class AudioConverter:
         Returns:
             bool: True если файл является медиа файлом
         """
-        return AudioConverter.is_audio_file(file_path) or AudioConverter.is_video_file(file_path)
\ No newline at end of file
+        return AudioConverter.is_audio_file(file_path) or AudioConverter.is_video_file(file_path)
+    
+    @staticmethod
+    def get_duration(file_path: str) -> Optional[float]:
+        """
+        Возвращает длительность WAV файла в секундах.
+        
+        Args:
+            file_path: Путь к WAV файлу
+            
+        Returns:
+            Optional[float]: Длительность в секундах или None, если файл
+                             не является PCM или float WAV
+        """
+        info = AudioConverter.probe_wav(str(file_path))
+        return info.duration if info is not None else None
@@ -0,0 +1,244 @@
+"""Кэш результатов обработки на диске."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+def _json_default(value: Any) -> Any:
+    """Преобразует типы numpy в типы, поддерживаемые json."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Объект типа {type(value).__name__} не сериализуется в JSON")
+
+
+class ResultCache:
+    """
+    Кэш результатов этапов обработки с адресацией по содержимому.
+    
+    Ключ записи строится из хэша входных данных (содержимого файла или текста),
+    имени модели и параметров этапа. Массивы numpy хранятся в .npy, остальные
+    результаты - в JSON. При превышении max_size_mb удаляются записи, к которым
+    дольше всего не обращались (время доступа хранится в mtime файла).
+    Размер кэша отслеживается по записанным файлам, и папка кэша
+    просматривается целиком, только когда он превышает лимит.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: str,
+        max_size_mb: int = 2048,
+        enabled: bool = True
+    ):
+        """
+        Инициализация кэша.
+        
+        Args:
+            cache_dir: Папка для хранения результатов
+            max_size_mb: Максимальный размер кэша в мегабайтах
+            enabled: Если False, кэш ничего не читает и не записывает
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # Оценка размера кэша в байтах (None - еще не подсчитан)
+        self._size: Optional[int] = None
+        
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Хэш содержимого файла.
+        
+        Args:
+            path: Путь к файлу
+            chunk_size: Размер блока чтения
+        
+        Returns:
+            str: Шестнадцатеричный хэш
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(chunk_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Хэш текста."""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=20).hexdigest()
+    
+    @staticmethod
+    def make_key(content_hash: str, model: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Строит ключ записи.
+        
+        Args:
+            content_hash: Хэш входных данных
+            model: Имя модели этапа
+            params: Параметры этапа, влияющие на результат
+        
+        Returns:
+            str: Ключ записи
+        """
+        payload = json.dumps(
+            [content_hash, model, params or {}],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+    
+    def _path(self, stage: str, key: str, suffix: str) -> Path:
+        return self.cache_dir / stage / f"{key}{suffix}"
+    
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """
+        Читает результат этапа из кэша.
+        
+        Args:
+            stage: Имя этапа (transcribe, diarize, summarize, vectorize)
+            key: Ключ записи
+        
+        Returns:
+            Сохраненный результат или None, если записи нет
+        """
+        if not self.enabled:
+            return None
+        
+        for suffix in ('.json', '.npy'):
+            path = self._path(stage, key, suffix)
+            try:
+                if suffix == '.json':
+                    with open(path, 'r', encoding='utf-8') as f:
+                        value = json.load(f)
+                else:
+                    value = np.load(path)
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError):
+                # Поврежденная запись (например, после сбоя записи) - удаляем
+                self._remove(path)
+                return None
+            
+            # Отмечаем обращение для LRU
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return value
+        
+        return None
+    
+    def set(self, stage: str, key: str, value: Any):
+        """
+        Сохраняет результат этапа в кэш.
+        
+        Args:
+            stage: Имя этапа
+            key: Ключ записи
+            value: Результат (массив numpy или JSON-совместимый объект)
+        """
+        if not self.enabled:
+            return
+        
+        stage_dir = self.cache_dir / stage
+        stage_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Пишем во временный файл и атомарно переименовываем, чтобы прерванная
+        # запись не оставила в кэше обрезанный результат
+        fd, tmp_path = tempfile.mkstemp(dir=stage_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if isinstance(value, np.ndarray):
+                    np.save(f, value)
+                    suffix = '.npy'
+                else:
+                    f.write(json.dumps(value, ensure_ascii=False, default=_json_default).encode('utf-8'))
+                    suffix = '.json'
+                written = f.tell()
+            path = self._path(stage, key, suffix)
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        
+        with self._lock:
+            if self._size is None:
+                self._size = self.size()
+            else:
+                self._size += written - replaced
+            over_limit = self._size > self.max_size_bytes
+        
+        if over_limit:
+            self._evict()
+    
+    def size(self) -> int:
+        """Текущий размер кэша в байтах."""
+        return sum(entry.stat().st_size for entry in self._entries())
+    
+    def clear(self):
+        """Удаляет все записи кэша."""
+        with self._lock:
+            for entry in self._entries():
+                Path(entry.path).unlink(missing_ok=True)
+            self._size = 0
+    
+    def _entries(self):
+        if not self.cache_dir.exists():
+            return
+        for stage_dir in os.scandir(self.cache_dir):
+            if not stage_dir.is_dir():
+                continue
+            for entry in os.scandir(stage_dir.path):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    yield entry
+    
+    def _remove(self, path: Path):
+        """Удаляет запись и вычитает ее размер из оценки размера кэша."""
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size = max(0, self._size - size)
+    
+    def _evict(self):
+        """Удаляет самые давно использованные записи сверх лимита размера."""
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            
+            if total > self.max_size_bytes:
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= self.max_size_bytes:
+                        break
+                    Path(path).unlink(missing_ok=True)
+                    total -= size
+            
+            self._size = total
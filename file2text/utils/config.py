@@ -20,22 +20,61 @@ class Config:
     whisper_model: str = "medium"
     whisper_device: str = "cuda"  # "cuda" или "cpu"
     
-    # Диаризация
+    # Диаризация (имя модели на Hugging Face или путь к локальному config.yaml)
     huggingface_token: Optional[str] = None
+    diarization_model: str = "pyannote/speaker-diarization"
+    # Известное число спикеров (None - определяется моделью)
+    diarization_num_speakers: Optional[int] = None
     
     # Суммаризация
     summarizer_model: str = "IlyaGusev/rut5_base_sum_gazeta"
     summary_max_length: int = 250
     summary_min_length: int = 50
+    summary_batch_size: int = 8
+    # Размер чанка в токенах (0 - лимит входа модели) и перекрытие чанков
+    summary_max_input_tokens: int = 0
+    summary_chunk_overlap_tokens: int = 64
     
     # Векторизация
     vectorizer_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
     vector_dimension: int = 384
     
+    # Декодирование: держать сигнал в памяти вместо записи WAV рядом с файлом
+    in_memory_decode: bool = True
+    # Папка для WAV, сконвертированных без in_memory_decode (None - рядом с файлом)
+    converted_dir: Optional[str] = None
+    
+    # Выполнять диаризацию параллельно с транскрипцией в File2Text.process
+    parallel_stages: bool = True
+    
+    # Удалять тишину и музыку перед транскрипцией (VAD)
+    vad_enabled: bool = False
+    
+    # Параллельная транскрипция длинных записей по окнам (1 - выключена,
+    # 0 - по числу ядер CPU)
+    long_audio_workers: int = 1
+    long_audio_window: float = 180.0
+    
+    # Профиль декодирования Whisper: realtime, balanced или archival
+    # (см. file2text.core.transcriber.DECODING_PROFILES)
+    decoding_profile: str = "archival"
+    
+    # Динамическое int8-квантование линейных слоев Whisper, rut5 и MiniLM
+    # для инференса на CPU (квантованные модели сохраняются в cache_dir)
+    quantize_int8: bool = False
+    
     # Пути
     default_output_dir: str = "./output"
     cache_dir: Optional[str] = None
     
+    # Кэш результатов этапов (транскрипция, диаризация, суммаризация, векторы)
+    cache_enabled: bool = True
+    cache_max_size_mb: int = 2048
+    
+    # Работа без сети: модели берутся только из локальных файлов и кэша
+    # Hugging Face (см. enable_offline_mode)
+    offline: bool = False
+    
     def __post_init__(self):
         """Инициализация после создания объекта."""
         # Загружаем токен из переменных окружения если не указан
@@ -48,8 +87,12 @@ class Config:
             self.cache_dir = os.path.join(cache_home, "file2text")
             os.makedirs(self.cache_dir, exist_ok=True)
         
-        # Проверяем наличие токена для диаризации
-        if not self.huggingface_token:
+        if self.offline:
+            enable_offline_mode()
+        
+        # Проверяем наличие токена для диаризации (без сети модели
+        # загружаются из локальных файлов, и токен не нужен)
+        if not self.huggingface_token and not self.offline:
             raise ValueError(
                 "HUGGINGFACE_TOKEN не установлен. "
                 "Установите переменную окружения HUGGINGFACE_TOKEN или "
@@ -57,6 +100,26 @@ class Config:
             )
 
 
+def enable_offline_mode():
+    """
+    Запрещает обращения к Hugging Face Hub.
+    
+    transformers, sentence-transformers и pyannote берут модели только из
+    локальных путей и кэша. Переменные читаются при импорте huggingface_hub,
+    поэтому функцию нужно вызвать до первой загрузки модели.
+    """
+    for name in ("HF_HUB_OFFLINE", "TRANSFORMERS_OFFLINE", "HF_DATASETS_OFFLINE"):
+        os.environ[name] = "1"
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Читает булево значение из переменной окружения."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 def load_config(config_path: Optional[str] = None) -> Config:
     """
     Загрузить конфигурацию из файла или переменных окружения.
@@ -74,7 +137,23 @@ def load_config(config_path: Optional[str] = None) -> Config:
     return Config(
         whisper_model=os.getenv("WHISPER_MODEL", "medium"),
         whisper_device=os.getenv("WHISPER_DEVICE", "cuda"),
+        diarization_model=os.getenv("DIARIZATION_MODEL", "pyannote/speaker-diarization"),
+        diarization_num_speakers=int(os.getenv("DIARIZATION_NUM_SPEAKERS", "0")) or None,
         summarizer_model=os.getenv("SUMMARIZER_MODEL", "IlyaGusev/rut5_base_sum_gazeta"),
         vectorizer_model=os.getenv("VECTORIZER_MODEL", 
                                    "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"),
+        summary_batch_size=int(os.getenv("SUMMARY_BATCH_SIZE", "8")),
+        summary_max_input_tokens=int(os.getenv("SUMMARY_MAX_INPUT_TOKENS", "0")),
+        summary_chunk_overlap_tokens=int(os.getenv("SUMMARY_CHUNK_OVERLAP_TOKENS", "64")),
+        in_memory_decode=_env_bool("IN_MEMORY_DECODE", True),
+        converted_dir=os.getenv("CONVERTED_DIR") or None,
+        parallel_stages=_env_bool("PARALLEL_STAGES", True),
+        vad_enabled=_env_bool("VAD_ENABLED", False),
+        long_audio_workers=int(os.getenv("LONG_AUDIO_WORKERS", "1")),
+        long_audio_window=float(os.getenv("LONG_AUDIO_WINDOW", "180")),
+        decoding_profile=os.getenv("DECODING_PROFILE", "archival"),
+        quantize_int8=_env_bool("QUANTIZE_INT8", False),
+        cache_enabled=_env_bool("CACHE_ENABLED", True),
+        cache_max_size_mb=int(os.getenv("CACHE_MAX_SIZE_MB", "2048")),
+        offline=_env_bool("OFFLINE_MODE", False) or _env_bool("HF_HUB_OFFLINE", False),
     )
@@ -0,0 +1,100 @@
+"""Метрики качества: WER транскрипции, ROUGE-L суммаризации, косинусная близость векторов."""
+
+import re
+from typing import List, Sequence
+
+import numpy as np
+
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize_words(text: str) -> List[str]:
+    """Слова текста в нижнем регистре без пунктуации (ё приводится к е)."""
+    return _WORD_PATTERN.findall(text.lower().replace("ё", "е"))
+
+
+def _edit_distance(reference: Sequence[str], hypothesis: Sequence[str]) -> int:
+    """Расстояние Левенштейна между последовательностями слов."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Доля ошибок распознавания слов (WER).
+    
+    Args:
+        reference: Эталонный текст
+        hypothesis: Распознанный текст
+    
+    Returns:
+        float: (замены + удаления + вставки) / число слов эталона
+    """
+    ref_words = tokenize_words(reference)
+    hyp_words = tokenize_words(hypothesis)
+    if not ref_words:
+        return 0.0 if not hyp_words else 1.0
+    return _edit_distance(ref_words, hyp_words) / len(ref_words)
+
+
+def _lcs_length(a: Sequence[str], b: Sequence[str]) -> int:
+    """Длина наибольшей общей подпоследовательности."""
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b, 1):
+            current.append(previous[j - 1] + 1 if x == y else max(previous[j], current[j - 1]))
+        previous = current
+    return previous[-1]
+
+
+def rouge_l(reference: str, hypothesis: str) -> float:
+    """
+    F-мера ROUGE-L по словам.
+    
+    Args:
+        reference: Эталонный текст
+        hypothesis: Сравниваемый текст
+    
+    Returns:
+        float: F1 по длине наибольшей общей подпоследовательности слов
+    """
+    ref_words = tokenize_words(reference)
+    hyp_words = tokenize_words(hypothesis)
+    if not ref_words or not hyp_words:
+        return 1.0 if ref_words == hyp_words else 0.0
+    
+    lcs = _lcs_length(ref_words, hyp_words)
+    if lcs == 0:
+        return 0.0
+    precision = lcs / len(hyp_words)
+    recall = lcs / len(ref_words)
+    return 2 * precision * recall / (precision + recall)
+
+
+def cosine_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Косинусная близость векторов.
+    
+    Args:
+        a: Вектор (dim,) или матрица (n, dim)
+        b: Массив той же формы
+    
+    Returns:
+        np.ndarray: Близость для каждой пары строк (скаляр для векторов)
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    dot = np.sum(a * b, axis=-1)
+    norms = np.linalg.norm(a, axis=-1) * np.linalg.norm(b, axis=-1)
+    return dot / np.maximum(norms, 1e-12)
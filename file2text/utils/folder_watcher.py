@@ -0,0 +1,186 @@
+"""Слежение за папкой: новые файлы выдаются после завершения их записи."""
+
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+
+class FolderWatcher:
+    """
+    Источник путей к новым файлам папки.
+    
+    Новые файлы обнаруживаются через watchdog (inotify в Linux), если он
+    установлен (pip install -e ".[watch]"), иначе - периодическим просмотром
+    папки. Файл выдается, только когда его размер и время изменения не
+    меняются stable_seconds, поэтому файлы, которые еще копируются в папку,
+    не попадают в обработку. Готовые файлы ждут в ограниченной очереди: пока
+    она заполнена, новые файлы остаются в ожидании и не копятся в памяти.
+    
+    Экземпляр - итерируемый объект: итерация блокируется в ожидании новых
+    файлов и завершается после stop().
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        accept: Optional[Callable[[str], bool]] = None,
+        stable_seconds: float = 5.0,
+        poll_interval: float = 1.0,
+        max_pending: int = 16,
+        use_watchdog: bool = True
+    ):
+        """
+        Инициализация наблюдателя.
+        
+        Args:
+            directory: Папка для слежения (без вложенных папок)
+            accept: Фильтр путей, вызывается для файла, запись которого
+                    завершилась. Отклоненный файл не проверяется повторно,
+                    пока не изменится
+            stable_seconds: Сколько секунд размер и mtime файла не должны
+                            меняться, чтобы считать запись завершенной
+            poll_interval: Период проверки файлов (и просмотра папки без watchdog)
+            max_pending: Размер очереди готовых файлов
+            use_watchdog: Использовать ли watchdog, если он установлен
+        """
+        self.directory = os.path.abspath(directory)
+        self.accept = accept
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=max(1, max_pending))
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        # Ожидающие файлы: путь -> (размер, mtime, время последнего изменения)
+        self._pending: Dict[str, Optional[Tuple[int, int, float]]] = {}
+        # Выданные или отклоненные файлы: путь -> (размер, mtime)
+        self._seen: Dict[str, Tuple[int, int]] = {}
+        self._observer = None
+        self._thread: Optional[threading.Thread] = None
+        
+        if use_watchdog:
+            try:
+                import watchdog.observers  # noqa: F401
+                self.backend = "watchdog"
+            except ImportError:
+                self.backend = "polling"
+        else:
+            self.backend = "polling"
+    
+    def start(self):
+        """Запускает слежение; файлы, уже лежащие в папке, тоже будут выданы."""
+        if self.backend == "watchdog":
+            self._start_observer()
+        self._scan()
+        self._thread = threading.Thread(target=self._run, name="file2text-watch", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Останавливает слежение; итерация завершается (файлы из очереди не выдаются)."""
+        self._stopped.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+    
+    def __enter__(self) -> "FolderWatcher":
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+    
+    def __iter__(self) -> Iterator[str]:
+        while not self._stopped.is_set():
+            try:
+                yield self._queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+    
+    def _start_observer(self):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+        
+        watcher = self
+        
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                watcher._notice(event.src_path)
+                dest_path = getattr(event, "dest_path", None)
+                if dest_path:
+                    watcher._notice(dest_path)
+        
+        self._observer = Observer()
+        self._observer.schedule(Handler(), self.directory, recursive=False)
+        self._observer.start()
+    
+    def _notice(self, path: str):
+        """Отмечает файл, который появился или изменился."""
+        path = os.path.abspath(path)
+        if os.path.dirname(path) != self.directory or os.path.basename(path).startswith("."):
+            return
+        with self._lock:
+            if path not in self._pending:
+                self._pending[path] = None
+    
+    def _scan(self):
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.is_file():
+                self._notice(entry.path)
+    
+    def _run(self):
+        while not self._stopped.wait(self.poll_interval):
+            if self._observer is None:
+                self._scan()
+            self._check()
+    
+    def _check(self):
+        """Выдает файлы, запись которых завершилась."""
+        now = time.monotonic()
+        with self._lock:
+            pending = list(self._pending.items())
+        
+        for path, state in pending:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                with self._lock:
+                    self._pending.pop(path, None)
+                    self._seen.pop(path, None)
+                continue
+            
+            identity = (stat.st_size, stat.st_mtime_ns)
+            if self._seen.get(path) == identity:
+                # Уже выдан или отклонен и с тех пор не менялся
+                with self._lock:
+                    self._pending.pop(path, None)
+                continue
+            
+            if state is None or state[:2] != identity:
+                with self._lock:
+                    self._pending[path] = (*identity, now)
+                continue
+            if stat.st_size == 0 or now - state[2] < self.stable_seconds:
+                continue
+            
+            if self.accept is None or self.accept(path):
+                try:
+                    self._queue.put_nowait(path)
+                except queue.Full:
+                    # Очередь заполнена: файл подождет следующей проверки
+                    continue
+            with self._lock:
+                self._pending.pop(path, None)
+                self._seen[path] = identity
+        
+        # Забываем удаленные файлы, чтобы новый файл с тем же именем был выдан
+        with self._lock:
+            for path in [p for p in self._seen if not os.path.exists(p)]:
+                del self._seen[path]
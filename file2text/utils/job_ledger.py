@@ -0,0 +1,282 @@
+"""Журнал заданий пакетной обработки в SQLite с контрольными точками этапов."""
+
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from file2text.utils.cache import ResultCache, _json_default
+
+# Этапы, после которых сохраняется контрольная точка
+STAGES = ("transcribed", "diarized", "summarized", "vectorized")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    path TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    path TEXT NOT NULL REFERENCES jobs(path) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    data TEXT NOT NULL,
+    array BLOB,
+    fingerprint TEXT NOT NULL DEFAULT '',
+    created REAL NOT NULL,
+    PRIMARY KEY (path, stage)
+);
+"""
+
+
+@dataclass
+class Checkpoint:
+    """Сохраненный результат этапа: JSON-данные и необязательный массив numpy."""
+    data: Dict[str, Any]
+    array: Optional[np.ndarray] = None
+
+
+class JobLedger:
+    """
+    Журнал заданий: состояние каждого файла по этапам и их результаты.
+    
+    После каждого этапа (транскрипция, диаризация, суммаризация,
+    векторизация) результат записывается в отдельной транзакции, поэтому
+    после сбоя обработка файла продолжается с первого незавершенного этапа.
+    Файлы идентифицируются абсолютным путем. Если изменилось содержимое
+    файла, сбрасываются все контрольные точки; у каждой точки хранится
+    fingerprint параметров ее этапа (включая параметры этапов, от которых он
+    зависит), и при смене параметров сбрасываются только точки с другим
+    fingerprint - например, смена модели суммаризации не отменяет
+    транскрипцию. Журнал использует режим WAL и synchronous=FULL: завершенная
+    транзакция переживает падение процесса и отключение питания.
+    
+    Декодированный сигнал в журнал не пишется (это сотни мегабайт на час
+    записи): если остались этапы, которым он нужен, файл декодируется заново.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Открывает или создает журнал.
+        
+        Args:
+            path: Путь к файлу базы SQLite
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(checkpoints)")]
+        if "fingerprint" not in columns:
+            # Журнал прежней версии: точки без fingerprint будут пересчитаны
+            self._conn.execute("ALTER TABLE checkpoints ADD COLUMN fingerprint TEXT NOT NULL DEFAULT ''")
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    def __enter__(self) -> "JobLedger":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _transaction(self, statements: List[Tuple[str, tuple]]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in statements:
+                    self._conn.execute(sql, params)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+    
+    def _identity(self, path: str, row: Optional[tuple]) -> Tuple[str, int, int]:
+        """Хэш, размер и mtime файла; хэш пересчитывается только при изменении размера или mtime."""
+        stat = os.stat(path)
+        if row is not None and row[1] == stat.st_size and row[2] == stat.st_mtime_ns:
+            return row[0], stat.st_size, stat.st_mtime_ns
+        return ResultCache.file_hash(path), stat.st_size, stat.st_mtime_ns
+    
+    def start(self, path: str, fingerprints: Optional[Dict[str, str]] = None) -> Dict[str, Checkpoint]:
+        """
+        Отмечает начало (или возобновление) обработки файла.
+        
+        Контрольные точки, fingerprint которых не совпадает с переданным для
+        их этапа, удаляются; при изменении содержимого файла удаляются все.
+        
+        Args:
+            path: Путь к файлу
+            fingerprints: Fingerprint параметров для каждого этапа из STAGES
+        
+        Returns:
+            Dict[str, Checkpoint]: Действительные контрольные точки, сохраненные ранее
+        """
+        path = os.path.abspath(path)
+        fingerprints = fingerprints or {}
+        rows = self._query(
+            "SELECT content_hash, size, mtime_ns FROM jobs WHERE path = ?", (path,)
+        )
+        row = rows[0] if rows else None
+        content_hash, size, mtime_ns = self._identity(path, row)
+        fingerprint = json.dumps(fingerprints, sort_keys=True)
+        
+        statements = []
+        if row is None or row[0] != content_hash:
+            statements.append(("DELETE FROM checkpoints WHERE path = ?", (path,)))
+        else:
+            for stage, stored in self._query(
+                "SELECT stage, fingerprint FROM checkpoints WHERE path = ?", (path,)
+            ):
+                if fingerprints.get(stage) != stored:
+                    statements.append((
+                        "DELETE FROM checkpoints WHERE path = ? AND stage = ?", (path, stage)
+                    ))
+        statements.append((
+            "INSERT INTO jobs (path, content_hash, size, mtime_ns, fingerprint, status, attempts, updated) "
+            "VALUES (?, ?, ?, ?, ?, 'running', 1, ?) "
+            "ON CONFLICT(path) DO UPDATE SET content_hash = excluded.content_hash, "
+            "size = excluded.size, mtime_ns = excluded.mtime_ns, "
+            "fingerprint = excluded.fingerprint, status = 'running', error = NULL, "
+            "attempts = attempts + 1, updated = excluded.updated",
+            (path, content_hash, size, mtime_ns, fingerprint, time.time())
+        ))
+        self._transaction(statements)
+        return self.checkpoints(path)
+    
+    def checkpoint(
+        self,
+        path: str,
+        stage: str,
+        data: Dict[str, Any],
+        array: Optional[np.ndarray] = None,
+        fingerprint: str = ""
+    ):
+        """
+        Сохраняет результат этапа.
+        
+        Args:
+            path: Путь к файлу
+            stage: Этап из STAGES
+            data: JSON-совместимые данные этапа
+            array: Массив numpy (например, векторы)
+            fingerprint: Fingerprint параметров этапа (как в start())
+        """
+        path = os.path.abspath(path)
+        if stage not in STAGES:
+            raise ValueError(f"Неизвестный этап: {stage}. Доступны: {', '.join(STAGES)}")
+        blob = None
+        if array is not None:
+            buffer = io.BytesIO()
+            np.save(buffer, array)
+            blob = buffer.getvalue()
+        self._transaction([
+            (
+                "INSERT OR REPLACE INTO checkpoints (path, stage, data, array, fingerprint, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, stage, json.dumps(data, ensure_ascii=False, default=_json_default), blob,
+                 fingerprint, time.time())
+            ),
+            ("UPDATE jobs SET updated = ? WHERE path = ?", (time.time(), path)),
+        ])
+    
+    def checkpoints(self, path: str) -> Dict[str, Checkpoint]:
+        """Контрольные точки файла по этапам."""
+        path = os.path.abspath(path)
+        result = {}
+        for stage, data, blob in self._query(
+            "SELECT stage, data, array FROM checkpoints WHERE path = ?", (path,)
+        ):
+            array = np.load(io.BytesIO(blob)) if blob is not None else None
+            result[stage] = Checkpoint(json.loads(data), array)
+        return result
+    
+    def finish(self, path: str):
+        """
+        Отмечает файл обработанным: результаты сохранены, исходник обработан
+        политикой. Контрольные точки больше не нужны и удаляются.
+        """
+        path = os.path.abspath(path)
+        self._transaction([
+            ("DELETE FROM checkpoints WHERE path = ?", (path,)),
+            ("UPDATE jobs SET status = 'done', error = NULL, updated = ? WHERE path = ?", (time.time(), path)),
+        ])
+    
+    def fail(self, path: str, error: str):
+        """Отмечает ошибку; контрольные точки завершенных этапов сохраняются."""
+        path = os.path.abspath(path)
+        self._transaction([
+            ("UPDATE jobs SET status = 'failed', error = ?, updated = ? WHERE path = ?",
+             (error, time.time(), path)),
+        ])
+    
+    def status(self, path: str) -> Optional[str]:
+        """Состояние файла: running, failed, done или None, если файла нет в журнале."""
+        path = os.path.abspath(path)
+        rows = self._query("SELECT status FROM jobs WHERE path = ?", (path,))
+        return rows[0][0] if rows else None
+    
+    def is_done(self, path: str, fingerprints: Optional[Dict[str, str]] = None) -> bool:
+        """
+        Обработан ли файл с тем же содержимым (и параметрами).
+        
+        Args:
+            path: Путь к файлу
+            fingerprints: Fingerprint этапов (как в start()). Если None, не сравниваются
+        """
+        path = os.path.abspath(path)
+        rows = self._query(
+            "SELECT content_hash, size, mtime_ns, fingerprint, status FROM jobs WHERE path = ?", (path,)
+        )
+        if not rows or rows[0][4] != "done":
+            return False
+        if fingerprints is not None and rows[0][3] != json.dumps(fingerprints, sort_keys=True):
+            return False
+        content_hash, _, _ = self._identity(path, rows[0])
+        return content_hash == rows[0][0]
+    
+    def unfinished(self) -> List[Tuple[str, str, List[str]]]:
+        """
+        Незавершенные задания.
+        
+        Returns:
+            List[Tuple[str, str, List[str]]]: Путь, состояние и завершенные этапы
+        """
+        rows = self._query(
+            "SELECT jobs.path, jobs.status, group_concat(checkpoints.stage) FROM jobs "
+            "LEFT JOIN checkpoints ON checkpoints.path = jobs.path "
+            "WHERE jobs.status != 'done' GROUP BY jobs.path ORDER BY jobs.updated"
+        )
+        return [
+            (path, status, [stage for stage in STAGES if stage in (stages or "").split(",")])
+            for path, status, stages in rows
+        ]
+    
+    def forget(self, path: str):
+        """Удаляет файл и его контрольные точки из журнала."""
+        path = os.path.abspath(path)
+        self._transaction([
+            ("DELETE FROM checkpoints WHERE path = ?", (path,)),
+            ("DELETE FROM jobs WHERE path = ?", (path,)),
+        ])
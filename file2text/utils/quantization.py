@@ -0,0 +1,107 @@
+"""Динамическое int8-квантование моделей для инференса на CPU."""
+
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+def quantize_linear(model: Any) -> Any:
+    """
+    Квантует линейные слои модели в int8 (динамическое квантование PyTorch).
+    
+    Веса линейных слоев хранятся в int8, активации квантуются на лету, поэтому
+    модель занимает примерно в 4 раза меньше памяти в этих слоях и быстрее
+    работает на CPU. Остальные слои (свертки, нормализация, эмбеддинги)
+    остаются в float32.
+    
+    Args:
+        model: Модель torch.nn.Module на CPU
+    
+    Returns:
+        Квантованная модель в режиме eval
+    """
+    import torch
+    
+    # Наследники nn.Linear (например, whisper.model.Linear, который только
+    # приводит тип весов) квантование пропускает: оно сравнивает точный тип
+    # модуля. В float32 на CPU они эквивалентны nn.Linear
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    
+    model = model.to("cpu").eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantized_cache_path(name: str, cache_dir: str) -> Path:
+    """
+    Путь к сохраненной квантованной модели.
+    
+    В имя файла входит версия torch: сохраненные модули не переносятся
+    между версиями.
+    
+    Args:
+        name: Уникальное имя модели (тип и название)
+        cache_dir: Папка кэша
+    
+    Returns:
+        Path: Путь к файлу .pt
+    """
+    import torch
+    
+    safe_name = re.sub(r'[^\w.-]+', '_', name)
+    return Path(cache_dir) / "quantized" / f"{safe_name}-torch{torch.__version__}.pt"
+
+
+def load_quantized(
+    name: str,
+    loader: Callable[[], Any],
+    cache_dir: Optional[str] = None,
+    verbose: bool = False
+) -> Any:
+    """
+    Загружает квантованную модель из кэша или квантует и сохраняет ее.
+    
+    Args:
+        name: Уникальное имя модели (тип и название)
+        loader: Функция без аргументов, загружающая исходную модель float32
+        cache_dir: Папка кэша. Если None, модель квантуется при каждой загрузке
+        verbose: Выводить ли подробную информацию
+    
+    Returns:
+        Квантованная модель
+    """
+    import torch
+    
+    path = quantized_cache_path(name, cache_dir) if cache_dir else None
+    
+    if path is not None and path.exists():
+        try:
+            model = torch.load(path, map_location="cpu", weights_only=False)
+            if verbose:
+                print(f"Квантованная модель загружена из кэша: {path}")
+            return model
+        except Exception as e:
+            # Поврежденный или несовместимый файл - квантуем заново
+            if verbose:
+                print(f"Не удалось загрузить квантованную модель {path}: {e}")
+            path.unlink(missing_ok=True)
+    
+    model = quantize_linear(loader())
+    if verbose:
+        print(f"Модель {name} квантована в int8")
+    
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                torch.save(model, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+    
+    return model
@@ -0,0 +1,248 @@
+"""Метрики этапов обработки: время, процессорное время, память и real-time factor."""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Пиковый размер резидентной памяти процесса в байтах.
+    
+    Returns:
+        Optional[int]: Пик RSS или None, если платформа его не сообщает
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux сообщает килобайты, macOS - байты
+        return peak if sys.platform == "darwin" else peak * 1024
+    
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss)
+
+
+def current_rss_bytes() -> Optional[int]:
+    """
+    Текущий размер резидентной памяти процесса в байтах.
+    
+    Returns:
+        Optional[int]: RSS или None, если платформа его не сообщает
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+@dataclass
+class StageMetrics:
+    """
+    Метрики одного выполнения этапа.
+    
+    Процессорное время и память считаются по всему процессу: CPU - время
+    всех потоков процесса за время этапа, rss_delta_bytes - изменение
+    текущего RSS от начала до конца этапа, peak_rss_bytes - пик RSS процесса
+    на момент окончания этапа.
+    """
+    wall_seconds: float
+    process_cpu_seconds: float
+    rss_delta_bytes: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    audio_seconds: Optional[float] = None
+    
+    @property
+    def real_time_factor(self) -> Optional[float]:
+        """Время этапа на секунду аудио (меньше 1 - быстрее реального времени)."""
+        if not self.audio_seconds:
+            return None
+        return self.wall_seconds / self.audio_seconds
+    
+    def to_dict(self) -> Dict[str, Any]:
+        rtf = self.real_time_factor
+        return {
+            'wall_seconds': round(self.wall_seconds, 3),
+            'process_cpu_seconds': round(self.process_cpu_seconds, 3),
+            'rss_delta_bytes': self.rss_delta_bytes,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'audio_seconds': self.audio_seconds,
+            'real_time_factor': round(rtf, 4) if rtf is not None else None,
+        }
+
+
+@contextmanager
+def measure_stage(metadata: Dict[str, Any], stage: str):
+    """
+    Замеряет этап и записывает метрики в metadata.
+    
+    Время в секундах пишется в metadata['timings'][stage], полные метрики
+    (StageMetrics.to_dict) - в metadata['stages'][stage]. Процессорное время
+    и память считаются по всему процессу (внутренние потоки моделей тоже
+    попадают в этап), поэтому у этапов, идущих параллельно (транскрипция и
+    диаризация, конвейер пакетной обработки), они пересекаются.
+    Длительность аудио берется из metadata['audio_duration'] после этапа.
+    
+    Args:
+        metadata: Словарь метаданных результата
+        stage: Имя этапа
+    """
+    rss_before = current_rss_bytes()
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - started
+        rss_after = current_rss_bytes()
+        metrics = StageMetrics(
+            wall_seconds=wall,
+            process_cpu_seconds=time.process_time() - cpu_started,
+            rss_delta_bytes=(
+                rss_after - rss_before
+                if rss_before is not None and rss_after is not None else None
+            ),
+            peak_rss_bytes=peak_rss_bytes(),
+            audio_seconds=metadata.get('audio_duration'),
+        )
+        metadata.setdefault('timings', {})[stage] = round(wall, 3)
+        metadata.setdefault('stages', {})[stage] = metrics.to_dict()
+
+
+@dataclass
+class _StageTotals:
+    runs: int = 0
+    wall_seconds: float = 0.0
+    process_cpu_seconds: float = 0.0
+    audio_seconds: float = 0.0
+    max_rss_delta_bytes: int = 0
+    max_peak_rss_bytes: int = 0
+
+
+class StageMetricsCollector:
+    """
+    Сводные метрики этапов по нескольким файлам.
+    
+    Собирает metadata['stages'] результатов обработки, печатает сводную
+    таблицу и выгружает счетчики в текстовый файл для Prometheus
+    (node_exporter textfile collector).
+    """
+    
+    def __init__(self):
+        self._totals: Dict[str, _StageTotals] = {}
+        self._files = 0
+        self._lock = threading.Lock()
+    
+    def add(self, metadata: Dict[str, Any]):
+        """
+        Добавляет метрики одного результата.
+        
+        Args:
+            metadata: ProcessingResult.metadata
+        """
+        with self._lock:
+            self._files += 1
+            for stage, metrics in metadata.get('stages', {}).items():
+                totals = self._totals.setdefault(stage, _StageTotals())
+                totals.runs += 1
+                totals.wall_seconds += metrics.get('wall_seconds') or 0.0
+                totals.process_cpu_seconds += metrics.get('process_cpu_seconds') or 0.0
+                totals.audio_seconds += metrics.get('audio_seconds') or 0.0
+                totals.max_rss_delta_bytes = max(
+                    totals.max_rss_delta_bytes, metrics.get('rss_delta_bytes') or 0
+                )
+                totals.max_peak_rss_bytes = max(
+                    totals.max_peak_rss_bytes, metrics.get('peak_rss_bytes') or 0
+                )
+    
+    def extend(self, metadatas: Iterable[Dict[str, Any]]):
+        """Добавляет метрики нескольких результатов."""
+        for metadata in metadatas:
+            self.add(metadata)
+    
+    def format_table(self) -> str:
+        """Сводная таблица по этапам (CPU и память - по всему процессу)."""
+        lines = [
+            f"{'этап':<16} {'запусков':>8} {'время, с':>10} {'CPU проц., с':>12} "
+            f"{'RSS +МБ':>8} {'пик RSS, МБ':>11} {'аудио, с':>10} {'RTF':>7}"
+        ]
+        with self._lock:
+            for stage, totals in self._totals.items():
+                rtf = totals.wall_seconds / totals.audio_seconds if totals.audio_seconds else None
+                lines.append(
+                    f"{stage:<16} {totals.runs:>8} {totals.wall_seconds:>10.1f} "
+                    f"{totals.process_cpu_seconds:>12.1f} "
+                    f"{totals.max_rss_delta_bytes / 2**20:>8.0f} "
+                    f"{totals.max_peak_rss_bytes / 2**20:>11.0f} "
+                    f"{totals.audio_seconds:>10.1f} "
+                    f"{(f'{rtf:.3f}' if rtf is not None else '-'):>7}"
+                )
+        return "\n".join(lines)
+    
+    def prometheus_text(self, prefix: str = "file2text") -> str:
+        """Метрики в текстовом формате Prometheus."""
+        metrics = [
+            ("files_total", "counter", "Обработано результатов", None),
+            ("stage_runs_total", "counter", "Выполнений этапа", "runs"),
+            ("stage_wall_seconds_total", "counter", "Время этапа, с", "wall_seconds"),
+            ("stage_process_cpu_seconds_total", "counter",
+             "Процессорное время процесса за время этапа, с", "process_cpu_seconds"),
+            ("stage_audio_seconds_total", "counter", "Обработано аудио, с", "audio_seconds"),
+            ("stage_rss_delta_bytes", "gauge",
+             "Максимальный прирост RSS процесса за время этапа, байт", "max_rss_delta_bytes"),
+            ("stage_peak_rss_bytes", "gauge",
+             "Пик RSS процесса по окончании этапа, байт", "max_peak_rss_bytes"),
+        ]
+        lines = []
+        with self._lock:
+            for name, kind, description, field in metrics:
+                lines.append(f"# HELP {prefix}_{name} {description}")
+                lines.append(f"# TYPE {prefix}_{name} {kind}")
+                if field is None:
+                    lines.append(f"{prefix}_{name} {self._files}")
+                    continue
+                for stage, totals in self._totals.items():
+                    lines.append(f'{prefix}_{name}{{stage="{stage}"}} {getattr(totals, field)}')
+        return "\n".join(lines) + "\n"
+    
+    def write_prometheus(self, path: str, prefix: str = "file2text"):
+        """
+        Атомарно записывает метрики в файл для textfile collector.
+        
+        Args:
+            path: Путь к файлу .prom
+            prefix: Префикс имен метрик
+        """
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.prometheus_text(prefix))
+            # mkstemp создает файл с правами 0600, а node_exporter обычно
+            # работает под другим пользователем
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
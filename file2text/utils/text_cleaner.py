@@ -1,6 +1,112 @@
 """Утилиты для очистки текста от артефактов."""
 
 import re
+from typing import List, Pattern, Tuple
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_INTERJECTIONS_RE = re.compile(
+    r'\b(Ага|Оке|Окей|Да|Нет|Угу|М-м|Хм)\s*[.!?,]?\s*(\1\s*[.!?,]?\s*){2,}',
+    re.IGNORECASE
+)
+_REPEATED_WORDS_RE = re.compile(r'\b(\w+)(\s+\1){2,}\b', re.IGNORECASE)
+_REPEATED_LIST_RE = re.compile(r'(\b\w+\b)(\s*,\s*\1){2,}', re.IGNORECASE)
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]\s+')
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_REPEATED_PUNCTUATION_RE = re.compile(r'\s*([.!?])\s*\1+')
+
+# Повторяющиеся подстроки (фразы длиной 10-80 символов): (длина, шаблон)
+_PHRASE_PATTERNS = [
+    (length, re.compile(rf'([^.!?]{{{length//2},{length}}})(\s*[,.]\s*\1){{2,}}'))
+    for length in range(80, 9, -10)
+]
+# Повторяющиеся части предложений через запятую
+_CLAUSE_PATTERNS = [
+    (length, re.compile(rf'([^.!?]{{{length//2},{length}}})(\s*,\s*\1)+'))
+    for length in range(50, 14, -5)
+]
+_PHRASE_SEPARATORS_RE = re.compile(r'[,.]')
+_CLAUSE_SEPARATORS_RE = re.compile(r',')
+
+
+def _repeat_windows(
+    text: str,
+    separators: Pattern,
+    length: int,
+    probe_length: int
+) -> List[Tuple[int, int]]:
+    """
+    Находит участки текста, где шаблон повтора фразы может найти совпадение.
+    
+    Совпадение шаблона - фраза X длиной не более length без .!?, за которой
+    через разделитель снова идет X. Значит, после каждого разделителя внутри
+    совпадения (после пробелов) начинается X, а ее первые символы встречаются
+    в тексте не дальше length символов до разделителя. Разделители, для
+    которых это не так, отбрасываются одним поиском подстроки, а шаблон
+    применяется только в окрестностях оставшихся.
+    
+    Args:
+        text: Текст
+        separators: Шаблон символов-разделителей
+        length: Максимальная длина фразы в шаблоне
+        probe_length: Длина проверяемого префикса повтора, меньше минимальной
+                      длины фразы в шаблоне
+        
+    Returns:
+        List[Tuple[int, int]]: Непересекающиеся окна (начало, конец) по возрастанию
+    """
+    n = len(text)
+    windows = []
+    for match in separators.finditer(text):
+        sep = match.start()
+        
+        # Пробелы до и после разделителя
+        before = sep
+        while before > 0 and text[before - 1].isspace():
+            before -= 1
+        after = sep + 1
+        while after < n and text[after].isspace():
+            after += 1
+        
+        # При одном пробеле после разделителя повтор начинается с первого
+        # непробельного символа или с пробела перед ним; в обоих случаях
+        # text[after:after + probe_length] входит в повторяющуюся фразу.
+        # Длинные пробельные промежутки проверяем без отсева.
+        if after - sep - 1 <= 1:
+            probe = text[after:after + probe_length]
+            if len(probe) < probe_length or '.' in probe or '!' in probe or '?' in probe:
+                continue
+            if text.find(probe, max(0, before - length), sep) == -1:
+                continue
+        
+        start = max(0, before - length)
+        end = min(n, after + length)
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def _collapse_repeats(text: str, pattern: Pattern, separators: Pattern, length: int) -> str:
+    """
+    Заменяет совпадения pattern на первую группу, применяя шаблон только в
+    окнах _repeat_windows. Любое совпадение шаблона целиком лежит в одном окне,
+    поэтому результат совпадает с заменой по всему тексту.
+    """
+    # Фраза в шаблоне не короче length // 2 символов
+    windows = _repeat_windows(text, separators, length, length // 2 - 1)
+    if not windows:
+        return text
+    
+    parts = []
+    position = 0
+    for start, end in windows:
+        parts.append(text[position:start])
+        parts.append(pattern.sub(r'\1', text[start:end]))
+        position = end
+    parts.append(text[position:])
+    return ''.join(parts)
 
 
 def clean_text(text: str) -> str:
@@ -17,24 +123,19 @@ def clean_text(text: str) -> str:
         return text
     
     # Удаляем множественные пробелы
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WHITESPACE_RE.sub(' ', text).strip()
     
     # Удаляем множественные повторения междометий (более 2 подряд)
-    text = re.sub(
-        r'\b(Ага|Оке|Окей|Да|Нет|Угу|М-м|Хм)\s*[.!?,]?\s*(\1\s*[.!?,]?\s*){2,}',
-        r'\1. ',
-        text,
-        flags=re.IGNORECASE
-    )
+    text = _INTERJECTIONS_RE.sub(r'\1. ', text)
     
     # Удаляем повторяющиеся слова (более 2 подряд)
-    text = re.sub(r'\b(\w+)(\s+\1){2,}\b', r'\1 \1', text, flags=re.IGNORECASE)
+    text = _REPEATED_WORDS_RE.sub(r'\1 \1', text)
     
     # Удаляем повторяющиеся фразы в предложениях (типа "симплоро, симплоро, симплоро")
-    text = re.sub(r'(\b\w+\b)(\s*,\s*\1){2,}', r'\1', text, flags=re.IGNORECASE)
+    text = _REPEATED_LIST_RE.sub(r'\1', text)
     
     # Разбиваем на предложения для удаления дубликатов
-    sentences = re.split(r'[.!?]\s+', text)
+    sentences = _SENTENCE_SPLIT_RE.split(text)
     seen_sentences = {}
     cleaned_sentences = []
     
@@ -48,8 +149,8 @@ def clean_text(text: str) -> str:
             continue
         
         # Нормализуем предложение для сравнения (убираем пунктуацию, лишние пробелы)
-        normalized = re.sub(r'[^\w\s]', '', sentence.lower())
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        normalized = _PUNCTUATION_RE.sub('', sentence.lower())
+        normalized = _WHITESPACE_RE.sub(' ', normalized).strip()
         
         # Пропускаем точные дубликаты
         if normalized in seen_sentences:
@@ -66,18 +167,17 @@ def clean_text(text: str) -> str:
         text += '.'
     
     # Удаляем повторяющиеся подстроки в предложениях (фразы длиной 10-80 символов)
-    for length in range(80, 9, -10):
-        pattern = rf'([^.!?]{{{length//2},{length}}})(\s*[,.]\s*\1){{2,}}'
-        text = re.sub(pattern, r'\1', text)
+    # (шаблоны применяются только в окрестностях возможных повторов)
+    for length, pattern in _PHRASE_PATTERNS:
+        text = _collapse_repeats(text, pattern, _PHRASE_SEPARATORS_RE, length)
     
     # Удаляем повторяющиеся части предложений
-    for length in range(50, 14, -5):
-        pattern = rf'([^.!?]{{{length//2},{length}}})(\s*,\s*\1)+'
-        text = re.sub(pattern, r'\1', text)
+    for length, pattern in _CLAUSE_PATTERNS:
+        text = _collapse_repeats(text, pattern, _CLAUSE_SEPARATORS_RE, length)
     
     # Финальная очистка пробелов и пунктуации
-    text = re.sub(r'\s+', ' ', text).strip()
-    text = re.sub(r'\s*([.!?])\s*\1+', r'\1', text)  # Убираем множественные знаки препинания
+    text = _WHITESPACE_RE.sub(' ', text).strip()
+    text = _REPEATED_PUNCTUATION_RE.sub(r'\1', text)  # Убираем множественные знаки препинания
     
     return text
 
@@ -99,7 +199,7 @@ def postprocess_summary(summary: str) -> str:
     summary = clean_text(summary)
     
     # Удаляем повторяющиеся предложения
-    sentences = re.split(r'[.!?]\s+', summary)
+    sentences = _SENTENCE_SPLIT_RE.split(summary)
     unique_sentences = []
     seen = set()
     
@@ -109,7 +209,7 @@ def postprocess_summary(summary: str) -> str:
             continue
         
         # Нормализуем для сравнения
-        normalized = re.sub(r'\s+', ' ', sentence.lower().strip())
+        normalized = _WHITESPACE_RE.sub(' ', sentence.lower().strip())
         
         # Пропускаем точные дубликаты
         if normalized in seen:
@@ -123,6 +223,6 @@ def postprocess_summary(summary: str) -> str:
         result += '.'
     
     # Удаляем повторяющиеся слова в конце (артефакты модели)
-    result = re.sub(r'\b(\w+)(\s+\1){2,}\b', r'\1', result, flags=re.IGNORECASE)
+    result = _REPEATED_WORDS_RE.sub(r'\1', result)
     
     return result.strip()
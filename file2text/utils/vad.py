@@ -0,0 +1,244 @@
+"""Определение участков речи (VAD) по энергии и спектру сигнала."""
+
+from bisect import bisect_right
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+def _frame_levels(frames: np.ndarray) -> np.ndarray:
+    """Энергия кадров (n_frames, frame_len) в дБ относительно полной шкалы."""
+    power = np.mean(frames * frames, axis=1, dtype=np.float64)
+    return 10.0 * np.log10(power + 1e-12)
+
+
+def detect_speech(
+    audio: np.ndarray,
+    sample_rate: int = 16000,
+    frame_ms: int = 30,
+    threshold_db: float = 12.0,
+    min_level_db: float = -55.0,
+    min_band_ratio: float = 0.35,
+    min_speech_ms: int = 250,
+    min_silence_ms: int = 600,
+    pad_ms: int = 200
+) -> List[Tuple[float, float]]:
+    """
+    Находит участки речи в моно сигнале.
+    
+    Кадр считается речевым, если его энергия выше уровня шума (10-й
+    процентиль энергии кадров) на threshold_db и не ниже min_level_db, а
+    доля энергии в полосе речи 300-3400 Гц не меньше min_band_ratio. Так
+    отсекаются тишина, фоновый шум, гул и большая часть музыки.
+    
+    Args:
+        audio: Моно сигнал float32 в диапазоне [-1, 1]
+        sample_rate: Частота дискретизации
+        frame_ms: Длина кадра анализа в миллисекундах
+        threshold_db: Превышение над уровнем шума для речевого кадра, дБ
+        min_level_db: Минимальный уровень речевого кадра, дБ относительно полной шкалы
+        min_band_ratio: Минимальная доля энергии в полосе речи
+        min_speech_ms: Участки речи короче отбрасываются
+        min_silence_ms: Паузы короче не разрывают участок речи
+        pad_ms: Запас, добавляемый к границам участков
+    
+    Returns:
+        List[Tuple[float, float]]: Участки речи (start, end) в секундах по возрастанию
+    """
+    frame_len = int(sample_rate * frame_ms / 1000)
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return []
+    
+    frames = np.asarray(audio[:n_frames * frame_len], dtype=np.float32).reshape(n_frames, frame_len)
+    level_db = _frame_levels(frames)
+    noise_db = np.percentile(level_db, 10)
+    loud = level_db >= max(noise_db + threshold_db, min_level_db)
+    
+    # Доля энергии в полосе речи (только для громких кадров, блоками,
+    # чтобы спектр многочасовой записи не занимал память целиком)
+    speech = np.zeros(n_frames, dtype=bool)
+    window = np.hanning(frame_len).astype(np.float32)
+    freqs = np.fft.rfftfreq(frame_len, 1.0 / sample_rate)
+    band = (freqs >= 300) & (freqs <= 3400)
+    loud_idx = np.flatnonzero(loud)
+    for i in range(0, len(loud_idx), 4096):
+        idx = loud_idx[i:i + 4096]
+        spectrum = np.abs(np.fft.rfft(frames[idx] * window, axis=1)) ** 2
+        ratio = spectrum[:, band].sum(axis=1) / (spectrum.sum(axis=1) + 1e-12)
+        speech[idx] = ratio >= min_band_ratio
+    
+    # Границы речевых отрезков из кадров
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    
+    frame_sec = frame_len / sample_rate
+    min_gap = min_silence_ms / 1000.0
+    regions: List[List[float]] = []
+    for start, end in zip((starts * frame_sec).tolist(), (ends * frame_sec).tolist()):
+        if regions and start - regions[-1][1] < min_gap:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+    
+    duration = len(audio) / sample_rate
+    pad = pad_ms / 1000.0
+    result: List[Tuple[float, float]] = []
+    for start, end in regions:
+        if end - start < min_speech_ms / 1000.0:
+            continue
+        start = max(0.0, start - pad)
+        end = min(duration, end + pad)
+        if result and start <= result[-1][1]:
+            result[-1] = (result[-1][0], end)
+        else:
+            result.append((start, end))
+    
+    return result
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    sample_rate: int = 16000,
+    window_seconds: float = 180.0,
+    search_seconds: float = 30.0,
+    frame_ms: int = 30
+) -> List[Tuple[int, int]]:
+    """
+    Делит сигнал на окна около window_seconds с разрезами в самых тихих местах.
+    
+    Каждый разрез ищется в пределах ±search_seconds от window_seconds после
+    предыдущего: выбирается кадр с минимальной энергией, сглаженной по
+    соседним кадрам, поэтому разрез попадает в паузу, а не в середину слова.
+    
+    Args:
+        audio: Моно сигнал
+        sample_rate: Частота дискретизации
+        window_seconds: Желаемая длина окна в секундах
+        search_seconds: Допустимое отклонение разреза в секундах
+        frame_ms: Длина кадра анализа в миллисекундах
+    
+    Returns:
+        List[Tuple[int, int]]: Окна (start, end) в отсчетах, покрывающие весь сигнал
+    """
+    frame_len = int(sample_rate * frame_ms / 1000)
+    n_frames = len(audio) // frame_len
+    window = int(window_seconds * 1000 / frame_ms)
+    search = min(int(search_seconds * 1000 / frame_ms), window // 2)
+    
+    if n_frames <= window + search:
+        return [(0, len(audio))]
+    
+    frames = np.asarray(audio[:n_frames * frame_len], dtype=np.float32).reshape(n_frames, frame_len)
+    smooth = 10
+    level_db = np.convolve(_frame_levels(frames), np.ones(smooth) / smooth, mode='same')
+    
+    bounds = []
+    start = 0
+    while n_frames - start > window + search:
+        low = start + window - search
+        cut = low + int(np.argmin(level_db[low:start + window + search]))
+        bounds.append((start * frame_len, cut * frame_len))
+        start = cut
+    bounds.append((start * frame_len, len(audio)))
+    
+    return bounds
+
+
+def concatenate_speech(
+    audio: np.ndarray,
+    regions: List[Tuple[float, float]],
+    sample_rate: int = 16000,
+    gap: float = 0.3
+) -> Tuple[np.ndarray, List[Tuple[float, float, float]]]:
+    """
+    Склеивает участки речи в один сигнал, разделяя их короткой тишиной.
+    
+    Args:
+        audio: Моно сигнал
+        regions: Участки речи (start, end) в секундах
+        sample_rate: Частота дискретизации
+        gap: Длина тишины между участками в секундах
+    
+    Returns:
+        Tuple: Склеенный сигнал и таблица смещений [(начало в склеенном
+               сигнале, начало в исходном, длительность)] для remap_time
+    """
+    gap_samples = np.zeros(int(gap * sample_rate), dtype=np.float32)
+    parts = []
+    offsets = []
+    position = 0
+    for start, end in regions:
+        piece = audio[int(start * sample_rate):int(end * sample_rate)]
+        if len(piece) == 0:
+            continue
+        if parts:
+            parts.append(gap_samples)
+            position += len(gap_samples)
+        offsets.append((position / sample_rate, start, len(piece) / sample_rate))
+        parts.append(piece)
+        position += len(piece)
+    
+    if not parts:
+        return np.zeros(0, dtype=np.float32), []
+    return np.concatenate(parts).astype(np.float32, copy=False), offsets
+
+
+def _remap(t: float, starts: List[float], offsets: List[Tuple[float, float, float]]) -> float:
+    i = max(0, bisect_right(starts, t) - 1)
+    joined_start, original_start, duration = offsets[i]
+    return original_start + min(max(t - joined_start, 0.0), duration)
+
+
+def remap_time(t: float, offsets: List[Tuple[float, float, float]]) -> float:
+    """
+    Переводит время в склеенном сигнале во время исходного сигнала.
+    
+    Время внутри вставленной тишины относится к концу предыдущего участка.
+    
+    Args:
+        t: Время в склеенном сигнале, секунды
+        offsets: Таблица смещений из concatenate_speech
+    
+    Returns:
+        float: Время в исходном сигнале, секунды
+    """
+    if not offsets:
+        return t
+    return _remap(t, [offset[0] for offset in offsets], offsets)
+
+
+def remap_segments(
+    segments: List[Dict[str, Any]],
+    offsets: List[Tuple[float, float, float]]
+) -> List[Dict[str, Any]]:
+    """
+    Переводит временные метки сегментов Whisper (и их слов) на исходную шкалу.
+    
+    Args:
+        segments: Сегменты транскрипции склеенного сигнала
+        offsets: Таблица смещений из concatenate_speech
+    
+    Returns:
+        List[Dict]: Копии сегментов с исправленными start и end
+    """
+    if not offsets:
+        return segments
+    
+    starts = [offset[0] for offset in offsets]
+    remapped = []
+    for segment in segments:
+        segment = dict(segment)
+        segment['start'] = _remap(segment['start'], starts, offsets)
+        segment['end'] = _remap(segment['end'], starts, offsets)
+        if segment.get('words'):
+            words = []
+            for word in segment['words']:
+                word = dict(word)
+                word['start'] = _remap(word['start'], starts, offsets)
+                word['end'] = _remap(word['end'], starts, offsets)
+                words.append(word)
+            segment['words'] = words
+        remapped.append(segment)
+    return remapped
@@ -1,32 +1,195 @@
 """Скрипт для автоматической обработки файлов из папки files/."""
 
 import os
+import json
+import shutil
+import signal
 import argparse
 from pathlib import Path
 from file2text import File2Text
+from file2text.core.batch import BatchProcessor
 from file2text.utils.config import load_config
+from file2text.utils.folder_watcher import FolderWatcher
+from file2text.utils.job_ledger import JobLedger
+from file2text.utils.stage_metrics import StageMetricsCollector
 
 # Папки
 FILES_DIR = 'files'
 TEXT_DIR = 'text'
+ARCHIVE_DIR = 'archive'
+# WAV, сконвертированные при IN_MEMORY_DECODE=false: вне FILES_DIR, чтобы
+# не попасть в обработку как новые файлы
+CONVERTED_DIR = 'converted'
+
+# Журнал заданий: состояние файлов по этапам для продолжения после сбоя
+JOBS_DB = 'jobs.sqlite3'
+
+# Что делать с исходным файлом после успешной обработки
+SOURCE_POLICIES = ('keep', 'delete', 'archive')
 
 # Создаём папку для текстов, если она не существует
 os.makedirs(TEXT_DIR, exist_ok=True)
 
 
-def process_audio_files(summarize: bool = False, vectorize: bool = False, model: str = None):
+def save_result(audio_file: Path, result, summarize: bool, vectorize: bool):
+    """
+    Сохраняет результаты обработки файла в папки text/ и sumText/.
+    
+    Args:
+        audio_file: Исходный файл
+        result: Результат обработки (ProcessingResult)
+        summarize: Сохранять ли суммаризацию
+        vectorize: Сохранять ли векторы
+    """
+    base_name = audio_file.stem
+    
+    # Сохраняем полный текст
+    full_text_filename = f"{base_name}_full.txt"
+    full_text_path = Path(TEXT_DIR) / full_text_filename
+    
+    with open(full_text_path, "w", encoding="utf-8") as f:
+        f.write(result.text)
+    print(f"✓ Полный текст сохранён: {full_text_path}")
+    
+    # Сохраняем текст со спикерами
+    if result.speakers:
+        text_filename = f"{base_name}.txt"
+        text_path = Path(TEXT_DIR) / text_filename
+        
+        # Форматируем текст со спикерами
+        speaker_lines = []
+        for segment in result.speaker_segments:
+            speaker_lines.append(f"Спикер {segment['speaker']}: {segment['text']}")
+        
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(speaker_lines))
+        print(f"✓ Текст со спикерами сохранён: {text_path}")
+    
+    # Сохраняем суммаризацию если включена
+    if summarize and result.summary:
+        sum_text_dir = Path('sumText')
+        sum_text_dir.mkdir(exist_ok=True)
+        
+        if 'full' in result.summary:
+            summary_full_path = sum_text_dir / f"{base_name}_summary_full.txt"
+            with open(summary_full_path, "w", encoding="utf-8") as f:
+                f.write("=== СУММАРИЗАЦИЯ ВСЕГО РАЗГОВОРА ===\n\n")
+                f.write(result.summary['full'])
+            print(f"✓ Суммаризация всего разговора сохранена: {summary_full_path}")
+        
+        if 'by_speakers' in result.summary:
+            summary_speakers_path = sum_text_dir / f"{base_name}_summary_speakers.txt"
+            with open(summary_speakers_path, "w", encoding="utf-8") as f:
+                f.write("=== СУММАРИЗАЦИЯ ПО СПИКЕРАМ ===\n\n")
+                for speaker, summary_text in result.summary['by_speakers'].items():
+                    f.write(f"=== СПИКЕР {speaker} ===\n\n{summary_text}\n\n")
+            print(f"✓ Суммаризация по спикерам сохранена: {summary_speakers_path}")
+    
+    # Сохраняем векторы если включена векторизация
+    if vectorize and result.vectors is not None:
+        import numpy as np
+        vectors_path = Path(TEXT_DIR) / f"{base_name}_vectors.npy"
+        np.save(vectors_path, result.vectors)
+        print(f"✓ Векторы сохранены: {vectors_path} (размерность: {result.vectors.shape})")
+        
+        # Строка i матрицы векторов соответствует сегменту i
+        vector_segments_path = Path(TEXT_DIR) / f"{base_name}_vector_segments.json"
+        with open(vector_segments_path, "w", encoding="utf-8") as f:
+            json.dump(result.vector_segments, f, ensure_ascii=False, indent=2)
+        print(f"✓ Сегменты векторов сохранены: {vector_segments_path}")
+
+
+def apply_source_policy(audio_file: Path, policy: str, archive_dir: str = ARCHIVE_DIR):
+    """
+    Обрабатывает исходный файл после сохранения результатов.
+    
+    Args:
+        audio_file: Исходный файл
+        policy: keep - оставить, delete - удалить, archive - переместить в archive_dir
+        archive_dir: Папка архива (файл с тем же именем не перезаписывается)
+    """
+    if policy == 'delete':
+        audio_file.unlink()
+        print(f"✓ Файл удалён: {audio_file.name}")
+    elif policy == 'archive':
+        target_dir = Path(archive_dir)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / audio_file.name
+        counter = 1
+        while target.exists():
+            target = target_dir / f"{audio_file.stem}_{counter}{audio_file.suffix}"
+            counter += 1
+        shutil.move(str(audio_file), str(target))
+        print(f"✓ Файл перемещён в архив: {target}")
+    elif policy != 'keep':
+        raise ValueError(f"Неизвестная политика: {policy}. Доступны: {', '.join(SOURCE_POLICIES)}")
+
+
+def process_audio_files(
+    summarize: bool = False,
+    vectorize: bool = False,
+    model: str = None,
+    decode_workers: int = 2,
+    transcribe_workers: int = 1,
+    diarize_workers: int = 1,
+    postprocess_workers: int = 1,
+    queue_size: int = 2,
+    use_cache: bool = True,
+    profile: str = None,
+    metrics_file: str = None,
+    source_policy: str = 'delete',
+    archive_dir: str = ARCHIVE_DIR,
+    ledger_path: str = JOBS_DB,
+    watch: bool = False,
+    stable_seconds: float = 5.0,
+    poll_interval: float = 1.0,
+    max_pending: int = 16
+):
     """
     Обрабатывает все аудио файлы из папки files/.
     
+    Файлы обрабатываются конвейером: конвертация следующих файлов,
+    транскрипция, диаризация и суммаризация разных файлов идут одновременно.
+    Результат каждого этапа сохраняется в журнале заданий, поэтому после
+    сбоя повторный запуск продолжает обработку с незавершенного этапа.
+    
+    В режиме watch скрипт не завершается: модели остаются загруженными, а
+    новые файлы обрабатываются, как только их запись в папку завершилась.
+    
     Args:
         summarize: Включить ли суммаризацию
         vectorize: Включить ли векторизацию
         model: Модель Whisper (если None, используется из конфигурации)
+        decode_workers: Потоки конвертации через ffmpeg
+        transcribe_workers: Потоки транскрипции
+        diarize_workers: Потоки диаризации
+        postprocess_workers: Потоки суммаризации и векторизации
+        queue_size: Размер очереди между этапами
+        use_cache: Использовать ли кэш результатов в config.cache_dir
+        profile: Профиль декодирования Whisper (если None, используется из конфигурации)
+        metrics_file: Файл метрик этапов в формате Prometheus (.prom). Обновляется
+                      после каждого файла
+        source_policy: Что делать с исходным файлом после успешной обработки:
+                       keep, delete или archive
+        archive_dir: Папка архива для политики archive
+        ledger_path: Путь к журналу заданий (SQLite)
+        watch: Следить за папкой и обрабатывать новые файлы до остановки
+               (Ctrl+C или SIGTERM)
+        stable_seconds: Сколько секунд размер файла не должен меняться, чтобы
+                        считать его скопированным (режим watch)
+        poll_interval: Период проверки новых файлов, с (режим watch)
+        max_pending: Максимум готовых файлов в очереди на обработку (режим watch)
     """
+    if source_policy not in SOURCE_POLICIES:
+        print(f"Неизвестная политика: {source_policy}. Доступны: {', '.join(SOURCE_POLICIES)}")
+        return
     
     # Загружаем конфигурацию
     try:
         config = load_config()
+        config.cache_enabled = use_cache
+        config.decoding_profile = profile or config.decoding_profile
+        config.converted_dir = config.converted_dir or CONVERTED_DIR
     except ValueError as e:
         print(f"Ошибка конфигурации: {e}")
         print("Убедитесь, что установлена переменная окружения HUGGINGFACE_TOKEN")
@@ -48,100 +211,122 @@ def process_audio_files(summarize: bool = False, vectorize: bool = False, model:
     # Находим все медиа файлы (аудио и видео)
     from file2text.utils.audio_converter import AudioConverter
     
-    media_files = [
-        f for f in files_path.iterdir()
-        if f.is_file() and AudioConverter.is_media_file(str(f))
-    ]
+    ledger = JobLedger(ledger_path)
+    converted_dir = Path(config.converted_dir).resolve()
     
-    if not media_files:
-        print(f"В папке {FILES_DIR} нет аудио или видео файлов для обработки.")
-        return
+    def accept(path: str) -> bool:
+        # Сконвертированные WAV (если CONVERTED_DIR указывает на FILES_DIR) и
+        # оставленные политикой keep файлы, уже обработанные ранее, пропускаются
+        return (
+            AudioConverter.is_media_file(path)
+            and Path(path).resolve().parent != converted_dir
+            and not ledger.is_done(path)
+        )
+    
+    for path, status, stages in ledger.unfinished():
+        if stages and os.path.exists(path):
+            print(f"↻ Продолжение {Path(path).name} ({status}): готовы этапы {', '.join(stages)}")
     
-    print(f"Найдено файлов для обработки: {len(media_files)}")
-    print(f"  (аудио и видео файлы будут автоматически обработаны)\n")
+    watcher = None
+    if watch:
+        watcher = FolderWatcher(
+            FILES_DIR,
+            accept=accept,
+            stable_seconds=stable_seconds,
+            poll_interval=poll_interval,
+            max_pending=max_pending
+        )
+        watcher.start()
+        
+        # Первый Ctrl+C (или SIGTERM) прекращает прием файлов и дает
+        # дообработать начатые; повторный Ctrl+C прерывает сразу
+        def stop_watching(signum, frame):
+            print("\nОстановка: новые файлы не принимаются, дообрабатываю начатые...")
+            watcher.stop()
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+        
+        signal.signal(signal.SIGINT, stop_watching)
+        signal.signal(signal.SIGTERM, stop_watching)
+        
+        print(f"Слежение за папкой {FILES_DIR} ({watcher.backend}), Ctrl+C для остановки\n")
+        paths = iter(watcher)
+    else:
+        media_files = [f for f in files_path.iterdir() if f.is_file() and accept(str(f))]
+        
+        if not media_files:
+            print(f"В папке {FILES_DIR} нет аудио или видео файлов для обработки.")
+            ledger.close()
+            return
+        
+        print(f"Найдено файлов для обработки: {len(media_files)}")
+        print(f"  (аудио и видео файлы будут автоматически обработаны)\n")
+        paths = (str(f) for f in media_files)
     
-    # Обрабатываем каждый файл
-    for audio_file in media_files:
+    batch = BatchProcessor(
+        processor,
+        decode_workers=decode_workers,
+        transcribe_workers=transcribe_workers,
+        diarize_workers=diarize_workers,
+        postprocess_workers=postprocess_workers,
+        queue_size=queue_size
+    )
+    
+    metrics = StageMetricsCollector()
+    
+    # Обрабатываем файлы конвейером, сохраняя результаты по мере готовности
+    for item in batch.process(
+        paths,
+        diarize=True,
+        summarize=summarize,
+        vectorize=vectorize,
+        ledger=ledger
+    ):
+        audio_file = Path(item.path)
+        metrics.add(item.result.metadata)
+        if metrics_file:
+            metrics.write_prometheus(metrics_file)
+        
+        if not item.success:
+            print(f"✗ Ошибка при обработке файла {audio_file.name}: {item.error}")
+            print(f"  Файл остаётся на месте, завершённые этапы сохранены в журнале\n")
+            continue
+        
         try:
             print(f"\n{'='*60}")
-            print(f"Обрабатываю файл: {audio_file.name}")
+            print(f"Файл обработан: {audio_file.name}")
+            if item.result.metadata.get('resumed_stages'):
+                print(f"  (из журнала: {', '.join(item.result.metadata['resumed_stages'])})")
             print(f"{'='*60}")
             
-            # Обрабатываем файл (транскрипция + диаризация)
-            result = processor.process(
-                audio_path=str(audio_file),
-                transcribe=True,
-                diarize=True,
-                summarize=summarize,
-                vectorize=vectorize
-            )
-            
-            # Сохраняем полный текст
-            base_name = audio_file.stem
-            full_text_filename = f"{base_name}_full.txt"
-            full_text_path = Path(TEXT_DIR) / full_text_filename
-            
-            with open(full_text_path, "w", encoding="utf-8") as f:
-                f.write(result.text)
-            print(f"✓ Полный текст сохранён: {full_text_path}")
-            
-            # Сохраняем текст со спикерами
-            if result.speakers:
-                text_filename = f"{base_name}.txt"
-                text_path = Path(TEXT_DIR) / text_filename
-                
-                # Форматируем текст со спикерами
-                speaker_lines = []
-                for segment in result.speaker_segments:
-                    speaker_lines.append(f"Спикер {segment['speaker']}: {segment['text']}")
-                
-                with open(text_path, "w", encoding="utf-8") as f:
-                    f.write("\n".join(speaker_lines))
-                print(f"✓ Текст со спикерами сохранён: {text_path}")
-            
-            # Сохраняем суммаризацию если включена
-            if summarize and result.summary:
-                sum_text_dir = Path('sumText')
-                sum_text_dir.mkdir(exist_ok=True)
-                
-                if 'full' in result.summary:
-                    summary_full_path = sum_text_dir / f"{base_name}_summary_full.txt"
-                    with open(summary_full_path, "w", encoding="utf-8") as f:
-                        f.write("=== СУММАРИЗАЦИЯ ВСЕГО РАЗГОВОРА ===\n\n")
-                        f.write(result.summary['full'])
-                    print(f"✓ Суммаризация всего разговора сохранена: {summary_full_path}")
-                
-                if 'by_speakers' in result.summary:
-                    summary_speakers_path = sum_text_dir / f"{base_name}_summary_speakers.txt"
-                    with open(summary_speakers_path, "w", encoding="utf-8") as f:
-                        f.write("=== СУММАРИЗАЦИЯ ПО СПИКЕРАМ ===\n\n")
-                        for speaker, summary_text in result.summary['by_speakers'].items():
-                            f.write(f"=== СПИКЕР {speaker} ===\n\n{summary_text}\n\n")
-                    print(f"✓ Суммаризация по спикерам сохранена: {summary_speakers_path}")
-            
-            # Сохраняем векторы если включена векторизация
-            if vectorize and result.vectors is not None:
-                import numpy as np
-                vectors_path = Path(TEXT_DIR) / f"{base_name}_vectors.npy"
-                np.save(vectors_path, result.vectors)
-                print(f"✓ Векторы сохранены: {vectors_path} (размерность: {result.vectors.shape})")
-            
-            # Удаляем обработанный файл
-            try:
-                audio_file.unlink()
-                print(f"✓ Файл удалён: {audio_file.name}")
-            except Exception as e:
-                print(f"⚠ Ошибка при удалении файла {audio_file.name}: {e}")
-            
-            print(f"✓ Файл {audio_file.name} успешно обработан\n")
+            save_result(audio_file, item.result, summarize, vectorize)
             
         except Exception as e:
-            print(f"✗ Ошибка при обработке файла {audio_file.name}: {e}")
-            print(f"  Файл не будет удалён из-за ошибки\n")
+            print(f"✗ Ошибка при сохранении результатов {audio_file.name}: {e}")
+            print(f"  Файл остаётся на месте, завершённые этапы сохранены в журнале\n")
+            ledger.fail(str(audio_file), str(e))
             continue
+        
+        try:
+            apply_source_policy(audio_file, source_policy, archive_dir)
+        except Exception as e:
+            print(f"⚠ Ошибка при обработке исходного файла {audio_file.name}: {e}")
+        
+        # Промежуточный WAV больше не нужен
+        converted = item.result.metadata.get('converted_audio_path')
+        if converted:
+            Path(converted).unlink(missing_ok=True)
+        
+        ledger.finish(str(audio_file))
+        print(f"✓ Файл {audio_file.name} успешно обработан\n")
+    
+    batch.close()
+    ledger.close()
     
     print(f"\n{'='*60}")
     print("Обработка завершена!")
+    print(batch.report.format())
+    print()
+    print(metrics.format_table())
     print(f"{'='*60}")
 
 
@@ -166,11 +351,123 @@ if __name__ == "__main__":
         help="Модель Whisper (tiny, base, small, medium, large-v2, large-v3). "
              "По умолчанию используется из конфигурации."
     )
+    parser.add_argument(
+        "--profile",
+        choices=["realtime", "balanced", "archival"],
+        default=None,
+        help="Профиль декодирования Whisper: realtime (быстро), balanced, "
+             "archival (точно). По умолчанию используется из конфигурации."
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=None,
+        help="Записывать метрики этапов в файл Prometheus (.prom) для "
+             "node_exporter textfile collector"
+    )
+    parser.add_argument(
+        "--source-policy",
+        choices=SOURCE_POLICIES,
+        default="delete",
+        help="Что делать с исходным файлом после успешной обработки: keep "
+             "(оставить, повторно не обрабатывается), delete (удалить, по "
+             "умолчанию) или archive (переместить в папку архива)"
+    )
+    parser.add_argument(
+        "--archive-dir",
+        type=str,
+        default=ARCHIVE_DIR,
+        help=f"Папка архива для --source-policy archive (по умолчанию {ARCHIVE_DIR})"
+    )
+    parser.add_argument(
+        "--ledger",
+        type=str,
+        default=JOBS_DB,
+        help=f"Журнал заданий SQLite для продолжения после сбоя (по умолчанию {JOBS_DB})"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Не завершаться: следить за папкой files/ и обрабатывать новые "
+             "файлы, не выгружая модели (inotify через watchdog, если он "
+             "установлен, иначе опрос папки)"
+    )
+    parser.add_argument(
+        "--stable-seconds",
+        type=float,
+        default=5.0,
+        help="Режим --watch: файл берется в обработку, когда его размер не "
+             "меняется указанное число секунд (по умолчанию 5)"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Режим --watch: период проверки новых файлов, с (по умолчанию 1)"
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=16,
+        help="Режим --watch: максимум готовых файлов в очереди на обработку "
+             "(по умолчанию 16)"
+    )
+    parser.add_argument(
+        "--decode-workers",
+        type=int,
+        default=2,
+        help="Количество потоков конвертации через ffmpeg (по умолчанию 2)"
+    )
+    parser.add_argument(
+        "--transcribe-workers",
+        type=int,
+        default=1,
+        help="Количество потоков транскрипции. Каждый дополнительный поток "
+             "загружает свою копию модели Whisper (по умолчанию 1)"
+    )
+    parser.add_argument(
+        "--diarize-workers",
+        type=int,
+        default=1,
+        help="Количество потоков диаризации (по умолчанию 1)"
+    )
+    parser.add_argument(
+        "--postprocess-workers",
+        type=int,
+        default=1,
+        help="Количество потоков суммаризации и векторизации (по умолчанию 1)"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=2,
+        help="Размер очереди между этапами конвейера (по умолчанию 2)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Не использовать кэш результатов (пересчитать все этапы)"
+    )
     
     args = parser.parse_args()
     
     process_audio_files(
         summarize=args.summarize,
         vectorize=args.vectorize,
-        model=args.model
+        model=args.model,
+        decode_workers=args.decode_workers,
+        transcribe_workers=args.transcribe_workers,
+        diarize_workers=args.diarize_workers,
+        postprocess_workers=args.postprocess_workers,
+        queue_size=args.queue_size,
+        use_cache=not args.no_cache,
+        profile=args.profile,
+        metrics_file=args.metrics_file,
+        source_policy=args.source_policy,
+        archive_dir=args.archive_dir,
+        ledger_path=args.ledger,
+        watch=args.watch,
+        stable_seconds=args.stable_seconds,
+        poll_interval=args.poll_interval,
+        max_pending=args.max_pending
     )
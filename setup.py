@@ -43,9 +43,13 @@ setup(
             "typer>=0.9.0",
             "rich>=13.0.0",
         ],
+        "watch": [
+            # Слежение за папкой через inotify в process_files.py --watch
+            "watchdog>=3.0.0",
+        ],
         "vector-db": [
-            # Для будущей интеграции с векторными БД
-            # "faiss-cpu>=1.7.4",
+            # Приближенный поиск HNSW в VectorIndex (mode="hnsw")
+            "faiss-cpu>=1.7.4",
             # "qdrant-client>=1.6.0",
         ],
         "all": [
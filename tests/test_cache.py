@@ -0,0 +1,68 @@
+"""Кэш результатов: вытеснение по LRU и учет размера без полного просмотра папки."""
+
+import os
+
+import numpy as np
+
+from file2text.utils.cache import ResultCache
+
+
+def make_cache(tmp_path, max_size_bytes):
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.max_size_bytes = max_size_bytes
+    return cache
+
+
+def touch(cache, stage, key, suffix, when):
+    path = cache._path(stage, key, suffix)
+    os.utime(path, (when, when))
+
+
+def test_size_tracks_writes_and_overwrites(tmp_path):
+    cache = make_cache(tmp_path, 10 ** 9)
+    cache.set("transcribe", "a", {"text": "x" * 100})
+    cache.set("vectorize", "b", np.zeros(16, dtype=np.float32))
+    assert cache._size == cache.size()
+    
+    # Перезапись той же записи не удваивает размер
+    cache.set("transcribe", "a", {"text": "y" * 10})
+    assert cache._size == cache.size()
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, 10 ** 9)
+    for i, key in enumerate(["old", "mid", "new"]):
+        cache.set("summarize", key, {"text": "x" * 100})
+        touch(cache, "summarize", key, ".json", 1000 + i)
+    # Обращение поднимает запись в начало очереди
+    assert cache.get("summarize", "old") is not None
+    
+    entry_size = cache._path("summarize", "new", ".json").stat().st_size
+    cache.max_size_bytes = 3 * entry_size
+    cache.set("summarize", "extra", {"text": "x" * 100})
+    
+    assert cache.get("summarize", "mid") is None
+    assert cache.get("summarize", "old") is not None
+    assert cache.get("summarize", "new") is not None
+    assert cache.get("summarize", "extra") is not None
+    assert cache._size == cache.size() <= cache.max_size_bytes
+
+
+def test_corrupt_entry_is_removed_from_size(tmp_path):
+    cache = make_cache(tmp_path, 10 ** 9)
+    cache.set("transcribe", "good", {"text": "ok"})
+    cache.set("transcribe", "bad", {"text": "x" * 100})
+    cache._path("transcribe", "bad", ".json").write_text("{не json", encoding="utf-8")
+    cache._size = cache.size()
+    
+    assert cache.get("transcribe", "bad") is None
+    assert not cache._path("transcribe", "bad", ".json").exists()
+    assert cache._size == cache.size()
+
+
+def test_clear_resets_size(tmp_path):
+    cache = make_cache(tmp_path, 10 ** 9)
+    cache.set("diarize", "a", [[0.0, 1.0, "SPEAKER_00"]])
+    cache.clear()
+    assert cache._size == 0 == cache.size()
+    assert cache.get("diarize", "a") is None
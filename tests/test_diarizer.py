@@ -0,0 +1,66 @@
+"""Назначение спикеров: проход по отсортированным репликам и разбиение по словам."""
+
+import random
+
+from file2text.core.diarizer import Diarizer, _best_overlap_speakers
+
+
+def brute_force_speakers(intervals, turns):
+    """Прямой перебор O(n·m): суммарное перекрытие по спикерам, при равенстве - ранняя реплика."""
+    speakers = []
+    for start, end in intervals:
+        overlaps, first_turn = {}, {}
+        for k, (turn_start, turn_end, speaker) in enumerate(turns):
+            if turn_start <= end and turn_end >= start:
+                overlaps[speaker] = overlaps.get(speaker, 0.0) + min(end, turn_end) - max(start, turn_start)
+                first_turn.setdefault(speaker, k)
+        speakers.append(
+            max(overlaps, key=lambda spk: (overlaps[spk], -first_turn[spk])) if overlaps else None
+        )
+    return speakers
+
+
+def test_best_overlap_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(200):
+        turns = []
+        for _ in range(rng.randint(0, 30)):
+            start = rng.randint(0, 100) / 2
+            turns.append((start, start + rng.randint(1, 20) / 2, f"SPEAKER_{rng.randint(0, 3)}"))
+        turns.sort(key=lambda t: t[0])
+        intervals = []
+        for _ in range(rng.randint(0, 30)):
+            start = rng.randint(0, 120) / 2
+            intervals.append((start, start + rng.randint(0, 10) / 2))
+        
+        assert _best_overlap_speakers(intervals, turns) == brute_force_speakers(intervals, turns)
+
+
+def test_segment_gets_speaker_with_largest_overlap():
+    segments = [
+        {'start': 0.0, 'end': 4.0, 'text': ' раз'},
+        {'start': 10.0, 'end': 11.0, 'text': ' два'},
+    ]
+    turns = [(0.0, 1.5, "A"), (1.5, 4.0, "B")]
+    
+    result = Diarizer.assign_speakers(segments, turns)
+    
+    assert [segment['speaker'] for segment in result] == ["B", "Unknown"]
+    assert result[0]['text'] == "раз"
+
+
+def test_word_level_splits_segment_between_speakers():
+    words = [
+        {'word': ' Привет', 'start': 0.0, 'end': 0.5},
+        {'word': ' всем.', 'start': 0.5, 'end': 1.0},
+        {'word': ' Здравствуйте.', 'start': 1.2, 'end': 2.0},
+    ]
+    segments = [{'start': 0.0, 'end': 2.0, 'text': ' Привет всем. Здравствуйте.', 'words': words}]
+    turns = [(0.0, 1.1, "A"), (1.1, 2.0, "B")]
+    
+    result = Diarizer.assign_speakers(segments, turns, word_level=True)
+    
+    assert [(part['speaker'], part['text']) for part in result] == [
+        ("A", "Привет всем."), ("B", "Здравствуйте."),
+    ]
+    assert result[1]['start'] == 1.2 and result[1]['end'] == 2.0
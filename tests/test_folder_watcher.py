@@ -0,0 +1,94 @@
+"""Слежение за папкой: выдача файлов после завершения записи и без повторов."""
+
+import queue
+
+from file2text.utils.folder_watcher import FolderWatcher
+
+
+def make_watcher(tmp_path, **kwargs):
+    kwargs.setdefault("stable_seconds", 0)
+    return FolderWatcher(str(tmp_path), use_watchdog=False, **kwargs)
+
+
+def poll(watcher, times=1):
+    """Просмотр папки и проверка файлов, как в фоновом потоке; выданные пути."""
+    ready = []
+    for _ in range(times):
+        watcher._scan()
+        watcher._check()
+        while True:
+            try:
+                ready.append(watcher._queue.get_nowait())
+            except queue.Empty:
+                break
+    return ready
+
+
+def test_file_is_emitted_once_size_stops_changing(tmp_path):
+    watcher = make_watcher(tmp_path)
+    path = tmp_path / "a.mp3"
+    path.write_bytes(b"x" * 10)
+    assert poll(watcher) == []
+    
+    # Файл еще дописывается: размер изменился, ожидание начинается заново
+    with open(path, "ab") as f:
+        f.write(b"y" * 10)
+    assert poll(watcher) == []
+    assert poll(watcher) == [str(path)]
+
+
+def test_file_waits_for_stable_seconds(tmp_path):
+    watcher = make_watcher(tmp_path, stable_seconds=60)
+    (tmp_path / "a.mp3").write_bytes(b"x")
+    assert poll(watcher, times=3) == []
+
+
+def test_empty_and_hidden_files_are_skipped(tmp_path):
+    watcher = make_watcher(tmp_path)
+    empty = tmp_path / "empty.mp3"
+    empty.write_bytes(b"")
+    (tmp_path / ".partial.mp3").write_bytes(b"x")
+    assert poll(watcher, times=3) == []
+    
+    empty.write_bytes(b"x")
+    assert poll(watcher, times=2) == [str(empty)]
+
+
+def test_emitted_and_rejected_files_are_not_repeated(tmp_path):
+    calls = []
+    
+    def accept(path):
+        calls.append(path)
+        return not path.endswith(".txt")
+    
+    watcher = make_watcher(tmp_path, accept=accept)
+    audio = tmp_path / "a.mp3"
+    audio.write_bytes(b"x")
+    (tmp_path / "notes.txt").write_bytes(b"x")
+    assert poll(watcher, times=4) == [str(audio)]
+    assert sorted(calls) == sorted([str(audio), str(tmp_path / "notes.txt")])
+    
+    # Измененный файл выдается снова
+    audio.write_bytes(b"xy")
+    assert poll(watcher, times=2) == [str(audio)]
+    
+    # Удаленный и созданный заново с тем же именем - тоже
+    audio.unlink()
+    assert poll(watcher) == []
+    audio.write_bytes(b"xy")
+    assert poll(watcher, times=2) == [str(audio)]
+
+
+def test_full_queue_keeps_file_pending(tmp_path):
+    watcher = make_watcher(tmp_path, max_pending=1)
+    for name in ("a.mp3", "b.mp3"):
+        (tmp_path / name).write_bytes(b"x")
+    watcher._scan()
+    watcher._check()
+    watcher._check()
+    first = watcher._queue.get_nowait()
+    assert watcher._queue.empty()
+    
+    watcher._check()
+    second = watcher._queue.get_nowait()
+    assert sorted([first, second]) == [str(tmp_path / "a.mp3"), str(tmp_path / "b.mp3")]
@@ -0,0 +1,72 @@
+"""
+Импорт легких модулей file2text не должен загружать тяжелые зависимости.
+
+Каждый импорт выполняется в отдельном интерпретаторе. Попытка импорта
+тяжелого модуля считается утечкой, даже если модуль не установлен, поэтому
+тест работает и без torch, faiss и других зависимостей.
+"""
+
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = [
+    "torch", "whisper", "pyannote.audio", "transformers", "sentence_transformers", "faiss", "sklearn",
+]
+
+_PROBE = """
+import json, sys
+
+heavy = {heavy!r}
+attempted = set()
+
+class HeavyImportFinder:
+    def find_spec(self, name, path=None, target=None):
+        for module in heavy:
+            if module == name or module.startswith(name + "."):
+                attempted.add(module)
+        return None
+
+sys.meta_path.insert(0, HeavyImportFinder())
+{statement}
+print(json.dumps([name for name in heavy if name in sys.modules or name in attempted]))
+"""
+
+
+def heavy_imports(statement: str) -> list:
+    """Выполняет импорт в чистом интерпретаторе и возвращает загруженные тяжелые модули."""
+    process = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    assert process.returncode == 0, f"Импорт не удался: {statement}\n{process.stderr}"
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("statement", [
+    "import file2text",
+    "import file2text.utils",
+    "from file2text.utils import clean_text",
+    "from file2text import File2Text",
+])
+def test_light_imports(statement):
+    assert heavy_imports(statement) == []
+
+
+def test_cli_import():
+    if importlib.util.find_spec("typer") is None:
+        pytest.skip("не установлен typer")
+    assert heavy_imports("import file2text.cli.main") == []
+
+
+def test_probe_detects_missing_heavy_module():
+    statement = "try:\n    import faiss\nexcept ImportError:\n    pass"
+    assert heavy_imports(statement) == ["faiss"]
@@ -0,0 +1,124 @@
+"""Журнал заданий: возобновление по контрольным точкам и их сброс по этапам."""
+
+import dataclasses
+import sqlite3
+
+import numpy as np
+
+from file2text.core.batch import BatchProcessor
+from file2text.core.file2text import File2Text
+from file2text.utils.config import Config
+from file2text.utils.job_ledger import JobLedger
+
+FINGERPRINTS = {
+    'transcribed': 't1',
+    'diarized': 'd1',
+    'summarized': 's1',
+    'vectorized': 'v1',
+}
+
+
+def make_file(tmp_path, content=b"audio"):
+    path = tmp_path / "meeting.mp3"
+    path.write_bytes(content)
+    return str(path)
+
+
+def save_all(ledger, path, fingerprints):
+    for stage in ('transcribed', 'diarized', 'summarized'):
+        ledger.checkpoint(path, stage, {'stage': stage}, fingerprint=fingerprints[stage])
+    ledger.checkpoint(
+        path, 'vectorized', {'stage': 'vectorized'}, np.eye(3, dtype=np.float32),
+        fingerprint=fingerprints['vectorized']
+    )
+
+
+def test_resume_restores_checkpoints(tmp_path):
+    path = make_file(tmp_path)
+    with JobLedger(str(tmp_path / "jobs.sqlite3")) as ledger:
+        assert ledger.start(path, FINGERPRINTS) == {}
+        save_all(ledger, path, FINGERPRINTS)
+        ledger.fail(path, "сбой")
+        assert ledger.unfinished() == [
+            (path, 'failed', ['transcribed', 'diarized', 'summarized', 'vectorized'])
+        ]
+    
+    with JobLedger(str(tmp_path / "jobs.sqlite3")) as ledger:
+        checkpoints = ledger.start(path, FINGERPRINTS)
+        assert sorted(checkpoints) == sorted(FINGERPRINTS)
+        assert checkpoints['diarized'].data == {'stage': 'diarized'}
+        assert np.array_equal(checkpoints['vectorized'].array, np.eye(3))
+        
+        ledger.finish(path)
+        assert ledger.checkpoints(path) == {}
+        assert ledger.is_done(path) and ledger.is_done(path, FINGERPRINTS)
+        assert not ledger.is_done(path, {**FINGERPRINTS, 'summarized': 's2'})
+        assert ledger.unfinished() == []
+
+
+def test_changed_content_drops_all_checkpoints(tmp_path):
+    path = make_file(tmp_path)
+    with JobLedger(str(tmp_path / "jobs.sqlite3")) as ledger:
+        ledger.start(path, FINGERPRINTS)
+        save_all(ledger, path, FINGERPRINTS)
+        make_file(tmp_path, b"other audio")
+        assert ledger.start(path, FINGERPRINTS) == {}
+
+
+def test_changed_stage_drops_only_that_stage(tmp_path):
+    path = make_file(tmp_path)
+    with JobLedger(str(tmp_path / "jobs.sqlite3")) as ledger:
+        ledger.start(path, FINGERPRINTS)
+        save_all(ledger, path, FINGERPRINTS)
+        checkpoints = ledger.start(path, {**FINGERPRINTS, 'summarized': 's2'})
+        assert sorted(checkpoints) == ['diarized', 'transcribed', 'vectorized']
+
+
+def test_summarizer_change_keeps_transcript(tmp_path):
+    config = Config(huggingface_token="test", cache_dir=str(tmp_path / "cache"))
+    batch = BatchProcessor(File2Text(config=config))
+    kwargs = batch.processor._transcribe_kwargs({}, False)
+    before = batch._fingerprints(True, False, kwargs)
+    
+    path = make_file(tmp_path)
+    with JobLedger(str(tmp_path / "jobs.sqlite3")) as ledger:
+        ledger.start(path, before)
+        save_all(ledger, path, before)
+        
+        batch.processor.config = dataclasses.replace(
+            config, summarizer_model="other/summarizer", summary_chunk_overlap_tokens=16
+        )
+        after = batch._fingerprints(True, False, kwargs)
+        assert sorted(ledger.start(path, after)) == ['diarized', 'transcribed', 'vectorized']
+        
+        # Параметры диаризации сбрасывают и зависящие от нее этапы
+        assert sorted(ledger.start(path, batch._fingerprints(True, True, kwargs))) == ['transcribed']
+        
+        batch.processor.config = dataclasses.replace(config, decoding_profile="realtime")
+        assert ledger.start(path, batch._fingerprints(True, False, kwargs)) == {}
+
+
+def test_old_schema_is_migrated(tmp_path):
+    path = make_file(tmp_path)
+    conn = sqlite3.connect(str(tmp_path / "jobs.sqlite3"))
+    conn.executescript("""
+        CREATE TABLE jobs (path TEXT PRIMARY KEY, content_hash TEXT NOT NULL, size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL, fingerprint TEXT NOT NULL, status TEXT NOT NULL, error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0, updated REAL NOT NULL);
+        CREATE TABLE checkpoints (path TEXT NOT NULL, stage TEXT NOT NULL, data TEXT NOT NULL,
+            array BLOB, created REAL NOT NULL, PRIMARY KEY (path, stage));
+    """)
+    conn.close()
+    
+    with JobLedger(str(tmp_path / "jobs.sqlite3")) as ledger:
+        ledger.start(path, FINGERPRINTS)
+        ledger._transaction([(
+            "INSERT INTO checkpoints (path, stage, data, created) VALUES (?, 'converted', '{}', 0)",
+            (path,)
+        )])
+    
+    with JobLedger(str(tmp_path / "jobs.sqlite3")) as ledger:
+        # Точки без fingerprint (и этапы прежних версий) не переиспользуются
+        assert ledger.start(path, FINGERPRINTS) == {}
+        save_all(ledger, path, FINGERPRINTS)
+        assert sorted(ledger.start(path, FINGERPRINTS)) == sorted(FINGERPRINTS)
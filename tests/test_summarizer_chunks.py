@@ -0,0 +1,109 @@
+"""Разбиение текста на чанки для суммаризации."""
+
+from file2text.core.summarizer import Summarizer, _split_text_into_chunks
+
+
+class WordTokenizer:
+    """Токенизатор-заглушка: одно слово - один токен."""
+    
+    model_max_length = 512
+    
+    def __call__(self, texts, add_special_tokens=False):
+        return {'input_ids': [text.split() for text in texts]}
+
+
+class EchoPipeline:
+    """Пайплайн-заглушка: суммаризация - первые пять слов текста."""
+    
+    def __init__(self):
+        self.tokenizer = WordTokenizer()
+        self.calls = []
+    
+    def __call__(self, texts, **params):
+        texts = [texts] if isinstance(texts, str) else texts
+        self.calls.append(texts)
+        return [{'summary_text': ' '.join(text.split()[:5])} for text in texts]
+
+
+def make_summarizer(max_input_tokens, chunk_overlap_tokens=0):
+    summarizer = Summarizer.__new__(Summarizer)
+    summarizer.verbose = False
+    summarizer.batch_size = 8
+    summarizer.summarizer = EchoPipeline()
+    summarizer.max_input_tokens = max_input_tokens
+    summarizer.chunk_overlap_tokens = chunk_overlap_tokens
+    return summarizer
+
+
+def test_char_chunks_count_separators():
+    sentences = [f"Предложение номер {i} из теста" for i in range(40)]
+    text = '. '.join(sentences) + '.'
+    chunks = _split_text_into_chunks(text, max_length=100, overlap=0)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert ' '.join(chunks).count('Предложение') == len(sentences)
+    
+    # Сумма длин предложений помещается в лимит, а текст с разделителями - нет
+    text = '. '.join(["Девять ок"] * 10) + '.'
+    assert len(text) > 100
+    chunks = _split_text_into_chunks(text, max_length=100, overlap=0)
+    assert len(chunks) == 2
+    assert all(len(chunk) <= 100 for chunk in chunks)
+
+
+def test_text_that_fits_is_returned_whole():
+    text = "Первое предложение. Второе предложение."
+    assert _split_text_into_chunks(text, max_length=1000) == [text]
+
+
+def test_no_usable_chunks_returns_cleaned_text():
+    # Бюджет в несколько слов дает только короткие чанки, которые отбрасываются
+    summarizer = make_summarizer(max_input_tokens=12)
+    text = ' '.join(f"Слово{i} слово. " for i in range(30))
+    summary = summarizer._summarize_requests([(text, 50, 10)])[0]
+    assert summary.startswith("Слово0 слово")
+    assert summarizer.summarizer.calls == []
+
+
+def word_count(sentences):
+    return [len(sentence.split()) + 1 for sentence in sentences]
+
+
+def test_token_chunks_fit_budget_and_overlap():
+    sentences = [f"предложение {i} " + "слово " * (i % 5) for i in range(60)]
+    text = '. '.join(sentence.strip() for sentence in sentences) + '.'
+    chunks = _split_text_into_chunks(text, max_length=30, overlap=8, measure=word_count)
+    assert len(chunks) > 1
+    numbers = []
+    for chunk in chunks:
+        pieces = chunk.rstrip('.').split('. ')
+        assert sum(word_count(pieces)) <= 30
+        numbers.append([int(piece.split()[1]) for piece in pieces])
+    
+    # Соседние чанки перекрываются, но каждый следующий начинается дальше
+    assert sorted({n for chunk in numbers for n in chunk}) == list(range(60))
+    for previous, current in zip(numbers, numbers[1:]):
+        assert previous[0] < current[0] <= previous[-1]
+
+
+def test_token_mode_single_chunk_and_long_sentence():
+    text = "Короткое предложение. Еще одно."
+    assert _split_text_into_chunks(text, max_length=10, measure=word_count) == [text]
+    
+    long_sentence = ' '.join(f"w{i}" for i in range(100))
+    chunks = _split_text_into_chunks(
+        "Начало. " + long_sentence + ". Конец.", max_length=30, overlap=0, measure=word_count
+    )
+    assert all(len(chunk.split()) <= 30 for chunk in chunks)
+    words = ' '.join(chunks).replace('.', '').split()
+    assert [word for word in words if word.startswith('w')] == long_sentence.split()
+
+
+def test_summarizer_splits_by_tokenizer_budget():
+    summarizer = make_summarizer(max_input_tokens=40, chunk_overlap_tokens=100)
+    text = ' '.join(f"Предложение номер {i} для проверки." for i in range(50))
+    chunks = summarizer._split(text)
+    assert len(chunks) > 1
+    tokenizer = summarizer.summarizer.tokenizer
+    for chunk in chunks:
+        assert len(tokenizer([chunk])['input_ids'][0]) <= 40
@@ -0,0 +1,80 @@
+"""Индекс векторов: точный и IVF-поиск, сохранение и загрузка через memory map."""
+
+import numpy as np
+
+from file2text.core.vector_index import VectorIndex
+
+
+def clustered(n, dimension=16, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension))
+    labels = rng.integers(clusters, size=n)
+    return (centers[labels] + 0.3 * rng.normal(size=(n, dimension))).astype(np.float32)
+
+
+def brute_force(vectors, query, top_k):
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = vectors @ (query / np.linalg.norm(query))
+    return list(np.argsort(-scores, kind='stable')[:top_k])
+
+
+def test_exact_matches_brute_force():
+    vectors = clustered(500)
+    index = VectorIndex(dimension=16)
+    ids = index.add(vectors, items=[{"n": i} for i in range(len(vectors))])
+    assert ids == list(range(500))
+    
+    for query in clustered(10, seed=1):
+        found = [vector_id for vector_id, _ in index.search(query, top_k=5)]
+        assert found == brute_force(vectors, query, 5)
+    assert index.item(42) == {"n": 42}
+
+
+def test_ivf_recall_against_exact():
+    vectors = clustered(2000)
+    index = VectorIndex(dimension=16, mode="ivf", nprobe=8)
+    index.add(vectors)
+    index.build_ivf(nlist=32)
+    
+    hits = total = 0
+    for query in clustered(50, seed=2):
+        exact = {vector_id for vector_id, _ in index.search(query, top_k=10, mode="exact")}
+        approx = {vector_id for vector_id, _ in index.search(query, top_k=10)}
+        hits += len(exact & approx)
+        total += len(exact)
+    assert hits / total >= 0.9
+    
+    # При просмотре всех кластеров IVF совпадает с точным поиском
+    index.nprobe = 32
+    query = clustered(1, seed=3)[0]
+    assert index.search(query, top_k=10) == index.search(query, top_k=10, mode="exact")
+
+
+def test_save_load_round_trip_keeps_memmap(tmp_path):
+    vectors = clustered(300)
+    index = VectorIndex(dimension=16, mode="ivf")
+    index.add(vectors, items=[f"item {i}" for i in range(len(vectors))])
+    index.delete([0, 1, 2])
+    index.build_ivf(nlist=8)
+    index.save(str(tmp_path / "index"))
+    
+    loaded = VectorIndex.load(str(tmp_path / "index"))
+    assert isinstance(loaded._blocks[0], np.memmap)
+    assert len(loaded) == 297 and 0 not in loaded and 3 in loaded
+    assert loaded.item(10) == "item 10"
+    query = clustered(1, seed=4)[0]
+    assert loaded.search(query, top_k=5) == index.search(query, top_k=5)
+    
+    # Новые векторы дописываются отдельным блоком, сохраненный остается memory map
+    new_ids = loaded.add(clustered(5, seed=5))
+    assert new_ids == list(range(300, 305))
+    assert isinstance(loaded._blocks[0], np.memmap)
+    loaded.delete([300])
+    loaded.compact()
+    assert isinstance(loaded._blocks[0], np.memmap)
+    assert len(loaded) == 301
+    
+    loaded.save()
+    reloaded = VectorIndex.load(str(tmp_path / "index"))
+    assert len(reloaded) == 301 and 300 not in reloaded
+    assert np.allclose(reloaded.vector(304), loaded.vector(304))